@@ -9,8 +9,9 @@ from alembic import context
 
 # Import the Base class from your application's models
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from app.db.base_class import Base  # Adjust the import path if necessary
+from app.db.base import Base  # Imports every model so autogenerate sees them
 from app.core.config import settings # Import your settings
+from app.db.partitions import is_partition
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -32,6 +33,12 @@ target_metadata = Base.metadata # Set target_metadata to your Base.metadata
 # my_important_option = config.get_main_option("my_important_option")
 # ... etc.
 
+def include_name(name, type_, parent_names):
+    """Leave partitions of signals/nudges to app.db.partitions"""
+    if type_ == "table":
+        return not is_partition(name)
+    return True
+
 # Get the database URL from your application settings
 database_url = settings.SQLALCHEMY_DATABASE_URI
 
@@ -51,6 +58,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=database_url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -78,7 +86,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_name=include_name
         )
 
         with context.begin_transaction():
@@ -0,0 +1,143 @@
+"""partition signals and nudges by month
+
+Revision ID: 3d7b9e2f5a10
+Revises: 8c1f3a9d2b47
+Create Date: 2026-10-18 10:41:27.905113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.db.partitions import ensure_partitions
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d7b9e2f5a10'
+down_revision: Union[str, None] = '8c1f3a9d2b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SIGNAL_TYPE = postgresql.ENUM(
+    'MEETING_OVERLOAD', 'AFTER_HOURS_ACTIVITY', 'SLACK_ACTIVITY', 'EMAIL_PATTERN',
+    name='signaltype',
+    create_type=False
+)
+
+
+def _signal_columns():
+    return [
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('type', SIGNAL_TYPE, nullable=False),
+        sa.Column('source', sa.String(), nullable=False),
+        sa.Column('severity', sa.Float(), nullable=False),
+        sa.Column('confidence', sa.Float(), nullable=False),
+        sa.Column('extra_data', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+    ]
+
+
+def _nudge_columns():
+    return [
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('signal_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('type', sa.String(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('message', sa.String(), nullable=False),
+        sa.Column('action_url', sa.String(), nullable=True),
+        sa.Column('priority', sa.String(), nullable=False),
+        sa.Column('extra_data', sa.JSON(), nullable=False),
+        sa.Column('is_read', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+    ]
+
+
+def _set_aside(table: str, new_name: str) -> None:
+    """Rename a table and its primary key so the replacement can reuse both names"""
+    op.rename_table(table, new_name)
+    op.execute(f'ALTER TABLE {new_name} RENAME CONSTRAINT {table}_pkey TO {new_name}_pkey')
+
+
+def _create_indexes() -> None:
+    op.create_index(
+        'ix_signals_user_id_created_at', 'signals',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+    op.create_index(
+        'ix_nudges_user_id_created_at', 'nudges',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+    op.create_index(
+        'ix_nudges_user_id_unread', 'nudges',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        postgresql_where=sa.text('is_read IS false')
+    )
+    op.create_index('ix_nudges_signal_id', 'nudges', ['signal_id'])
+
+
+# Existing rows are copied into the new tables, which holds an exclusive
+# lock on both for the duration; run during a maintenance window.
+def upgrade() -> None:
+    _set_aside('nudges', 'nudges_unpartitioned')
+    _set_aside('signals', 'signals_unpartitioned')
+
+    op.create_table(
+        'signals',
+        *_signal_columns(),
+        sa.PrimaryKeyConstraint('id', 'created_at'),
+        postgresql_partition_by='RANGE (created_at)'
+    )
+    op.create_table(
+        'nudges',
+        *_nudge_columns(),
+        sa.PrimaryKeyConstraint('id', 'created_at'),
+        postgresql_partition_by='RANGE (created_at)'
+    )
+
+    # Cover every month that already has data, plus the months ahead
+    bind = op.get_bind()
+    oldest = bind.execute(sa.text(
+        "SELECT least((SELECT min(created_at) FROM signals_unpartitioned), "
+        "(SELECT min(created_at) FROM nudges_unpartitioned))"
+    )).scalar()
+    ensure_partitions(bind, start=oldest.date() if oldest else None)
+
+    op.execute('INSERT INTO signals SELECT * FROM signals_unpartitioned')
+    op.execute('INSERT INTO nudges SELECT * FROM nudges_unpartitioned')
+    op.drop_table('nudges_unpartitioned')
+    op.drop_table('signals_unpartitioned')
+
+    _create_indexes()
+
+
+def downgrade() -> None:
+    _set_aside('nudges', 'nudges_partitioned')
+    _set_aside('signals', 'signals_partitioned')
+
+    op.create_table('signals', *_signal_columns(), sa.PrimaryKeyConstraint('id'))
+    op.create_table(
+        'nudges',
+        *_nudge_columns(),
+        sa.ForeignKeyConstraint(['signal_id'], ['signals.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.execute('INSERT INTO signals SELECT * FROM signals_partitioned')
+    op.execute(
+        'INSERT INTO nudges SELECT * FROM nudges_partitioned '
+        'WHERE signal_id IS NULL OR signal_id IN (SELECT id FROM signals)'
+    )
+    # Dropping the parents drops every partition with them
+    op.drop_table('nudges_partitioned')
+    op.drop_table('signals_partitioned')
+
+    _create_indexes()
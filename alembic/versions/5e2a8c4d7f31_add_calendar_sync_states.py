@@ -0,0 +1,38 @@
+"""add calendar sync states
+
+Revision ID: 5e2a8c4d7f31
+Revises: 3d7b9e2f5a10
+Create Date: 2026-10-18 13:41:27.902113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2a8c4d7f31'
+down_revision: Union[str, None] = '3d7b9e2f5a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'calendar_sync_states',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('sync_token', sa.String(), nullable=True),
+        sa.Column('events', sa.JSON(), nullable=False),
+        sa.Column('last_full_sync_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_synced_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('calendar_sync_states')
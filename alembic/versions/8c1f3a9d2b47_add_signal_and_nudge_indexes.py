@@ -0,0 +1,69 @@
+"""add signal and nudge indexes
+
+Revision ID: 8c1f3a9d2b47
+Revises: f70ed3c12246
+Create Date: 2026-10-18 09:12:04.318225
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c1f3a9d2b47'
+down_revision: Union[str, None] = 'f70ed3c12246'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction, so every
+# statement runs in an autocommit block. if_not_exists/if_exists make the
+# migration safe on databases whose tables came from metadata.create_all.
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # GET /signals/my: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        op.create_index(
+            'ix_signals_user_id_created_at',
+            'signals',
+            ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        # GET /signals/my/nudges: same shape as signals
+        op.create_index(
+            'ix_nudges_user_id_created_at',
+            'nudges',
+            ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        # Unread nudges per user (?is_read=false, read-all)
+        op.create_index(
+            'ix_nudges_user_id_unread',
+            'nudges',
+            ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_where=sa.text('is_read IS false'),
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        # Nudges are looked up by signal when a signal is deleted
+        op.create_index(
+            'ix_nudges_signal_id',
+            'nudges',
+            ['signal_id'],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table in (
+            ('ix_nudges_signal_id', 'nudges'),
+            ('ix_nudges_user_id_unread', 'nudges'),
+            ('ix_nudges_user_id_created_at', 'nudges'),
+            ('ix_signals_user_id_created_at', 'signals'),
+        ):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,36 @@
+"""add signal runs
+
+Revision ID: a4c6e8f0b2d3
+Revises: e7a1c9d3f5b2
+Create Date: 2026-10-18 19:05:41.227306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c6e8f0b2d3'
+down_revision: Union[str, None] = 'e7a1c9d3f5b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'signal_runs',
+        sa.Column('run_key', sa.String(), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('run_key', 'user_id')
+    )
+    op.create_index(op.f('ix_signal_runs_created_at'), 'signal_runs', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_signal_runs_created_at'), table_name='signal_runs')
+    op.drop_table('signal_runs')
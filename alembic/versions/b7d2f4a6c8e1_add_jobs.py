@@ -0,0 +1,64 @@
+"""add jobs
+
+Revision ID: b7d2f4a6c8e1
+Revises: a4c6e8f0b2d3
+Create Date: 2026-10-18 21:12:08.514392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2f4a6c8e1'
+down_revision: Union[str, None] = 'a4c6e8f0b2d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('dedupe_key', sa.String(), nullable=True),
+        sa.Column('group_key', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), server_default='queued', nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('max_attempts', sa.Integer(), nullable=False),
+        sa.Column('run_after', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('locked_by', sa.String(), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_error', sa.String(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('dedupe_key')
+    )
+    op.create_index(op.f('ix_jobs_group_key'), 'jobs', ['group_key'], unique=False)
+    op.create_index(
+        'ix_jobs_queued_run_after', 'jobs', ['run_after'], unique=False,
+        postgresql_where=sa.text("status = 'queued'")
+    )
+    op.create_index(
+        'ix_jobs_running_lease_expires_at', 'jobs', ['lease_expires_at'], unique=False,
+        postgresql_where=sa.text("status = 'running'")
+    )
+    op.create_index(
+        'ix_jobs_finished_at', 'jobs', ['finished_at'], unique=False,
+        postgresql_where=sa.text('finished_at IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_finished_at', table_name='jobs')
+    op.drop_index('ix_jobs_running_lease_expires_at', table_name='jobs')
+    op.drop_index('ix_jobs_queued_run_after', table_name='jobs')
+    op.drop_index(op.f('ix_jobs_group_key'), table_name='jobs')
+    op.drop_table('jobs')
@@ -0,0 +1,40 @@
+"""add integration tokens
+
+Revision ID: c3e5a7f9b1d4
+Revises: 9b4f1d6e3c82
+Create Date: 2026-10-18 15:52:08.661204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e5a7f9b1d4'
+down_revision: Union[str, None] = '9b4f1d6e3c82'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'integration_tokens',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('provider', sa.String(), nullable=False),
+        sa.Column('access_token', sa.String(), nullable=False),
+        sa.Column('refresh_token', sa.String(), nullable=True),
+        sa.Column('scopes', sa.String(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('extra', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'provider')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('integration_tokens')
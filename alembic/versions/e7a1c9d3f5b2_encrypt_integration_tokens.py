@@ -0,0 +1,74 @@
+"""encrypt integration tokens and track refresh
+
+Revision ID: e7a1c9d3f5b2
+Revises: c3e5a7f9b1d4
+Create Date: 2026-10-18 16:40:12.508913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+from app.core.encryption import token_cipher
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a1c9d3f5b2'
+down_revision: Union[str, None] = 'c3e5a7f9b1d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _encrypt(value):
+    return token_cipher().encrypt(value.encode()).decode() if value is not None else None
+
+
+def _decrypt(value):
+    # Raises InvalidToken rather than writing nulls when the key is wrong
+    return token_cipher().decrypt(value.encode()).decode() if value is not None else None
+
+
+def _rewrite_tokens(convert) -> None:
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.text('SELECT user_id, provider, access_token, refresh_token FROM integration_tokens')
+    ).fetchall()
+    for user_id, provider, access_token, refresh_token in rows:
+        connection.execute(
+            sa.text(
+                'UPDATE integration_tokens SET access_token = :access_token, refresh_token = :refresh_token '
+                'WHERE user_id = :user_id AND provider = :provider'
+            ),
+            {
+                'user_id': user_id,
+                'provider': provider,
+                'access_token': convert(access_token),
+                'refresh_token': convert(refresh_token)
+            }
+        )
+
+
+def upgrade() -> None:
+    op.add_column('integration_tokens', sa.Column('refresh_after', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('integration_tokens', sa.Column('refresh_failures', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('integration_tokens', sa.Column('refresh_error', sa.String(), nullable=True))
+    op.create_index(op.f('ix_integration_tokens_refresh_after'), 'integration_tokens', ['refresh_after'], unique=False)
+
+    # Existing rows hold plaintext tokens
+    _rewrite_tokens(_encrypt)
+    # Schedule renewal of existing tokens, spread over the jitter window
+    op.execute(sa.text(
+        'UPDATE integration_tokens '
+        'SET refresh_after = expires_at - make_interval(secs => :margin + random() * :jitter) '
+        'WHERE expires_at IS NOT NULL AND refresh_token IS NOT NULL'
+    ).bindparams(margin=settings.TOKEN_REFRESH_MARGIN_SECONDS, jitter=settings.TOKEN_REFRESH_JITTER_SECONDS))
+
+
+def downgrade() -> None:
+    _rewrite_tokens(_decrypt)
+    op.drop_index(op.f('ix_integration_tokens_refresh_after'), table_name='integration_tokens')
+    op.drop_column('integration_tokens', 'refresh_error')
+    op.drop_column('integration_tokens', 'refresh_failures')
+    op.drop_column('integration_tokens', 'refresh_after')
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, users, signals, teams, oauth, integrations
+from app.api.v1.endpoints import auth, users, signals, teams, oauth, integrations, metrics, webhooks
 
 api_router = APIRouter()
 
@@ -9,4 +9,6 @@ api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(signals.router, prefix="/signals", tags=["signals"])
 api_router.include_router(teams.router, prefix="/teams", tags=["teams"])
 api_router.include_router(oauth.router, prefix="/oauth", tags=["oauth"])
-api_router.include_router(integrations.router, prefix="/integrations", tags=["integrations"]) 
\ No newline at end of file
+api_router.include_router(integrations.router, prefix="/integrations", tags=["integrations"]) 
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
+api_router.include_router(webhooks.router, prefix="/webhooks", tags=["webhooks"])
@@ -4,16 +4,23 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.security import create_access_token
-from app.core.password import verify_password
+from app.core.password import PasswordHasherBusy
 from app.core.config import settings
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.token import Token
 from app.schemas.user import UserCreate, UserResponse
-from app.crud.user import get_user_by_email, create_user
+from app.crud.user import get_user_by_email, create_user, authenticate
 
 router = APIRouter()
 
+def _password_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent password checks, please retry",
+        headers={"Retry-After": "1"},
+    )
+
 @router.options("/register")
 async def options_register():
     """Handle OPTIONS preflight request for /register"""
@@ -25,8 +32,11 @@ async def login(
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """Login endpoint for obtaining access token"""
-    user = await get_user_by_email(db, email=form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    try:
+        user = await authenticate(db, email=form_data.username, password=form_data.password)
+    except PasswordHasherBusy:
+        raise _password_busy()
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -61,6 +71,8 @@ async def register(
     try:
         user = await create_user(db, obj_in=user_in)
         return user
+    except PasswordHasherBusy:
+        raise _password_busy()
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
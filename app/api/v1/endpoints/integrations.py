@@ -1,9 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import RedirectResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Optional
-import httpx
+from datetime import datetime, timezone
 from app.core.config import settings
+from app.core.http_pool import http_pool
+from app.core.oauth.slack import slack_token_data
 from app.core.security import verify_token
+from app.crud.integration import get_user_token, store_oauth_tokens
+from app.db.session import get_db
 from app.models.user import User
 
 router = APIRouter()
@@ -54,6 +59,7 @@ async def initiate_oauth(
 async def oauth_callback(
     provider: str,
     code: str,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(verify_token)
 ):
     """Handle OAuth callback and token exchange"""
@@ -62,7 +68,7 @@ async def oauth_callback(
     
     config = OAUTH_CONFIG[provider]
     
-    async with httpx.AsyncClient() as client:
+    async with http_pool.client(provider) as client:
         try:
             # Exchange code for access token
             token_response = await client.post(
@@ -76,9 +82,12 @@ async def oauth_callback(
                 }
             )
             token_data = token_response.json()
+            if provider == "slack":
+                # Slack nests the user's token and the team and user ids
+                token_data = slack_token_data(token_data)
             
-            # Store the tokens in the database (implement this)
-            # await store_oauth_tokens(current_user.id, provider, token_data)
+            # Store the tokens in the database
+            await store_oauth_tokens(db, current_user.id, provider, token_data)
             
             # Redirect to frontend with success
             return RedirectResponse(
@@ -94,8 +103,25 @@ async def oauth_callback(
 @router.get("/{provider}/status")
 async def get_integration_status(
     provider: str,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(verify_token)
 ):
-    """Get the connection status for a specific integration"""
-    # TODO: Implement actual token validation and status check
-    return {"connected": False} 
\ No newline at end of file
+    """Get the connection status for a specific integration, from the token store only"""
+    if provider not in OAUTH_CONFIG:
+        raise HTTPException(status_code=400, detail="Unsupported provider")
+    
+    token = await get_user_token(db, current_user.id, provider)
+    if not token:
+        return {"connected": False}
+    
+    # Renewal is the background refresher's job; a revoked grant needs the user to reconnect
+    expired = token.expires_at is not None and token.expires_at <= datetime.now(timezone.utc)
+    needs_reauth = token.refresh_error is not None or (expired and not token.refresh_token)
+    return {
+        "connected": not needs_reauth,
+        "needs_reauth": needs_reauth,
+        "expired": expired,
+        "expires_at": token.expires_at,
+        "scopes": token.scopes.split() if token.scopes else [],
+        "connected_since": token.created_at
+    }
@@ -0,0 +1,101 @@
+from typing import Any
+from fastapi import APIRouter, Depends, HTTPException, status
+from app.core.security import verify_token
+from app.core.user_cache import user_cache
+from app.core.metadata_cache import metadata_cache
+from app.core.password import password_hasher
+from app.core.oauth.google_clients import google_services
+from app.core.oauth.slack import slack_rate_limiter
+from app.core.oauth.resilience import provider_guards
+from app.core.http_pool import http_pool
+from app.core.oauth.token_refresh import token_refresher
+from app.core.webhooks import webhook_ingestor
+from app.core.signals.fetch import fetch_stats
+from app.models.user import User, UserRole
+import logging
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+def _require_admin(current_user: User) -> None:
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can view metrics"
+        )
+
+@router.get("/cache")
+async def get_cache_metrics(
+    *,
+    current_user: User = Depends(verify_token)
+) -> Any:
+    """In-process cache counters for this worker"""
+    _require_admin(current_user)
+    return {
+        "user_cache": user_cache.stats(),
+        "google_services": google_services.stats(),
+        "metadata_cache": metadata_cache.stats()
+    }
+
+@router.get("/password-hasher")
+async def get_password_hasher_metrics(
+    *,
+    current_user: User = Depends(verify_token)
+) -> Any:
+    """Queue depth and rejections of the password hashing pool"""
+    _require_admin(current_user)
+    return password_hasher.stats()
+
+@router.get("/rate-limits")
+async def get_rate_limit_metrics(
+    *,
+    current_user: User = Depends(verify_token)
+) -> Any:
+    """Client-side provider rate limiting for this worker"""
+    _require_admin(current_user)
+    return {"slack": slack_rate_limiter.stats()}
+
+@router.get("/fetch")
+async def get_fetch_metrics(
+    *,
+    current_user: User = Depends(verify_token)
+) -> Any:
+    """Per-provider metadata fetch latency and outcomes for this worker"""
+    _require_admin(current_user)
+    return fetch_stats.stats()
+
+@router.get("/http-pool")
+async def get_http_pool_metrics(
+    *,
+    current_user: User = Depends(verify_token)
+) -> Any:
+    """Connections held by the shared outbound HTTP pools of this worker"""
+    _require_admin(current_user)
+    return http_pool.stats()
+
+@router.get("/token-refresh")
+async def get_token_refresh_metrics(
+    *,
+    current_user: User = Depends(verify_token)
+) -> Any:
+    """Background OAuth token renewal in this worker"""
+    _require_admin(current_user)
+    return token_refresher.stats()
+
+@router.get("/webhooks")
+async def get_webhook_metrics(
+    *,
+    current_user: User = Depends(verify_token)
+) -> Any:
+    """Webhook queue depth, consumer lag and event counts for this worker"""
+    _require_admin(current_user)
+    return webhook_ingestor.stats()
+
+@router.get("/circuits")
+async def get_circuit_metrics(
+    *,
+    current_user: User = Depends(verify_token)
+) -> Any:
+    """Circuit breaker state, bulkhead usage and rejections per provider for this worker"""
+    _require_admin(current_user)
+    return {name: guard.stats() for name, guard in provider_guards.items()}
@@ -1,12 +1,17 @@
-from typing import Any
+from typing import Any, Optional, Dict, Callable, Awaitable
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.oauth.slack import SlackOAuth
 from app.core.oauth.google import GoogleOAuth
 from app.core.security import verify_token
+from app.core.metadata_cache import metadata_cache
+from app.core.webhooks import push_channel_token
 from app.db.session import get_db
 from app.models.user import User
 from app.crud.user import get_user, update_user
+from app.crud.integration import (
+    reset_calendar_sync_state, reset_gmail_sync_state, store_oauth_tokens, delete_oauth_tokens
+)
 import secrets
 import logging
 
@@ -17,6 +22,14 @@ logger = logging.getLogger(__name__)
 slack_oauth = SlackOAuth()
 google_oauth = GoogleOAuth()
 
+async def _initial_sync(provider: str, sync: Callable[[], Awaitable[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """First sync after connecting; None if it failed, so one working Google API is enough"""
+    try:
+        return await sync()
+    except Exception as e:
+        logger.warning(f"Initial {provider} sync failed: {str(e)}")
+        return None
+
 @router.get("/slack/authorize")
 async def slack_authorize() -> Any:
     """Get Slack OAuth authorization URL"""
@@ -52,7 +65,9 @@ async def slack_callback(
         # Update user with Slack info
         user = await get_user(db, current_user.id)
         user.slack_user_id = user_info["slack_user_id"]
-        await update_user(db, user)
+        await update_user(db, db_obj=user, obj_in={})
+        await store_oauth_tokens(db, user.id, "slack", token_data)
+        await metadata_cache.invalidate(user.id, "slack")
         
         return {"message": "Slack integration successful"}
     except Exception as e:
@@ -87,8 +102,13 @@ async def google_callback(
             )
         
         # Get user info from Google
-        calendar_metadata = await google_oauth.get_calendar_metadata(token_data)
-        gmail_metadata = await google_oauth.get_gmail_metadata(token_data)
+        # A new grant may be for another Google account, so start the sync state over
+        calendar_metadata = await _initial_sync("calendar", lambda: google_oauth.sync_calendar_metadata(
+            db, current_user.id, token_data, full_sync=True
+        ))
+        gmail_metadata = await _initial_sync("gmail", lambda: google_oauth.sync_gmail_metadata(
+            db, current_user.id, token_data, full_sync=True
+        ))
         
         if not calendar_metadata and not gmail_metadata:
             raise HTTPException(
@@ -99,7 +119,10 @@ async def google_callback(
         # Update user with Google info
         user = await get_user(db, current_user.id)
         user.google_user_id = token_data.get("user_id")
-        await update_user(db, user)
+        await update_user(db, db_obj=user, obj_in={})
+        await store_oauth_tokens(db, user.id, "google", token_data)
+        await metadata_cache.invalidate(user.id, "calendar", "gmail")
+        await google_oauth.watch_for_changes(token_data, push_channel_token(user.id))
         
         return {
             "message": "Google integration successful",
@@ -126,15 +149,21 @@ async def disconnect_provider(
         
         if provider == "slack":
             user.slack_user_id = None
+            await delete_oauth_tokens(db, user.id, "slack")
+            await metadata_cache.invalidate(user.id, "slack")
         elif provider == "google":
             user.google_user_id = None
+            await reset_calendar_sync_state(db, user.id)
+            await reset_gmail_sync_state(db, user.id)
+            await delete_oauth_tokens(db, user.id, "google")
+            await metadata_cache.invalidate(user.id, "calendar", "gmail")
         else:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid provider"
             )
         
-        await update_user(db, user)
+        await update_user(db, db_obj=user, obj_in={})
         return {"message": f"{provider.title()} integration disconnected"}
     except Exception as e:
         logger.error(f"Error disconnecting {provider}: {str(e)}")
@@ -1,5 +1,5 @@
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.security import verify_token
 from app.db.session import get_db
@@ -18,7 +18,10 @@ from app.crud.signal import (
     get_user_nudges,
     create_signal,
     create_nudge,
+    create_signals_bulk,
+    create_nudges_bulk,
     mark_nudge_as_read,
+    mark_all_nudges_as_read,
     get_signal,
     get_nudge,
     update_signal,
@@ -26,14 +29,38 @@ from app.crud.signal import (
     delete_signal,
     delete_nudge
 )
+from app.crud.pagination import decode_cursor, next_cursor
+from app.crud.integration import get_user_tokens
 from app.core.signals.engine import SignalEngine
+from app.core.signals.fetch import fetch_user_metadata
 import logging
 from datetime import datetime, timedelta
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Initialize signal engine
+def _owner_filter(current_user: User):
+    """Managers and admins may act on any row; everyone else only on their own"""
+    if current_user.role in [UserRole.MANAGER, UserRole.ADMIN]:
+        return None
+    return current_user.id
+
+# Listings return the cursor for the following page in this header,
+# keeping the response body a plain list for existing clients.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def _parse_cursor(cursor: Optional[str]):
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+# Initialize signal engine (picks up rules.yaml edits without a restart)
 signal_engine = SignalEngine()
 
 # Signal endpoints
@@ -42,20 +69,30 @@ async def get_my_signals(
     *,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(verify_token),
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None
 ) -> Any:
-    """Get current user's signals with optional date filtering"""
+    """Get current user's signals with optional date filtering.
+
+    Pass the X-Next-Cursor header of the previous page as ``cursor`` for
+    keyset pagination; ``skip`` still works for offset paging.
+    """
     signals = await get_user_signals(
         db,
         user_id=current_user.id,
         skip=skip,
         limit=limit,
         start_date=start_date,
-        end_date=end_date
+        end_date=end_date,
+        cursor=_parse_cursor(cursor)
     )
+    cursor_out = next_cursor(signals, limit)
+    if cursor_out:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_out
     return signals
 
 @router.get("/{signal_id}", response_model=SignalResponse)
@@ -126,22 +163,13 @@ async def delete_signal_by_id(
     current_user: User = Depends(verify_token),
     signal_id: str
 ) -> Any:
-    """Delete a signal"""
-    signal = await get_signal(db, signal_id=signal_id)
-    if not signal:
+    """Delete a signal (and its nudges) the current user may manage"""
+    deleted = await delete_signal(db, signal_id=signal_id, user_id=_owner_filter(current_user))
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Signal not found"
         )
-    
-    # Check if user has permission to delete this signal
-    if signal.user_id != current_user.id and current_user.role not in [UserRole.MANAGER, UserRole.ADMIN]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
-    
-    await delete_signal(db, signal_id=signal_id)
     return {"message": "Signal deleted successfully"}
 
 # Nudge endpoints
@@ -150,20 +178,36 @@ async def get_my_nudges(
     *,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(verify_token),
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     is_read: Optional[bool] = None
 ) -> Any:
-    """Get current user's nudges with optional read status filtering"""
+    """Get current user's nudges with optional read status filtering and keyset cursor"""
     nudges = await get_user_nudges(
         db,
         user_id=current_user.id,
         skip=skip,
         limit=limit,
-        is_read=is_read
+        is_read=is_read,
+        cursor=_parse_cursor(cursor)
     )
+    cursor_out = next_cursor(nudges, limit)
+    if cursor_out:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_out
     return nudges
 
+@router.post("/my/nudges/read-all")
+async def mark_my_nudges_read(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(verify_token)
+) -> Any:
+    """Mark all of the current user's unread nudges as read"""
+    count = await mark_all_nudges_as_read(db, user_id=current_user.id)
+    return {"message": "Nudges marked as read", "nudges_marked_read": count}
+
 @router.get("/nudges/{nudge_id}", response_model=NudgeResponse)
 async def get_nudge_by_id(
     *,
@@ -232,22 +276,13 @@ async def delete_nudge_by_id(
     current_user: User = Depends(verify_token),
     nudge_id: str
 ) -> Any:
-    """Delete a nudge"""
-    nudge = await get_nudge(db, nudge_id=nudge_id)
-    if not nudge:
+    """Delete a nudge the current user may manage"""
+    deleted = await delete_nudge(db, nudge_id=nudge_id, user_id=_owner_filter(current_user))
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Nudge not found"
         )
-    
-    # Check if user has permission to delete this nudge
-    if nudge.user_id != current_user.id and current_user.role not in [UserRole.MANAGER, UserRole.ADMIN]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
-    
-    await delete_nudge(db, nudge_id=nudge_id)
     return {"message": "Nudge deleted successfully"}
 
 @router.post("/nudges/{nudge_id}/read")
@@ -274,35 +309,31 @@ async def process_signals(
 ) -> Any:
     """Process signals for current user"""
     try:
-        # Get metadata from connected services
-        slack_metadata = None
-        calendar_metadata = None
-        gmail_metadata = None
-        
-        # TODO: Implement metadata fetching from connected services
+        # Get metadata from connected services, concurrently and with partial results
+        tokens = await get_user_tokens(db, current_user.id)
+        fetched = await fetch_user_metadata(current_user, tokens)
         
         # Process signals
         signals = await signal_engine.process_metadata(
             user=current_user,
-            slack_metadata=slack_metadata,
-            calendar_metadata=calendar_metadata,
-            gmail_metadata=gmail_metadata
+            slack_metadata=fetched.slack,
+            calendar_metadata=fetched.calendar,
+            gmail_metadata=fetched.gmail
         )
         
-        # Save signals and generate nudges
-        saved_signals = []
-        for signal in signals:
-            saved_signal = await create_signal(db, signal)
-            saved_signals.append(saved_signal)
-            
-            # Generate nudge if applicable
-            nudge = signal_engine.generate_nudge(saved_signal)
-            if nudge:
-                await create_nudge(db, nudge)
+        # Save signals and generate nudges in a single transaction
+        saved_signals = await create_signals_bulk(db, signals)
+        nudges = [
+            nudge for nudge in (signal_engine.generate_nudge(signal) for signal in saved_signals)
+            if nudge
+        ]
+        await create_nudges_bulk(db, nudges)
+        await db.commit()
         
         return {
             "message": "Signals processed successfully",
-            "signals_processed": len(saved_signals)
+            "signals_processed": len(saved_signals),
+            "sources": fetched.report()
         }
     except Exception as e:
         logger.error(f"Error processing signals: {str(e)}")
@@ -48,8 +48,14 @@ async def update_current_user(
                 detail="Email already registered"
             )
     
-    # Update user
-    updated_user = await update_user(db, db_obj=current_user, obj_in=user_in)
+    # current_user is a cached snapshot, so load the row to update it
+    user = await get_user_crud(db, id=current_user.id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    updated_user = await update_user(db, db_obj=user, obj_in=user_in)
     
     # Refresh the user object to include updated data and relationships (like team)
     await db.refresh(updated_user)
@@ -145,5 +151,5 @@ async def delete_user_by_id(
             detail="User not found"
         )
     
-    await delete_user(db, user_id=user_id)
+    await delete_user(db, id=user_id)
     return {"message": "User deleted successfully"} 
\ No newline at end of file
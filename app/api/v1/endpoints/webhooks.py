@@ -0,0 +1,97 @@
+from typing import Any, Optional
+from fastapi import APIRouter, HTTPException, Request, status
+from app.core.webhooks import (
+    SLACK_EVENT_FIELDS,
+    gmail_notification,
+    user_for_channel_token,
+    verify_push_token,
+    verify_slack_signature,
+    webhook_ingestor
+)
+import json
+import logging
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Providers retry on anything but 2xx, so these only verify, queue and
+# return; the work happens in the webhook consumer.
+
+def _queue_full() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Webhook queue is full"
+    )
+
+@router.post("/slack/events")
+async def slack_events(request: Request) -> Any:
+    """Slack Events API request URL"""
+    body = await request.body()
+    if not verify_slack_signature(
+        body, request.headers.get("X-Slack-Request-Timestamp"), request.headers.get("X-Slack-Signature")
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid Slack signature"
+        )
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid JSON"
+        )
+
+    if payload.get("type") == "url_verification":
+        return {"challenge": payload.get("challenge")}
+    if payload.get("type") == "event_callback":
+        event = payload.get("event") or {}
+        if not webhook_ingestor.submit(
+            "slack", {key: event.get(key) for key in SLACK_EVENT_FIELDS}, event_id=payload.get("event_id")
+        ):
+            raise _queue_full()
+    return {"ok": True}
+
+@router.post("/google/calendar")
+async def google_calendar_notification(request: Request) -> Any:
+    """Calendar events.watch channel address"""
+    user_id = user_for_channel_token(request.headers.get("X-Goog-Channel-Token"))
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid channel token"
+        )
+    # "sync" only confirms a new channel; "exists"/"not_exists" mean events changed
+    if request.headers.get("X-Goog-Resource-State") != "sync":
+        channel_id = request.headers.get("X-Goog-Channel-ID")
+        if not webhook_ingestor.submit(
+            "calendar",
+            {"user_id": user_id, "channel_id": channel_id},
+            event_id=f"calendar:{channel_id}:{request.headers.get('X-Goog-Message-Number')}"
+        ):
+            raise _queue_full()
+    return {"ok": True}
+
+@router.post("/google/gmail")
+async def gmail_push_notification(request: Request, token: Optional[str] = None) -> Any:
+    """Pub/Sub push endpoint for Gmail watch() notifications"""
+    if not verify_push_token(token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid push token"
+        )
+    try:
+        notification = gmail_notification(await request.json())
+    except ValueError:
+        notification = None
+    if notification is None:
+        # Acknowledge anyway; Pub/Sub would redeliver a malformed message forever
+        logger.warning("Ignoring malformed Gmail push notification")
+        return {"ok": True}
+    if not webhook_ingestor.submit(
+        "gmail",
+        {"emailAddress": notification["emailAddress"], "historyId": notification.get("historyId")},
+        event_id=f"gmail:{notification['message_id']}" if notification["message_id"] else None
+    ):
+        raise _queue_full()
+    return {"ok": True}
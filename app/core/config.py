@@ -13,6 +13,9 @@ class Settings(BaseSettings):
     # Security
     SECRET_KEY: str = secrets.token_urlsafe(32)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
+    BCRYPT_ROUNDS: int = 12  # Existing hashes are upgraded on next login when this changes
+    PASSWORD_HASH_WORKERS: Optional[int] = None  # Defaults to min(4, CPU count)
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Queued + running hashes before logins get 503
     
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "https://app.trytend.com.au", "https://www.app.trytend.com.au"]  # Include production URLs in default
@@ -40,16 +43,106 @@ class Settings(BaseSettings):
     SLACK_CLIENT_ID: str = ""
     SLACK_CLIENT_SECRET: str = ""
     SLACK_SIGNING_SECRET: str = ""
+    SLACK_API_BASE_URL: str = "https://www.slack.com/api/"  # Override e.g. for a local fake server
     
     GOOGLE_CLIENT_ID: str = ""
     GOOGLE_CLIENT_SECRET: str = ""
+    GOOGLE_SERVICE_CACHE_SIZE: int = 1024  # Built Google API services kept per process
+    GOOGLE_API_BASE_URL: Optional[str] = None  # Override the Google API root, e.g. for a local fake server
+    GOOGLE_TOKEN_URI: str = "https://oauth2.googleapis.com/token"  # Override e.g. for a local fake server
+    GMAIL_BATCH_SIZE: int = 50  # Requests per Gmail batch call (Gmail allows up to 100)
+    GMAIL_SYNC_INTERVAL_SECONDS: int = 300  # Serve Gmail counters without calling Google within this interval
+
+    # Shared outbound HTTP pools (see app/core/http_pool.py)
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 20  # Enforced on the aiohttp pool; httpx only caps the total
+    HTTP_KEEPALIVE_SECONDS: float = 30.0
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    HTTP_TIMEOUT_SECONDS: float = 15.0
+    HTTP2_ENABLED: bool = True  # Used when the h2 package is installed
+
+    # OAuth token store
+    TOKEN_ENCRYPTION_KEYS: str = ""  # Comma-separated Fernet keys, newest first; derived from SECRET_KEY if unset
+    TOKEN_REFRESH_ENABLED: bool = True
+    TOKEN_REFRESH_INTERVAL_SECONDS: int = 60  # Between refresher passes, +/- 20% jitter
+    TOKEN_REFRESH_MARGIN_SECONDS: int = 600  # Renew at least this long before expiry
+    TOKEN_REFRESH_JITTER_SECONDS: int = 300  # Spread renewals over this much extra lead time
+    TOKEN_REFRESH_BATCH_SIZE: int = 100
+    TOKEN_REFRESH_CONCURRENCY: int = 10
+    TOKEN_REFRESH_RETRY_SECONDS: int = 60  # First retry after a transient failure, doubling per failure
+
+    # Webhook ingestion (Slack Events API, Google push notifications)
+    SLACK_REQUEST_MAX_AGE_SECONDS: int = 300  # Older signed requests are rejected as replays
+    GOOGLE_PUSH_TOKEN: str = ""  # Shared secret in the Gmail Pub/Sub push subscription URL (?token=...)
+    GMAIL_PUSH_TOPIC: Optional[str] = None  # Pub/Sub topic for Gmail watch(); push is off when unset
+    CALENDAR_PUSH_ENABLED: bool = False  # Needs BACKEND_URL to be a verified HTTPS domain
+    WEBHOOK_QUEUE_SIZE: int = 10000  # Events waiting for the consumer before webhooks answer 503
+    WEBHOOK_BATCH_SIZE: int = 100
+    WEBHOOK_SYNC_CONCURRENCY: int = 10  # Concurrent Google syncs triggered by push notifications
+
+    # Per-provider limits for one user's metadata fetch
+    SLACK_FETCH_TIMEOUT_SECONDS: float = 10.0
+    CALENDAR_FETCH_TIMEOUT_SECONDS: float = 15.0
+    GMAIL_FETCH_TIMEOUT_SECONDS: float = 15.0
+
+    # Per-provider bulkheads and circuit breakers (see app/core/oauth/resilience.py)
+    SLACK_MAX_CONCURRENCY: int = 20
+    CALENDAR_MAX_CONCURRENCY: int = 20
+    GMAIL_MAX_CONCURRENCY: int = 20
+    PROVIDER_BULKHEAD_WAIT_SECONDS: float = 0.5  # Longest wait for a free slot before failing fast
+    SLACK_LATENCY_SLO_MS: float = 5000  # Slower successful fetches count as failures
+    CALENDAR_LATENCY_SLO_MS: float = 8000
+    GMAIL_LATENCY_SLO_MS: float = 8000
+    CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive failures that open a circuit
+    CIRCUIT_RESET_SECONDS: float = 30.0  # Open time before half-open probes
+    CIRCUIT_HALF_OPEN_PROBES: int = 1
     
-    # Redis (for Celery)
+    # Redis (for Celery and the shared metadata cache)
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
+
+    # Celery (see app/tasks); broker and result backend default to Redis above
+    CELERY_BROKER_URL: Optional[str] = None  # e.g. "memory://" for a local in-process broker
+    CELERY_RESULT_BACKEND: Optional[str] = None  # e.g. "cache+memory://"; chords need a result backend
+    CELERY_TASK_ALWAYS_EAGER: bool = False  # Run tasks inline without a worker, e.g. in tests
+    SIGNAL_PROCESSING_INTERVAL_SECONDS: int = 3600  # Beat schedule for org-wide processing
+    SIGNAL_CHUNK_SIZE: int = 50  # Users per processing task
+    SIGNAL_CHUNK_SOFT_TIME_LIMIT_SECONDS: int = 300
+    SIGNAL_CHUNK_TIME_LIMIT_SECONDS: int = 360
+    TEAM_METRICS_TIME_LIMIT_SECONDS: int = 120
+    TEAM_METRICS_MIN_MEMBERS: int = 3  # Smaller teams get no metrics, so no one is identifiable
+
+    # Postgres job queue and worker (python -m app.worker), an alternative to Celery without Redis
+    WORKER_CONCURRENCY: int = 4  # Jobs run at once per worker process
+    WORKER_SHUTDOWN_GRACE_SECONDS: int = 30  # Running jobs still unfinished after this are put back
+    JOB_POLL_INTERVAL_SECONDS: float = 2.0
+    JOB_LEASE_SECONDS: int = 60  # Renewed every third of this; a lapsed lease hands the job to another worker
+    JOB_TIMEOUT_SECONDS: int = 600  # Per attempt; signal chunks use SIGNAL_CHUNK_TIME_LIMIT_SECONDS
+    JOB_MAX_ATTEMPTS: int = 5  # Then the job is dead
+    JOB_RETRY_BASE_SECONDS: int = 30  # First retry after a failure, doubling per attempt
+    JOB_RETRY_MAX_SECONDS: int = 3600
+    JOB_RETENTION_DAYS: int = 7  # Done and dead jobs are kept this long
+    RETENTION_PURGE_INTERVAL_SECONDS: int = 86400
+
+    # Provider metadata cache: "memory" (per process) or "redis" (shared); a TTL of 0 disables caching
+    METADATA_CACHE_BACKEND: str = "memory"
+    METADATA_CACHE_MAX_SIZE: int = 10000
+    SLACK_METADATA_TTL_SECONDS: int = 300
+    CALENDAR_METADATA_TTL_SECONDS: int = 300
+    GMAIL_METADATA_TTL_SECONDS: int = 300
+    METADATA_STALE_TTL_SECONDS: int = 86400  # Last good value, served while a provider's circuit is open
+    
+    # Authenticated-user cache used by verify_token (0 disables it)
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10000
+    
+    # Signal sweep (defaults to one worker per CPU, four shards per worker)
+    SWEEP_PROCESSES: Optional[int] = None
+    SWEEP_SHARDS: Optional[int] = None
     
     # Privacy Settings
     DATA_RETENTION_DAYS: int = 90
+    PARTITION_MONTHS_AHEAD: int = 2  # Monthly signal/nudge partitions created ahead of time
     ANONYMIZATION_SALT: str = secrets.token_urlsafe(32)
     
     # Initial User Settings
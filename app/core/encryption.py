@@ -0,0 +1,41 @@
+"""Encryption of OAuth tokens at rest.
+
+Tokens are Fernet-encrypted (AES-128-CBC plus HMAC) with the keys in
+TOKEN_ENCRYPTION_KEYS, newest first: values are written with the first
+key and read with any of them, so a key is rotated by prepending a new
+one and dropping the old one once rows have been rewritten. Without the
+setting a key is derived from SECRET_KEY, which only suits development
+since SECRET_KEY itself defaults to a random value per process.
+"""
+from typing import Optional
+from functools import lru_cache
+import base64
+import hashlib
+import logging
+from cryptography.fernet import Fernet, MultiFernet, InvalidToken
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+@lru_cache()
+def token_cipher() -> MultiFernet:
+    keys = [key.strip() for key in settings.TOKEN_ENCRYPTION_KEYS.split(",") if key.strip()]
+    if not keys:
+        logger.warning("TOKEN_ENCRYPTION_KEYS is not set; deriving the token key from SECRET_KEY")
+        keys = [base64.urlsafe_b64encode(hashlib.sha256(settings.SECRET_KEY.encode()).digest()).decode()]
+    return MultiFernet([Fernet(key) for key in keys])
+
+def encrypt_token(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    return token_cipher().encrypt(value.encode()).decode()
+
+def decrypt_token(value: Optional[str]) -> Optional[str]:
+    """Plaintext of a stored token, or ``None`` if no configured key can read it"""
+    if value is None:
+        return None
+    try:
+        return token_cipher().decrypt(value.encode()).decode()
+    except InvalidToken:
+        logger.error("Stored token could not be decrypted with any configured key")
+        return None
@@ -0,0 +1,142 @@
+"""Application-wide HTTP connection pools.
+
+One ``httpx.AsyncClient`` (token exchanges and plain provider calls) and
+one ``aiohttp.ClientSession`` (slack_sdk's AsyncWebClient) are opened in
+the app lifespan and shared by every integration, so requests to the
+same host reuse kept-alive connections instead of paying TCP and TLS
+setup each time. HTTP/2 is negotiated by httpx when the ``h2`` package
+is installed.
+
+Both are bound to the event loop they were opened on. Code running on
+another loop (sweep workers, scripts, tests without the lifespan) gets
+a short-lived client instead, counted as a fallback in ``stats()``.
+"""
+from typing import Dict, Any, Optional, AsyncIterator
+from contextlib import asynccontextmanager
+from collections import Counter
+import asyncio
+import importlib.util
+import logging
+import aiohttp
+import httpx
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(settings.HTTP_TIMEOUT_SECONDS, connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS)
+
+def _http2() -> bool:
+    return settings.HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+
+def _httpx_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=_http2(),
+        timeout=_timeout(),
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_SECONDS
+        )
+    )
+
+class HTTPPool:
+    """Lifespan-managed shared HTTP clients"""
+
+    def __init__(self):
+        self._httpx: Optional[httpx.AsyncClient] = None
+        self._aiohttp: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.requests = Counter()
+        self.fallbacks = Counter()
+
+    async def start(self) -> None:
+        if self._loop is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._httpx = _httpx_client()
+        self._aiohttp = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=settings.HTTP_MAX_CONNECTIONS,
+                limit_per_host=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+                keepalive_timeout=settings.HTTP_KEEPALIVE_SECONDS
+            ),
+            timeout=aiohttp.ClientTimeout(
+                total=settings.HTTP_TIMEOUT_SECONDS, sock_connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS
+            )
+        )
+        logger.info(f"Opened shared HTTP pools (http2={_http2()})")
+
+    async def close(self) -> None:
+        if self._loop is None:
+            return
+        await self._httpx.aclose()
+        await self._aiohttp.close()
+        self._httpx = self._aiohttp = self._loop = None
+
+    def _on_loop(self) -> bool:
+        try:
+            return self._loop is not None and asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    @asynccontextmanager
+    async def client(self, name: str = "default") -> AsyncIterator[httpx.AsyncClient]:
+        """The shared httpx client, or a one-off client off the app's loop"""
+        if self._on_loop():
+            self.requests[name] += 1
+            yield self._httpx
+            return
+        self.fallbacks[name] += 1
+        async with _httpx_client() as client:
+            yield client
+
+    def session(self, name: str = "default") -> Optional[aiohttp.ClientSession]:
+        """The shared aiohttp session, or ``None`` (the caller opens its own) off the app's loop"""
+        if self._on_loop():
+            self.requests[name] += 1
+            return self._aiohttp
+        self.fallbacks[name] += 1
+        return None
+
+    def _httpx_stats(self) -> Dict[str, Any]:
+        pool = self._httpx._transport._pool
+        connections = list(pool.connections)
+        return {
+            "http2": _http2(),
+            "max_connections": settings.HTTP_MAX_CONNECTIONS,
+            "connections": len(connections),
+            "idle": sum(1 for connection in connections if connection.is_idle()),
+            "http2_connections": sum(
+                1 for connection in connections if "HTTP/2" in connection.info()
+            )
+        }
+
+    def _aiohttp_stats(self) -> Dict[str, Any]:
+        connector = self._aiohttp.connector
+        idle = {str(key.host): len(conns) for key, conns in connector._conns.items() if conns}
+        return {
+            "limit": connector.limit,
+            "limit_per_host": connector.limit_per_host,
+            "in_use": len(connector._acquired),
+            "idle": sum(idle.values()),
+            "idle_by_host": idle
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "open": self._loop is not None,
+            "keepalive_seconds": settings.HTTP_KEEPALIVE_SECONDS,
+            "requests": dict(self.requests),
+            "fallbacks": dict(self.fallbacks)
+        }
+        if self._loop is not None:
+            try:
+                stats["httpx"] = self._httpx_stats()
+                stats["aiohttp"] = self._aiohttp_stats()
+            except AttributeError as e:
+                # Pool internals moved in a newer httpx/aiohttp; keep the counters
+                logger.warning(f"HTTP pool stats unavailable: {str(e)}")
+        return stats
+
+http_pool = HTTPPool()
@@ -0,0 +1,266 @@
+"""Cache of provider metadata in front of the Slack and Google fetchers.
+
+Entries are keyed by provider and user and expire after the provider's
+TTL. Concurrent misses for the same key are coalesced: the first caller
+starts the upstream fetch and everyone else awaits the same task, so a
+dashboard load, a sweep and a manual /signals/process overlapping for one
+user cost one upstream call. The fetch runs as its own task, so a caller
+that gives up (e.g. on its timeout) does not cancel it for the others,
+and its result still lands in the cache.
+
+Each value is also kept as a "stale" copy for ``stale_ttl``, the last good
+value served while a provider's circuit breaker is open.
+
+``update`` changes a cached value in place without extending its expiry,
+e.g. to fold in activity a webhook reported; the value is still replaced
+by a real fetch once it expires.
+
+The ``memory`` backend is per process; the ``redis`` backend shares
+entries between workers through REDIS_HOST/REDIS_PORT. Coalescing is
+per process either way. Redis connections belong to the event loop that
+opened them, so the backend keeps one client per loop; Celery tasks and
+sweep shards each run their own.
+"""
+from typing import Dict, Any, Optional, Callable, Awaitable, Tuple
+from collections import OrderedDict
+import asyncio
+import json
+import logging
+import threading
+import time
+from weakref import WeakKeyDictionary
+from redis.asyncio import Redis
+from redis.exceptions import WatchError
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class MemoryBackend:
+    """Bounded in-process LRU with per-entry expiry"""
+    name = "memory"
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    async def update(self, key: str, change: Callable[[Dict[str, Any]], Dict[str, Any]]) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                return False
+            self._entries[key] = (change(entry[0]), entry[1])
+            return True
+
+    async def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def size(self) -> Optional[int]:
+        return len(self._entries)
+
+class RedisBackend:
+    """Entries as JSON strings with a Redis expiry, shared by every worker"""
+    name = "redis"
+
+    def __init__(self, host: str, port: int, prefix: str = "tend:metadata:"):
+        self.prefix = prefix
+        self.host = host
+        self.port = port
+        self._clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, Redis]" = WeakKeyDictionary()
+
+    @property
+    def _redis(self) -> Redis:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._clients[loop] = Redis(host=self.host, port=self.port)
+        return client
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = await self._redis.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        await self._redis.set(self.prefix + key, json.dumps(value, default=str), ex=max(1, int(ttl)))
+
+    async def update(self, key: str, change: Callable[[Dict[str, Any]], Dict[str, Any]]) -> bool:
+        """Read-modify-write under WATCH, so concurrent updates from other workers are not lost"""
+        name = self.prefix + key
+        async with self._redis.pipeline() as pipe:
+            while True:
+                try:
+                    await pipe.watch(name)
+                    value = await pipe.get(name)
+                    if value is None:
+                        return False
+                    pipe.multi()
+                    pipe.set(name, json.dumps(change(json.loads(value)), default=str), xx=True, keepttl=True)
+                    return bool((await pipe.execute())[0])
+                except WatchError:
+                    continue
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(self.prefix + key)
+
+    def size(self) -> Optional[int]:
+        return None
+
+class MetadataCache:
+    """Provider metadata by (provider, user) with TTLs and single-flight fetches"""
+
+    def __init__(self, backend, ttls: Dict[str, float], stale_ttl: float = 0):
+        self.backend = backend
+        self.ttls = ttls
+        self.stale_ttl = stale_ttl
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.stale_served = 0
+        self.backend_errors = 0
+
+    @staticmethod
+    def key(provider: str, user_id: Any) -> str:
+        return f"{provider}:{user_id}"
+
+    async def _lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            return await self.backend.get(key)
+        except Exception as e:
+            # A cache outage must not take the fetch path down with it
+            self.backend_errors += 1
+            logger.warning(f"Metadata cache get failed: {str(e)}")
+            return None
+
+    async def _store(self, key: str, provider: str, value: Dict[str, Any]) -> None:
+        if self.ttls.get(provider, 0) <= 0:
+            return
+        try:
+            await self.backend.set(key, value, self.ttls[provider])
+            if self.stale_ttl > 0:
+                await self.backend.set(f"stale:{key}", value, self.stale_ttl)
+        except Exception as e:
+            self.backend_errors += 1
+            logger.warning(f"Metadata cache set failed: {str(e)}")
+
+    async def _fetch_and_store(
+        self, key: str, provider: str, fetch: Callable[[], Awaitable[Optional[Dict[str, Any]]]]
+    ) -> Optional[Dict[str, Any]]:
+        try:
+            value = await fetch()
+            if value is not None:
+                await self._store(key, provider, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    async def get_or_fetch(
+        self, provider: str, user_id: Any, fetch: Callable[[], Awaitable[Optional[Dict[str, Any]]]]
+    ) -> Tuple[Optional[Dict[str, Any]], str]:
+        """Cached value or the result of ``fetch``, with how it was served: hit, miss or coalesced.
+
+        Failed fetches (``None``) are not cached.
+        """
+        key = self.key(provider, user_id)
+        value = await self._lookup(key)
+        if value is not None:
+            self.hits += 1
+            return value, "hit"
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task), "coalesced"
+
+        self.misses += 1
+        task = self._inflight[key] = asyncio.create_task(self._fetch_and_store(key, provider, fetch))
+        # Every caller may have given up by the time it fails; don't warn about an unretrieved exception
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        return await asyncio.shield(task), "miss"
+
+    async def put(self, provider: str, user_id: Any, value: Dict[str, Any]) -> None:
+        """Store freshly synced metadata, e.g. after a push notification"""
+        await self._store(self.key(provider, user_id), provider, value)
+
+    async def update(
+        self, provider: str, user_id: Any, change: Callable[[Dict[str, Any]], Dict[str, Any]]
+    ) -> bool:
+        """Apply ``change`` to the cached and stale values, keeping their expiry; False if nothing is cached"""
+        key = self.key(provider, user_id)
+        try:
+            updated = await self.backend.update(key, change)
+            if self.stale_ttl > 0:
+                await self.backend.update(f"stale:{key}", change)
+            return updated
+        except Exception as e:
+            self.backend_errors += 1
+            logger.warning(f"Metadata cache update failed: {str(e)}")
+            return False
+
+    async def get_stale(self, provider: str, user_id: Any) -> Optional[Dict[str, Any]]:
+        """Last good value within ``stale_ttl``, for when the provider cannot be asked"""
+        value = await self._lookup(f"stale:{self.key(provider, user_id)}")
+        if value is not None:
+            self.stale_served += 1
+        return value
+
+    async def invalidate(self, user_id: Any, *providers: str) -> None:
+        """Drop a user's entries, e.g. after disconnecting a provider"""
+        for provider in providers or tuple(self.ttls):
+            try:
+                await self.backend.delete(self.key(provider, user_id))
+                await self.backend.delete(f"stale:{self.key(provider, user_id)}")
+            except Exception as e:
+                self.backend_errors += 1
+                logger.warning(f"Metadata cache delete failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "backend": self.backend.name,
+            "size": self.backend.size(),
+            "ttl_seconds": self.ttls,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "stale_served": self.stale_served,
+            # Coalesced callers were served without their own upstream call too
+            "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            "inflight": len(self._inflight),
+            "backend_errors": self.backend_errors
+        }
+
+def _backend():
+    if settings.METADATA_CACHE_BACKEND == "redis":
+        return RedisBackend(settings.REDIS_HOST, settings.REDIS_PORT)
+    return MemoryBackend(maxsize=settings.METADATA_CACHE_MAX_SIZE)
+
+metadata_cache = MetadataCache(
+    _backend(),
+    ttls={
+        "slack": settings.SLACK_METADATA_TTL_SECONDS,
+        "calendar": settings.CALENDAR_METADATA_TTL_SECONDS,
+        "gmail": settings.GMAIL_METADATA_TTL_SECONDS
+    },
+    stale_ttl=settings.METADATA_STALE_TTL_SECONDS
+)
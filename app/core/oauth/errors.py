@@ -0,0 +1,18 @@
+class TokenRefreshError(Exception):
+    """A provider refused or failed to renew an access token.
+
+    ``permanent`` means the grant itself is gone (revoked or expired) and
+    retrying cannot help; the user has to reconnect.
+    """
+
+    def __init__(self, message: str, permanent: bool = False):
+        super().__init__(message)
+        self.permanent = permanent
+
+class ProviderUserError(Exception):
+    """A provider refused a call because of one user's grant or data.
+
+    Invalid or revoked tokens, missing scopes and the like say nothing
+    about the provider's health, so circuit breakers let these through
+    without counting them as failures.
+    """
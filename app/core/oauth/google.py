@@ -1,13 +1,301 @@
-from typing import Optional, Dict, Any, List
-from google.oauth2.credentials import Credentials
+from typing import Optional, Dict, Any, List, Tuple
 from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
-from datetime import datetime, timedelta
+from google.auth.exceptions import RefreshError
+from googleapiclient.errors import HttpError
+from datetime import datetime, timedelta, timezone
 from app.core.config import settings
+from app.core.http_pool import http_pool
+from app.core.oauth.errors import ProviderUserError, TokenRefreshError
+from app.core.oauth.google_clients import google_services
+from app.core.signals.window import AFTER_HOURS_START
+from app.crud.integration import (
+    get_calendar_sync_state, save_calendar_sync_state,
+    get_gmail_sync_state, save_gmail_sync, get_gmail_window_counts
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID, uuid4
+import asyncio
 import logging
+import httpx
 
 logger = logging.getLogger(__name__)
 
+GOOGLE_SCOPES = [
+    "https://www.googleapis.com/auth/calendar.readonly",
+    "https://www.googleapis.com/auth/gmail.metadata"
+]
+GMAIL_LIST_PAGE_SIZE = 500  # Largest page messages.list allows
+# Only what the daily counters need; no headers or content
+GMAIL_MESSAGE_FIELDS = "id,threadId,internalDate"
+GMAIL_BATCH_RETRIES = 1
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+GMAIL_WINDOW_DAYS = 7
+GMAIL_HISTORY_TYPES = ["messageAdded", "messageDeleted"]
+GMAIL_SKIPPED_LABELS = {"SPAM", "TRASH"}  # messages.list leaves these out too
+CALENDAR_WINDOW_DAYS = 7
+# How far past now a full sync indexes; recurring instances beyond it are left out until the next full sync
+CALENDAR_HORIZON_DAYS = 7
+CALENDAR_PAGE_SIZE = 2500  # Largest page events.list allows
+# Only what the event index needs; keeps titles, attendees etc. off the wire
+CALENDAR_EVENT_FIELDS = "items(id,status,start,end),nextPageToken,nextSyncToken"
+
+def _user_error(e: Exception) -> bool:
+    """Whether a failed Google call is one user's problem (e.g. invalid_grant, 401, 403) rather than Google's"""
+    if isinstance(e, HttpError):
+        status = getattr(e.resp, "status", None)
+        if status is None or status in RETRYABLE_STATUSES or status >= 500:
+            return False
+        # Quota errors arrive as 403s but are Google throttling the app
+        return b"ateLimitExceeded" not in (e.content or b"")
+    if isinstance(e, RefreshError):
+        return not getattr(e, "retryable", False)
+    return False
+
+def _list_messages(service, query: str) -> List[Dict[str, Any]]:
+    """Every message (id, threadId) matching ``query``, following nextPageToken"""
+    messages = []
+    page_token = None
+    while True:
+        response = service.users().messages().list(
+            userId="me",
+            q=query,
+            maxResults=GMAIL_LIST_PAGE_SIZE,
+            pageToken=page_token
+        ).execute()
+        messages.extend(response.get("messages", []))
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return messages
+
+def _batch_get_messages(service, message_ids: List[str], **params) -> Tuple[List[Dict[str, Any]], int]:
+    """Fetch messages.get(**params) for each id with batch requests of GMAIL_BATCH_SIZE.
+
+    Items failing with a retryable status are retried in a later batch;
+    returns the fetched messages and the number that still failed.
+    """
+    fetched: Dict[str, Dict[str, Any]] = {}
+    pending = list(message_ids)
+    failed = 0
+    for attempt in range(GMAIL_BATCH_RETRIES + 1):
+        retry = []
+
+        def callback(request_id: str, response: Dict[str, Any], exception: Optional[HttpError]) -> None:
+            nonlocal failed
+            if exception is None:
+                fetched[request_id] = response
+            elif getattr(exception.resp, "status", None) in RETRYABLE_STATUSES and attempt < GMAIL_BATCH_RETRIES:
+                retry.append(request_id)
+            else:
+                logger.warning(f"Failed to fetch Gmail message {request_id}: {str(exception)}")
+                failed += 1
+
+        for start in range(0, len(pending), settings.GMAIL_BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=callback)
+            for message_id in pending[start:start + settings.GMAIL_BATCH_SIZE]:
+                batch.add(
+                    service.users().messages().get(userId="me", id=message_id, **params),
+                    request_id=message_id
+                )
+            batch.execute()
+        if not retry:
+            break
+        pending = retry
+    return [fetched[message_id] for message_id in message_ids if message_id in fetched], failed
+
+def _list_history(service, start_history_id: str) -> Tuple[Dict[str, str], set, str]:
+    """Messages added and deleted since ``start_history_id``.
+
+    Returns ``{message_id: thread_id}`` of surviving additions, the deleted
+    ids and the new checkpoint. Raises HttpError 404 when the checkpoint is
+    too old for the History API.
+    """
+    added: Dict[str, str] = {}
+    deleted = set()
+    page_token = None
+    while True:
+        response = service.users().history().list(
+            userId="me",
+            startHistoryId=start_history_id,
+            historyTypes=GMAIL_HISTORY_TYPES,
+            pageToken=page_token
+        ).execute()
+        for record in response.get("history", []):
+            for change in record.get("messagesAdded", []):
+                message = change["message"]
+                if GMAIL_SKIPPED_LABELS.intersection(message.get("labelIds", [])):
+                    continue
+                added[message["id"]] = message.get("threadId")
+                deleted.discard(message["id"])
+            for change in record.get("messagesDeleted", []):
+                added.pop(change["message"]["id"], None)
+                deleted.add(change["message"]["id"])
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return added, deleted, response["historyId"]
+
+def _message_day(message: Dict[str, Any]) -> str:
+    """UTC day a message was received, from its internalDate (epoch ms)"""
+    return datetime.fromtimestamp(int(message["internalDate"]) / 1000, timezone.utc).date().isoformat()
+
+def _gmail_changes(
+    credentials_dict: Dict[str, Any], history_id: Optional[str], known_ids: set, window_start
+) -> Tuple[Dict[str, str], set, str, Dict[str, str], bool]:
+    """Gmail changes since ``history_id``, or the whole window without one.
+
+    Returns added ``{message_id: thread_id}``, deleted ids, the new
+    checkpoint, the day of each new message that could be fetched and
+    whether this was a full sync.
+    """
+    service = google_services.service("gmail", "v1", credentials_dict)
+    if history_id:
+        try:
+            added, deleted, new_history_id = _list_history(service, history_id)
+        except HttpError as e:
+            if getattr(e.resp, "status", None) != 404:
+                raise
+            logger.info("Gmail history checkpoint expired, running a full sync")
+            history_id = None
+    if not history_id:
+        # Take the checkpoint first so nothing arriving during the listing is missed
+        new_history_id = service.users().getProfile(userId="me").execute()["historyId"]
+        after = int(datetime.combine(window_start, datetime.min.time(), timezone.utc).timestamp())
+        added = {m["id"]: m.get("threadId") for m in _list_messages(service, f"after:{after}")}
+        deleted = set()
+        known_ids = set()
+
+    new_ids = [message_id for message_id in added if message_id not in known_ids]
+    fetched, _ = _batch_get_messages(service, new_ids, format="minimal", fields=GMAIL_MESSAGE_FIELDS)
+    days = {message["id"]: _message_day(message) for message in fetched}
+    return added, deleted, new_history_id, days, not history_id
+
+def gmail_day_threads(messages: Dict[str, Any], days) -> Dict[Any, List[str]]:
+    """Thread id of every indexed message on each of ``days``"""
+    day_threads = {datetime.fromisoformat(day).date(): [] for day in days}
+    for day, thread_id in messages.values():
+        if day in days:
+            day_threads[datetime.fromisoformat(day).date()].append(thread_id)
+    return day_threads
+
+def _list_calendar_changes(
+    service, sync_token: Optional[str], time_min: datetime, time_max: datetime
+) -> Tuple[List[Dict[str, Any]], Optional[str], int]:
+    """Events changed since ``sync_token``, or every event between ``time_min`` and ``time_max`` without one.
+
+    Returns the events, the nextSyncToken and the number of API calls.
+    Raises HttpError 410 when the sync token has expired.
+    """
+    params = {
+        "calendarId": "primary",
+        "singleEvents": True,
+        "maxResults": CALENDAR_PAGE_SIZE,
+        "fields": CALENDAR_EVENT_FIELDS
+    }
+    if sync_token:
+        params["syncToken"] = sync_token
+    else:
+        params["timeMin"] = time_min.isoformat().replace("+00:00", "Z")
+        # singleEvents expands recurring events, which would otherwise list every future instance
+        params["timeMax"] = time_max.isoformat().replace("+00:00", "Z")
+    items, calls, page_token = [], 0, None
+    while True:
+        response = service.events().list(pageToken=page_token, **params).execute()
+        calls += 1
+        items.extend(response.get("items", []))
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return items, response.get("nextSyncToken"), calls
+
+def _watch(credentials_dict: Dict[str, Any], channel_token: str) -> Dict[str, bool]:
+    """Register push notifications for the user's calendar and mailbox, where configured"""
+    watching = {}
+    if settings.CALENDAR_PUSH_ENABLED:
+        service = google_services.service("calendar", "v3", credentials_dict)
+        service.events().watch(calendarId="primary", body={
+            "id": str(uuid4()),
+            "type": "web_hook",
+            "address": f"{settings.BACKEND_URL}{settings.API_V1_STR}/webhooks/google/calendar",
+            "token": channel_token
+        }).execute()
+        watching["calendar"] = True
+    if settings.GMAIL_PUSH_TOPIC:
+        service = google_services.service("gmail", "v1", credentials_dict)
+        service.users().watch(userId="me", body={"topicName": settings.GMAIL_PUSH_TOPIC}).execute()
+        watching["gmail"] = True
+    return watching
+
+def _calendar_changes(
+    credentials_dict: Dict[str, Any], sync_token: Optional[str], time_min: datetime, time_max: datetime
+) -> Tuple[List[Dict[str, Any]], Optional[str], int, Optional[str]]:
+    """_list_calendar_changes, falling back to a full sync when the token has expired.
+
+    Also returns the sync token actually used (None for a full sync).
+    """
+    service = google_services.service("calendar", "v3", credentials_dict)
+    try:
+        items, next_sync_token, calls = _list_calendar_changes(service, sync_token, time_min, time_max)
+    except HttpError as e:
+        if not sync_token or getattr(e.resp, "status", None) != 410:
+            raise
+        # Sync token expired or invalidated: start over with a full sync
+        logger.info("Calendar sync token expired, running a full sync")
+        sync_token = None
+        items, next_sync_token, calls = _list_calendar_changes(service, None, time_min, time_max)
+    return items, next_sync_token, calls, sync_token
+
+def _parse_event_time(value: str) -> datetime:
+    """Calendar dateTime or all-day date as an aware datetime (all-day dates in UTC)"""
+    if len(value) == 10:
+        return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+def apply_calendar_changes(events: Dict[str, Any], items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Apply events.list results to an index of ``{event_id: [start, end, all_day]}``"""
+    for item in items:
+        if item.get("status") == "cancelled" or "start" not in item:
+            events.pop(item["id"], None)
+            continue
+        all_day = "date" in item["start"]
+        events[item["id"]] = [
+            item["start"].get("dateTime", item["start"].get("date")),
+            item["end"].get("dateTime", item["end"].get("date")),
+            all_day
+        ]
+    return events
+
+def prune_calendar_events(events: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """Drop events that ended before the metrics window or start past the sync horizon"""
+    window_start = now - timedelta(days=CALENDAR_WINDOW_DAYS)
+    horizon = now + timedelta(days=CALENDAR_HORIZON_DAYS)
+    return {
+        event_id: event for event_id, event in events.items()
+        if _parse_event_time(event[1]) >= window_start and _parse_event_time(event[0]) < horizon
+    }
+
+def calendar_metrics(events: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """Meeting metrics for the last CALENDAR_WINDOW_DAYS from an event index"""
+    window_start = now - timedelta(days=CALENDAR_WINDOW_DAYS)
+    total_meetings = 0
+    total_duration = 0
+    after_hours_count = 0
+    for start_value, end_value, _ in events.values():
+        start = _parse_event_time(start_value)
+        end = _parse_event_time(end_value)
+        # Same overlap rule as events.list with timeMin/timeMax
+        if end <= window_start or start >= now:
+            continue
+        total_meetings += 1
+        total_duration += (end - start).total_seconds() / 3600  # hours
+        
+        # Check if meeting is after hours (in the event's own time zone)
+        if start.hour >= AFTER_HOURS_START:
+            after_hours_count += 1
+    return {
+        "total_meetings": total_meetings,
+        "total_duration_hours": total_duration,
+        "after_hours_meetings": after_hours_count,
+        "average_duration_hours": total_duration / total_meetings if total_meetings else 0
+    }
+
 class GoogleOAuth:
     def __init__(self):
         self.client_id = settings.GOOGLE_CLIENT_ID
@@ -22,13 +310,10 @@ class GoogleOAuth:
                     "client_id": self.client_id,
                     "client_secret": self.client_secret,
                     "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                    "token_uri": "https://oauth2.googleapis.com/token",
+                    "token_uri": settings.GOOGLE_TOKEN_URI,
                 }
             },
-            scopes=[
-                "https://www.googleapis.com/auth/calendar.readonly",
-                "https://www.googleapis.com/auth/gmail.metadata"
-            ]
+            scopes=GOOGLE_SCOPES
         )
         flow.redirect_uri = self.redirect_uri
         return flow.authorization_url(
@@ -40,112 +325,194 @@ class GoogleOAuth:
     async def exchange_code(self, code: str) -> Optional[Dict[str, Any]]:
         """Exchange OAuth code for access token"""
         try:
-            flow = Flow.from_client_config(
-                {
-                    "web": {
-                        "client_id": self.client_id,
-                        "client_secret": self.client_secret,
-                        "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                        "token_uri": "https://oauth2.googleapis.com/token",
-                    }
-                },
-                scopes=[
-                    "https://www.googleapis.com/auth/calendar.readonly",
-                    "https://www.googleapis.com/auth/gmail.metadata"
-                ]
-            )
-            flow.redirect_uri = self.redirect_uri
-            flow.fetch_token(code=code)
-            credentials = flow.credentials
+            async with http_pool.client("google") as client:
+                response = await client.post(settings.GOOGLE_TOKEN_URI, data={
+                    "client_id": self.client_id,
+                    "client_secret": self.client_secret,
+                    "code": code,
+                    "redirect_uri": self.redirect_uri,
+                    "grant_type": "authorization_code"
+                })
+            response.raise_for_status()
+            token = response.json()
+            expiry = None
+            if token.get("expires_in"):
+                expiry = (
+                    datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=int(token["expires_in"]))
+                ).isoformat(timespec="seconds") + "Z"
             return {
-                "access_token": credentials.token,
-                "refresh_token": credentials.refresh_token,
-                "token_uri": credentials.token_uri,
-                "client_id": credentials.client_id,
-                "client_secret": credentials.client_secret,
-                "scopes": credentials.scopes
+                "access_token": token["access_token"],
+                "token": token["access_token"],
+                "expiry": expiry,
+                "refresh_token": token.get("refresh_token"),
+                "token_uri": settings.GOOGLE_TOKEN_URI,
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+                "scopes": token["scope"].split() if token.get("scope") else GOOGLE_SCOPES
             }
         except Exception as e:
             logger.error(f"Error exchanging Google OAuth code: {str(e)}")
             return None
 
-    async def get_calendar_metadata(self, credentials_dict: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Get calendar metadata (no event details)"""
+    async def refresh_access_token(self, refresh_token: str) -> Dict[str, Any]:
+        """New access token for a stored refresh token; raises TokenRefreshError"""
+        try:
+            async with http_pool.client("google") as client:
+                response = await client.post(settings.GOOGLE_TOKEN_URI, data={
+                    "client_id": self.client_id,
+                    "client_secret": self.client_secret,
+                    "refresh_token": refresh_token,
+                    "grant_type": "refresh_token"
+                })
+        except httpx.HTTPError as e:
+            raise TokenRefreshError(f"Google token endpoint unreachable: {str(e)}")
+        if response.status_code != 200:
+            error = response.json().get("error") if "json" in response.headers.get("content-type", "") else None
+            # invalid_grant: the refresh token was revoked or has expired
+            raise TokenRefreshError(
+                f"Google token refresh failed with {response.status_code}: {error}",
+                permanent=error == "invalid_grant"
+            )
+        return response.json()
+
+    async def get_calendar_metadata(
+        self, credentials_dict: Dict[str, Any], sync_state: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Get calendar metadata (no event details).
+
+        ``sync_state`` holds ``sync_token`` and ``events`` from an earlier
+        call; with it only changed events are fetched. It is updated in
+        place (plus ``full_sync``) for the caller to persist. Raises
+        ProviderUserError when Google rejects this user's grant or request.
+        """
+        if sync_state is None:
+            sync_state = {}
         try:
-            credentials = Credentials.from_authorized_user_info(credentials_dict)
-            service = build("calendar", "v3", credentials=credentials)
-            
-            # Get events for the last 7 days
-            now = datetime.utcnow()
-            time_min = (now - timedelta(days=7)).isoformat() + "Z"
-            time_max = now.isoformat() + "Z"
-            
-            events_result = service.events().list(
-                calendarId="primary",
-                timeMin=time_min,
-                timeMax=time_max,
-                singleEvents=True,
-                orderBy="startTime"
-            ).execute()
-            
-            events = events_result.get("items", [])
-            
-            # Calculate meeting metrics
-            total_duration = 0
-            after_hours_count = 0
-            for event in events:
-                start = datetime.fromisoformat(event["start"].get("dateTime", event["start"].get("date")))
-                end = datetime.fromisoformat(event["end"].get("dateTime", event["end"].get("date")))
-                duration = (end - start).total_seconds() / 3600  # hours
-                total_duration += duration
-                
-                # Check if meeting is after hours (after 6 PM)
-                if start.hour >= 18:
-                    after_hours_count += 1
-            
+            now = datetime.now(timezone.utc)
+            time_min = now - timedelta(days=CALENDAR_WINDOW_DAYS)
+            time_max = now + timedelta(days=CALENDAR_HORIZON_DAYS)
+            events = dict(sync_state.get("events") or {})
+            # googleapiclient blocks, so the API calls run on a worker thread
+            items, next_sync_token, calls, sync_token = await asyncio.to_thread(
+                _calendar_changes, credentials_dict, sync_state.get("sync_token"), time_min, time_max
+            )
+            if not sync_token:
+                # A full sync lists everything, so it replaces the index
+                events = {}
+
+            events = prune_calendar_events(apply_calendar_changes(events, items), now)
+            sync_state.update(sync_token=next_sync_token, events=events, full_sync=not sync_token)
+
             return {
-                "total_meetings": len(events),
-                "total_duration_hours": total_duration,
-                "after_hours_meetings": after_hours_count,
-                "average_duration_hours": total_duration / len(events) if events else 0
+                **calendar_metrics(events, now),
+                "sync": "incremental" if sync_token else "full",
+                "events_changed": len(items),
+                "api_calls": calls
             }
         except Exception as e:
             logger.error(f"Error getting Google Calendar metadata: {str(e)}")
-            return None
+            if _user_error(e):
+                raise ProviderUserError(f"Google Calendar rejected the request: {str(e)}") from e
+            raise
 
-    async def get_gmail_metadata(self, credentials_dict: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Get Gmail metadata (no email content)"""
+    async def watch_for_changes(self, credentials_dict: Dict[str, Any], channel_token: str) -> Dict[str, bool]:
+        """Ask Google to push Calendar/Gmail change notifications to the webhooks"""
         try:
-            credentials = Credentials.from_authorized_user_info(credentials_dict)
-            service = build("gmail", "v1", credentials=credentials)
-            
-            # Get message list for the last 7 days
-            now = datetime.utcnow()
-            time_min = int((now - timedelta(days=7)).timestamp() * 1000)
-            
-            messages = service.users().messages().list(
-                userId="me",
-                q=f"after:{time_min}"
-            ).execute()
-            
-            message_list = messages.get("messages", [])
-            
-            # Get metadata for each message
-            metadata_list = []
-            for message in message_list[:100]:  # Limit to 100 messages
-                msg = service.users().messages().get(
-                    userId="me",
-                    id=message["id"],
-                    format="metadata",
-                    metadataHeaders=["From", "To", "Subject", "Date"]
-                ).execute()
-                metadata_list.append(msg)
-            
-            return {
-                "total_messages": len(message_list),
-                "messages_analyzed": len(metadata_list),
-                "thread_count": len(set(msg.get("threadId") for msg in metadata_list))
-            }
+            return await asyncio.to_thread(_watch, credentials_dict, channel_token)
         except Exception as e:
-            logger.error(f"Error getting Gmail metadata: {str(e)}")
-            return None 
\ No newline at end of file
+            # Polling still works without push
+            logger.error(f"Error registering Google push notifications: {str(e)}")
+            return {}
+
+    async def sync_calendar_metadata(
+        self, db: AsyncSession, user_id: UUID, credentials_dict: Dict[str, Any], *, full_sync: bool = False
+    ) -> Dict[str, Any]:
+        """Calendar metadata using and updating the user's stored sync state.
+
+        The index only reaches CALENDAR_HORIZON_DAYS past its last full sync,
+        so once that much time has passed the next sync is a full one.
+        """
+        sync_state = {}
+        if not full_sync:
+            state = await get_calendar_sync_state(db, user_id)
+            horizon = timedelta(days=CALENDAR_HORIZON_DAYS)
+            if state and state.last_full_sync_at and datetime.now(timezone.utc) - state.last_full_sync_at < horizon:
+                sync_state = {"sync_token": state.sync_token, "events": state.events}
+        metadata = await self.get_calendar_metadata(credentials_dict, sync_state)
+        await save_calendar_sync_state(
+            db,
+            user_id,
+            sync_token=sync_state["sync_token"],
+            events=sync_state["events"],
+            full_sync=sync_state["full_sync"]
+        )
+        return metadata
+
+    async def sync_gmail_metadata(
+        self, db: AsyncSession, user_id: UUID, credentials_dict: Dict[str, Any], *, full_sync: bool = False
+    ) -> Dict[str, Any]:
+        """Gmail message and thread counts from the user's daily counters.
+
+        Only additions and deletions since the stored historyId are pulled
+        and folded into the counters. Within GMAIL_SYNC_INTERVAL_SECONDS of
+        the last sync the counters are returned without calling Google.
+        """
+        now = datetime.now(timezone.utc)
+        window_start = now.date() - timedelta(days=GMAIL_WINDOW_DAYS - 1)
+        state = None if full_sync else await get_gmail_sync_state(db, user_id)
+        sync = "cached"
+        changed = 0
+        if state is None or state.history_id is None or state.last_synced_at is None \
+                or (now - state.last_synced_at).total_seconds() >= settings.GMAIL_SYNC_INTERVAL_SECONDS:
+            try:
+                messages = dict(state.messages) if state else {}
+                changed_days = set()
+                # googleapiclient blocks, so the API calls run on a worker thread
+                added, deleted, new_history_id, days, full = await asyncio.to_thread(
+                    _gmail_changes, credentials_dict, state.history_id if state else None, set(messages), window_start
+                )
+                if full:
+                    messages = {}
+                    sync = "full"
+                else:
+                    sync = "incremental"
+
+                # The day each new message arrived; failures count as today
+                new_ids = [message_id for message_id in added if message_id not in messages]
+                for message_id in new_ids:
+                    day = days.get(message_id, now.date().isoformat())
+                    messages[message_id] = [day, added[message_id]]
+                    changed_days.add(day)
+                for message_id in deleted:
+                    entry = messages.pop(message_id, None)
+                    if entry:
+                        changed_days.add(entry[0])
+                messages = {
+                    message_id: entry for message_id, entry in messages.items()
+                    if entry[0] >= window_start.isoformat()
+                }
+                changed = len(added) + len(deleted)
+
+                await save_gmail_sync(
+                    db,
+                    user_id,
+                    history_id=new_history_id,
+                    messages=messages,
+                    day_threads=gmail_day_threads(messages, changed_days),
+                    window_start=window_start,
+                    full_sync=sync == "full"
+                )
+            except Exception as e:
+                logger.error(f"Error syncing Gmail metadata: {str(e)}")
+                await db.rollback()
+                if _user_error(e):
+                    raise ProviderUserError(f"Gmail rejected the request: {str(e)}") from e
+                raise
+
+        total_messages, thread_count = await get_gmail_window_counts(db, user_id, window_start)
+        return {
+            "total_messages": total_messages,
+            "thread_count": thread_count,
+            "sync": sync,
+            "messages_changed": changed
+        }
@@ -0,0 +1,140 @@
+"""Reusable Google API service objects.
+
+``googleapiclient.discovery.build`` re-reads and re-parses the discovery
+document and creates a new HTTP transport on every call. The factory
+here parses each discovery document once per process and keeps built
+services in an LRU keyed by credential set, so repeat calls for the same
+user reuse the service and its kept-alive HTTP connections.
+
+Cached services wrap an ``httplib2.Http``, which is not thread-safe; use
+them from one thread at a time (the event loop thread, or one executor
+call at a time per user).
+"""
+from typing import Dict, Any, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+import httplib2
+import google_auth_httplib2
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+DISCOVERY_URL = "https://www.googleapis.com/discovery/v1/apis/{api}/{version}/rest"
+
+class GoogleServiceFactory:
+    """Builds Google API services from cached discovery documents"""
+
+    def __init__(self, maxsize: int = 1024, timeout: Optional[float] = 30, base_url: Optional[str] = None):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.base_url = base_url
+        self._documents: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._services: "OrderedDict[Tuple[str, str, str], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.discovery_loads = 0
+        self.builds = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def _load_document(self, api: str, version: str) -> Dict[str, Any]:
+        """Discovery document, from the copies bundled with googleapiclient when available"""
+        content = get_static_doc(api, version)
+        if content is None:
+            logger.info(f"No bundled discovery document for {api} {version}, fetching it")
+            response, content = httplib2.Http(timeout=self.timeout).request(
+                DISCOVERY_URL.format(api=api, version=version)
+            )
+            if response.status >= 400:
+                raise RuntimeError(f"Discovery document for {api} {version} returned {response.status}")
+        self.discovery_loads += 1
+        document = json.loads(content)
+        if self.base_url:
+            # Point requests, including batch requests, at e.g. a local fake server
+            root = self.base_url.rstrip("/") + "/"
+            document["rootUrl"] = document["mtlsRootUrl"] = root
+            document["baseUrl"] = root + document.get("servicePath", "")
+        return document
+
+    def document(self, api: str, version: str) -> Dict[str, Any]:
+        key = (api, version)
+        document = self._documents.get(key)
+        if document is None:
+            with self._lock:
+                document = self._documents.get(key)
+                if document is None:
+                    document = self._documents[key] = self._load_document(api, version)
+        return document
+
+    @staticmethod
+    def credential_key(credentials_dict: Dict[str, Any]) -> str:
+        """Stable digest identifying a credential set without keeping the secrets as keys.
+
+        Keyed on the refresh token where there is one, so a refreshed
+        access token keeps hitting the same service.
+        """
+        identity = credentials_dict.get("refresh_token") or credentials_dict.get("access_token") \
+            or credentials_dict.get("token") or ""
+        material = f"{credentials_dict.get('client_id', '')}:{identity}"
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def service(self, api: str, version: str, credentials_dict: Dict[str, Any]):
+        """Service for ``api``/``version`` authorised with ``credentials_dict``"""
+        key = (api, version, self.credential_key(credentials_dict))
+        with self._lock:
+            service = self._services.get(key)
+            if service is not None:
+                self._services.move_to_end(key)
+                self.hits += 1
+                return service
+
+        credentials = Credentials.from_authorized_user_info(credentials_dict)
+        token_uri = credentials_dict.get("token_uri")
+        if token_uri and token_uri != credentials.token_uri:
+            # from_authorized_user_info ignores token_uri, and the copy drops the expiry
+            expiry = credentials.expiry
+            credentials = credentials.with_token_uri(token_uri)
+            credentials.expiry = expiry
+        http = google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http(timeout=self.timeout))
+        service = build_from_document(self.document(api, version), http=http)
+
+        with self._lock:
+            self.builds += 1
+            self._services[key] = service
+            self._services.move_to_end(key)
+            while len(self._services) > self.maxsize:
+                self._services.popitem(last=False)
+                self.evictions += 1
+        return service
+
+    def discard(self, credentials_dict: Dict[str, Any]) -> None:
+        """Drop every service built for a credential set, e.g. after revocation"""
+        digest = self.credential_key(credentials_dict)
+        with self._lock:
+            for key in [key for key in self._services if key[2] == digest]:
+                del self._services[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            requests = self.hits + self.builds
+            return {
+                "services": len(self._services),
+                "maxsize": self.maxsize,
+                "discovery_documents": len(self._documents),
+                "discovery_loads": self.discovery_loads,
+                "builds": self.builds,
+                "hits": self.hits,
+                "builds_saved": self.hits,
+                "hit_ratio": self.hits / requests if requests else 0.0,
+                "evictions": self.evictions
+            }
+
+google_services = GoogleServiceFactory(
+    maxsize=settings.GOOGLE_SERVICE_CACHE_SIZE,
+    base_url=settings.GOOGLE_API_BASE_URL
+)
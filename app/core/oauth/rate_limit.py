@@ -0,0 +1,108 @@
+"""Client-side rate limiting for provider APIs.
+
+Each (key, method) pair gets a token bucket refilled at the method's
+documented rate, so concurrent callers sharing a key (for Slack, a
+workspace) space their calls out instead of tripping 429s. When the
+provider does answer 429, the bucket is paused for its Retry-After and
+every caller waits it out.
+"""
+from typing import Dict, Any, Hashable, Tuple
+from collections import OrderedDict
+import asyncio
+import time
+
+class TokenBucket:
+    """Async token bucket allowing ``rate`` calls per ``per`` seconds"""
+
+    def __init__(self, rate: float, per: float = 60.0, burst: int = 1):
+        self.rate = rate
+        self.per = per
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate / self.per)
+        self.updated = now
+
+    async def acquire(self) -> float:
+        """Wait for a token; returns the seconds spent waiting"""
+        waited = 0.0
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                delay = self.paused_until - now
+                if delay <= 0 and self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                if delay <= 0:
+                    delay = (1 - self.tokens) * self.per / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller for ``seconds``, e.g. a 429's Retry-After"""
+        now = time.monotonic()
+        self._refill(now)
+        self.paused_until = max(self.paused_until, now + seconds)
+        # One call may go as soon as the pause ends; the burst has to build up again
+        self.tokens = min(self.tokens, 1.0)
+
+class RateLimiter:
+    """Token buckets per (key, method) with per-method rates.
+
+    Buckets hold ``burst_seconds`` worth of calls, so short bursts go
+    straight through and sustained traffic settles at the method's rate.
+    The least recently used buckets are dropped beyond ``maxsize``.
+    """
+
+    def __init__(
+        self,
+        rates: Dict[str, float],
+        default_rate: float,
+        per: float = 60.0,
+        burst_seconds: float = 10.0,
+        maxsize: int = 10000
+    ):
+        self.rates = rates
+        self.default_rate = default_rate
+        self.per = per
+        self.burst_seconds = burst_seconds
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[Tuple[Hashable, str], TokenBucket]" = OrderedDict()
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.throttled = 0
+
+    def bucket(self, key: Hashable, method: str) -> TokenBucket:
+        bucket = self._buckets.get((key, method))
+        if bucket is None:
+            rate = self.rates.get(method, self.default_rate)
+            burst = int(rate * self.burst_seconds / self.per)
+            bucket = self._buckets[(key, method)] = TokenBucket(rate, self.per, burst)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end((key, method))
+        return bucket
+
+    async def acquire(self, key: Hashable, method: str) -> None:
+        waited = await self.bucket(key, method).acquire()
+        if waited:
+            self.waits += 1
+            self.wait_seconds += waited
+
+    def throttle(self, key: Hashable, method: str, retry_after: float) -> None:
+        self.throttled += 1
+        self.bucket(key, method).pause(retry_after)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "buckets": len(self._buckets),
+            "waits": self.waits,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "throttled": self.throttled
+        }
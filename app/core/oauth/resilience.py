@@ -0,0 +1,209 @@
+"""Circuit breakers and bulkheads for provider calls.
+
+Every provider API gets a ``ProviderGuard``:
+
+* a bulkhead, capping the calls in flight to that provider so a slow
+  provider holds at most its own slots and never the whole worker
+  (callers wait up to PROVIDER_BULKHEAD_WAIT_SECONDS for a slot);
+* a circuit breaker, opened by CIRCUIT_FAILURE_THRESHOLD consecutive
+  failures, where provider-side errors (5xx, 429, timeouts, connection
+  errors) and calls slower than the provider's latency SLO count as
+  failures. ``ProviderUserError``, e.g. one user's revoked token, does
+  not count either way. While open, calls fail immediately with
+  ``CircuitOpenError``; after CIRCUIT_RESET_SECONDS a limited number of
+  half-open probes go through, and the first success closes the circuit
+  again.
+
+State is per process, like the rate limiter.
+"""
+from typing import Dict, Any, Optional, Callable, Awaitable, TypeVar
+from weakref import WeakKeyDictionary
+import asyncio
+import threading
+import time
+import logging
+from app.core.config import settings
+from app.core.oauth.errors import ProviderUserError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class ProviderUnavailable(Exception):
+    """A provider call was refused without being attempted"""
+
+class CircuitOpenError(ProviderUnavailable):
+    pass
+
+class BulkheadFullError(ProviderUnavailable):
+    pass
+
+class ProviderGuard:
+    """Bulkhead plus circuit breaker around one provider's calls"""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_concurrency: int,
+        latency_slo_ms: float,
+        failure_threshold: int,
+        reset_seconds: float,
+        half_open_probes: int = 1,
+        max_wait: float = 0.5
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.latency_slo_ms = latency_slo_ms
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.half_open_probes = half_open_probes
+        self.max_wait = max_wait
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probes = 0
+        self._in_flight = 0
+        # asyncio primitives belong to one loop; sweep shards each run their own
+        self._semaphores: "WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.times_opened = 0
+        self.rejected_open = 0
+        self.rejected_full = 0
+
+    def _admit(self) -> bool:
+        """Let a call through the breaker; returns whether it is a half-open probe"""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.reset_seconds:
+                    self.rejected_open += 1
+                    raise CircuitOpenError(f"{self.name} circuit is open")
+                self.state = HALF_OPEN
+                self._probes = 0
+                logger.info(f"{self.name} circuit half-open, probing")
+            if self.state == HALF_OPEN:
+                if self._probes >= self.half_open_probes:
+                    self.rejected_open += 1
+                    raise CircuitOpenError(f"{self.name} circuit is half-open and already probing")
+                self._probes += 1
+                return True
+            return False
+
+    def _record(self, ok: Optional[bool], elapsed_ms: float, probe: bool) -> None:
+        """``ok`` is None for calls cancelled by their caller, which prove nothing either way"""
+        with self._lock:
+            if probe:
+                self._probes -= 1
+            if ok is None:
+                return
+            self.calls += 1
+            if ok and elapsed_ms > self.latency_slo_ms:
+                self.slow_calls += 1
+                ok = False
+            if ok:
+                if self.state != CLOSED:
+                    logger.info(f"{self.name} circuit closed")
+                self.state = CLOSED
+                self.consecutive_failures = 0
+                return
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or (
+                self.state == CLOSED and self.consecutive_failures >= self.failure_threshold
+            ):
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self.times_opened += 1
+                logger.warning(
+                    f"{self.name} circuit opened after {self.consecutive_failures} consecutive failures"
+                )
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def call(self, fetch: Callable[[], Awaitable[T]], timeout: Optional[float] = None) -> T:
+        """Run ``fetch`` under the bulkhead and breaker.
+
+        Raises CircuitOpenError or BulkheadFullError without calling it.
+        Fetchers raise ProviderUserError for failures that are one user's
+        problem; those pass through without counting against the provider.
+        """
+        probe = self._admit()
+        semaphore = self._semaphore()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), self.max_wait)
+        except asyncio.TimeoutError:
+            self._record(None, 0.0, probe)
+            with self._lock:
+                self.rejected_full += 1
+            raise BulkheadFullError(f"{self.name} has {self.max_concurrency} calls in flight")
+        except BaseException:
+            self._record(None, 0.0, probe)
+            raise
+
+        with self._lock:
+            self._in_flight += 1
+        start = time.perf_counter()
+        ok = None
+        try:
+            result = await asyncio.wait_for(fetch(), timeout) if timeout else await fetch()
+            ok = True
+            return result
+        except (asyncio.CancelledError, ProviderUserError):
+            raise
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            semaphore.release()
+            with self._lock:
+                self._in_flight -= 1
+            self._record(ok, (time.perf_counter() - start) * 1000, probe)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self.state
+            if state == OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                state = HALF_OPEN  # The next call will probe
+            return {
+                "state": state,
+                "consecutive_failures": self.consecutive_failures,
+                "in_flight": self._in_flight,
+                "max_concurrency": self.max_concurrency,
+                "latency_slo_ms": self.latency_slo_ms,
+                "calls": self.calls,
+                "failures": self.failures,
+                "slow_calls": self.slow_calls,
+                "times_opened": self.times_opened,
+                "rejected_open": self.rejected_open,
+                "rejected_full": self.rejected_full
+            }
+
+def _guard(name: str, max_concurrency: int, latency_slo_ms: float) -> ProviderGuard:
+    return ProviderGuard(
+        name,
+        max_concurrency=max_concurrency,
+        latency_slo_ms=latency_slo_ms,
+        failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+        reset_seconds=settings.CIRCUIT_RESET_SECONDS,
+        half_open_probes=settings.CIRCUIT_HALF_OPEN_PROBES,
+        max_wait=settings.PROVIDER_BULKHEAD_WAIT_SECONDS
+    )
+
+# Calendar and Gmail are separate Google APIs and degrade independently
+provider_guards = {
+    "slack": _guard("slack", settings.SLACK_MAX_CONCURRENCY, settings.SLACK_LATENCY_SLO_MS),
+    "calendar": _guard("calendar", settings.CALENDAR_MAX_CONCURRENCY, settings.CALENDAR_LATENCY_SLO_MS),
+    "gmail": _guard("gmail", settings.GMAIL_MAX_CONCURRENCY, settings.GMAIL_LATENCY_SLO_MS)
+}
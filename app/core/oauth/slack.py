@@ -1,22 +1,151 @@
-from typing import Optional, Dict, Any
-from slack_sdk import WebClient
+from typing import Optional, Dict, Any, AsyncIterator
+from slack_sdk.web.async_client import AsyncWebClient
+from slack_sdk.web.async_slack_response import AsyncSlackResponse
 from slack_sdk.errors import SlackApiError
 from app.core.config import settings
+from app.core.http_pool import http_pool
+from app.core.oauth.rate_limit import RateLimiter
+from app.core.oauth.errors import ProviderUserError, TokenRefreshError
+from datetime import datetime, timezone
+import asyncio
+import hashlib
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Slack's published per-method tiers (calls per minute, per workspace)
+SLACK_TIER_RATES = {1: 1, 2: 20, 3: 50, 4: 100}
+SLACK_METHOD_TIERS = {
+    "auth.test": 4,
+    "oauth.v2.access": 4,
+    "users.getPresence": 3,
+    "users.conversations": 3,
+    "reactions.list": 2
+}
+SLACK_PAGE_SIZE = 200  # Slack recommends no more than 200 per page
+SLACK_REACTIONS_DAYS = 30
+SLACK_REACTIONS_MAX_PAGES = 10  # reactions.list has no time filter, so bound how far back it is read
+SLACK_MAX_RETRIES = 3
+# Errors after which a rotating refresh token can never be used again
+SLACK_REVOKED_ERRORS = {"invalid_refresh_token", "invalid_grant", "token_revoked", "token_expired"}
+
+slack_rate_limiter = RateLimiter(
+    {method: SLACK_TIER_RATES[tier] for method, tier in SLACK_METHOD_TIERS.items()},
+    default_rate=SLACK_TIER_RATES[3]
+)
+
+def _provider_side(error: SlackApiError) -> bool:
+    """Whether a failed call is Slack's problem (429 or 5xx) rather than one user's, e.g. invalid_auth"""
+    return error.response.status_code == 429 or error.response.status_code >= 500
+
+def _rate_key(token: Optional[str], workspace: Optional[str]) -> str:
+    """Rate-limit key: the workspace, since tier limits are per workspace, else the token (without keeping it)"""
+    if workspace:
+        return f"team:{workspace}"
+    return hashlib.sha256((token or "").encode()).hexdigest()
+
+def slack_token_data(response: Dict[str, Any]) -> Dict[str, Any]:
+    """An oauth.v2.access response as the flat fields store_oauth_tokens keeps.
+
+    The user's own token (``authed_user``) is taken where one was granted,
+    else the bot token; the team and user ids are nested in the response.
+    """
+    authed_user = response.get("authed_user") or {}
+    source = authed_user if authed_user.get("access_token") else response
+    return {
+        "access_token": source.get("access_token"),
+        # Only present when the app has token rotation enabled
+        "refresh_token": source.get("refresh_token"),
+        "expires_in": source.get("expires_in"),
+        "scope": source.get("scope"),
+        "team_id": (response.get("team") or {}).get("id"),
+        "user_id": authed_user.get("id")
+    }
+
 class SlackOAuth:
     def __init__(self):
         self.client_id = settings.SLACK_CLIENT_ID
         self.client_secret = settings.SLACK_CLIENT_SECRET
         self.signing_secret = settings.SLACK_SIGNING_SECRET
 
+    def _client(self, token: Optional[str] = None) -> AsyncWebClient:
+        return AsyncWebClient(
+            token=token,
+            base_url=settings.SLACK_API_BASE_URL,
+            session=http_pool.session("slack"),
+            timeout=int(settings.HTTP_TIMEOUT_SECONDS)
+        )
+
+    async def _call(
+        self, client: AsyncWebClient, method: str, *, workspace: Optional[str] = None, **kwargs
+    ) -> AsyncSlackResponse:
+        """Call ``method`` within its tier's rate for ``workspace``, waiting out 429s per Retry-After"""
+        key = _rate_key(client.token, workspace)
+        for attempt in range(SLACK_MAX_RETRIES + 1):
+            await slack_rate_limiter.acquire(key, method)
+            try:
+                return await getattr(client, method.replace(".", "_"))(**kwargs)
+            except SlackApiError as e:
+                if e.response.status_code != 429 or attempt == SLACK_MAX_RETRIES:
+                    raise
+                retry_after = float(e.response.headers.get("Retry-After", 1))
+                logger.warning(f"Slack {method} rate limited, retrying in {retry_after}s")
+                slack_rate_limiter.throttle(key, method, retry_after)
+
+    async def _pages(
+        self,
+        client: AsyncWebClient,
+        method: str,
+        *,
+        workspace: Optional[str] = None,
+        max_pages: Optional[int] = None,
+        **kwargs
+    ) -> AsyncIterator[AsyncSlackResponse]:
+        """Every page of a cursor-paginated method, or the first ``max_pages``"""
+        cursor = None
+        pages = 0
+        while True:
+            response = await self._call(
+                client, method, workspace=workspace, cursor=cursor, limit=SLACK_PAGE_SIZE, **kwargs
+            )
+            yield response
+            pages += 1
+            cursor = (response.get("response_metadata") or {}).get("next_cursor")
+            if not cursor or (max_pages is not None and pages >= max_pages):
+                return
+
+    async def _channel_count(self, client: AsyncWebClient, user_id: str, workspace: Optional[str]) -> int:
+        count = 0
+        async for page in self._pages(
+            client, "users.conversations", workspace=workspace, user=user_id, types="public_channel,private_channel,im"
+        ):
+            count += len(page["channels"])
+        return count
+
+    async def _reaction_count(self, client: AsyncWebClient, user_id: str, workspace: Optional[str]) -> int:
+        """Reactions on items from the last SLACK_REACTIONS_DAYS.
+
+        reactions.list is ordered by when the reaction was added, not by the
+        item's age, so a recent reaction on an old message is skipped rather
+        than ending the count; the read is bounded by SLACK_REACTIONS_MAX_PAGES.
+        """
+        cutoff = time.time() - SLACK_REACTIONS_DAYS * 86400
+        count = 0
+        async for page in self._pages(
+            client, "reactions.list", workspace=workspace, max_pages=SLACK_REACTIONS_MAX_PAGES, user=user_id
+        ):
+            for item in page["items"]:
+                ts = (item.get("message") or {}).get("ts") or (item.get("file") or {}).get("created")
+                if ts is not None and float(ts) < cutoff:
+                    continue
+                count += 1
+        return count
+
     async def get_user_info(self, access_token: str) -> Optional[Dict[str, Any]]:
         """Get user info from Slack"""
         try:
-            client = WebClient(token=access_token)
-            response = client.auth_test()
+            response = await self._call(self._client(access_token), "auth.test")
             return {
                 "slack_user_id": response["user_id"],
                 "team_id": response["team_id"],
@@ -26,36 +155,37 @@ class SlackOAuth:
             logger.error(f"Error getting Slack user info: {str(e)}")
             return None
 
-    async def get_user_metadata(self, access_token: str, user_id: str) -> Optional[Dict[str, Any]]:
-        """Get user metadata from Slack (no message content)"""
+    async def get_user_metadata(
+        self, access_token: str, user_id: str, team_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get user metadata from Slack (no message content).
+
+        Calls are rate limited per workspace ``team_id``, shared by every
+        user in it, falling back to per token when it is unknown. Raises
+        ProviderUserError when Slack rejects this user's token or request;
+        429s, 5xx and connection errors propagate as they are.
+        """
         try:
-            client = WebClient(token=access_token)
-            
-            # Get user presence
-            presence = client.users_getPresence(user=user_id)
-            
-            # Get user's channel list (for activity patterns)
-            channels = client.users_conversations(
-                user=user_id,
-                types="public_channel,private_channel,im",
-                limit=100
-            )
-            
-            # Get user's emoji usage (last 30 days)
-            reactions = client.reactions_list(
-                user=user_id,
-                limit=100
+            client = self._client(access_token)
+            # Presence, channels (for activity patterns) and emoji usage, concurrently
+            presence, channel_count, reaction_count = await asyncio.gather(
+                self._call(client, "users.getPresence", workspace=team_id, user=user_id),
+                self._channel_count(client, user_id, team_id),
+                self._reaction_count(client, user_id, team_id)
             )
-            
+
+            # Slack reports epoch seconds; the engine and the webhook window use ISO timestamps
+            last_activity = presence.get("last_activity")
             return {
                 "presence": presence["presence"],
-                "channel_count": len(channels["channels"]),
-                "reaction_count": len(reactions["items"]),
-                "last_active": presence.get("last_activity", None)
+                "channel_count": channel_count,
+                "reaction_count": reaction_count,
+                "last_active": datetime.fromtimestamp(last_activity, timezone.utc).isoformat() if last_activity else None
             }
         except SlackApiError as e:
-            logger.error(f"Error getting Slack user metadata: {str(e)}")
-            return None
+            if _provider_side(e):
+                raise
+            raise ProviderUserError(f"Slack rejected the metadata request: {e.response.get('error')}") from e
 
     def get_oauth_url(self, state: str) -> str:
         """Generate Slack OAuth URL"""
@@ -69,17 +199,38 @@ class SlackOAuth:
     async def exchange_code(self, code: str) -> Optional[Dict[str, Any]]:
         """Exchange OAuth code for access token"""
         try:
-            client = WebClient()
-            response = client.oauth_v2_access(
+            response = await self._call(
+                self._client(),
+                "oauth.v2.access",
                 client_id=self.client_id,
                 client_secret=self.client_secret,
                 code=code
             )
-            return {
-                "access_token": response["access_token"],
-                "team_id": response["team"]["id"],
-                "user_id": response["authed_user"]["id"]
-            }
+            return slack_token_data(response.data)
         except SlackApiError as e:
             logger.error(f"Error exchanging Slack OAuth code: {str(e)}")
-            return None 
\ No newline at end of file
+            return None
+
+    async def refresh_access_token(self, refresh_token: str) -> Dict[str, Any]:
+        """New access token for a rotating refresh token; raises TokenRefreshError"""
+        try:
+            response = await self._call(
+                self._client(),
+                "oauth.v2.access",
+                client_id=self.client_id,
+                client_secret=self.client_secret,
+                grant_type="refresh_token",
+                refresh_token=refresh_token
+            )
+        except SlackApiError as e:
+            error = e.response.get("error")
+            raise TokenRefreshError(f"Slack token refresh failed: {error}", permanent=error in SLACK_REVOKED_ERRORS)
+        except Exception as e:
+            raise TokenRefreshError(f"Slack token refresh failed: {str(e)}")
+        return {
+            "access_token": response["access_token"],
+            "refresh_token": response.get("refresh_token"),
+            "expires_in": response.get("expires_in"),
+            "team_id": (response.get("team") or {}).get("id"),
+            "user_id": (response.get("authed_user") or {}).get("id")
+        }
@@ -0,0 +1,129 @@
+"""Background renewal of stored OAuth access tokens.
+
+Each stored token carries ``refresh_after``, set when it is stored to a
+jittered point shortly before expiry (see ``refresh_due_at``). The
+refresher wakes every TOKEN_REFRESH_INTERVAL_SECONDS (itself jittered),
+claims a batch of due tokens with SKIP LOCKED so several app workers can
+run it side by side, and renews them with bounded concurrency. Request
+paths therefore find a valid token in the store and never wait on a
+provider's token endpoint.
+
+Transient failures are retried with exponential backoff; a revoked grant
+stops retries and is surfaced by the integration status endpoint.
+"""
+from typing import Dict, Any, Optional, Callable
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+import asyncio
+import logging
+import random
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.oauth.errors import TokenRefreshError
+from app.core.oauth.google import GoogleOAuth
+from app.core.oauth.slack import SlackOAuth
+from app.crud.integration import claim_tokens_for_refresh, record_token_refresh_failure, store_oauth_tokens
+from app.db.session import AsyncSessionLocal
+from app.models.integration import IntegrationToken
+
+logger = logging.getLogger(__name__)
+
+TOKEN_REFRESH_LEASE_SECONDS = 300  # Claimed tokens are hidden from other refreshers this long
+TOKEN_REFRESH_MAX_BACKOFF_SECONDS = 3600
+
+class TokenRefresher:
+    """Periodically renews tokens that are about to expire"""
+
+    def __init__(self, providers: Dict[str, Any], session_factory: Callable[[], AsyncSession] = AsyncSessionLocal):
+        self.providers = providers  # provider name -> client with refresh_access_token()
+        self.session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+        self.passes = 0
+        self.outcomes = Counter()
+        self.last_pass_at: Optional[datetime] = None
+
+    async def _refresh(self, token: IntegrationToken, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            try:
+                token_data = await self.providers[token.provider].refresh_access_token(token.refresh_token)
+                async with self.session_factory() as db:
+                    await store_oauth_tokens(db, token.user_id, token.provider, token_data)
+                self.outcomes["refreshed"] += 1
+                return
+            except TokenRefreshError as e:
+                error, permanent = str(e), e.permanent
+            except Exception as e:
+                error, permanent = str(e), False
+
+            retry_at = None
+            if permanent:
+                self.outcomes["revoked"] += 1
+                logger.warning(f"{token.provider} grant for user {token.user_id} is no longer valid: {error}")
+            else:
+                self.outcomes["retry"] += 1
+                backoff = min(
+                    settings.TOKEN_REFRESH_RETRY_SECONDS * 2 ** token.refresh_failures, TOKEN_REFRESH_MAX_BACKOFF_SECONDS
+                )
+                retry_at = datetime.now(timezone.utc) + timedelta(seconds=backoff * random.uniform(0.8, 1.2))
+                logger.warning(f"{token.provider} token refresh for user {token.user_id} failed, retrying: {error}")
+            try:
+                async with self.session_factory() as db:
+                    await record_token_refresh_failure(
+                        db, token.user_id, token.provider, error=error, retry_at=retry_at
+                    )
+            except Exception as e:
+                # The claim lease runs out and the token is picked up again
+                logger.error(f"Could not record token refresh failure: {str(e)}")
+
+    async def run_once(self) -> int:
+        """Renew one batch of due tokens; returns how many were claimed"""
+        async with self.session_factory() as db:
+            tokens = await claim_tokens_for_refresh(
+                db,
+                providers=list(self.providers),
+                limit=settings.TOKEN_REFRESH_BATCH_SIZE,
+                lease_seconds=TOKEN_REFRESH_LEASE_SECONDS
+            )
+        semaphore = asyncio.Semaphore(settings.TOKEN_REFRESH_CONCURRENCY)
+        await asyncio.gather(*(self._refresh(token, semaphore) for token in tokens))
+        self.passes += 1
+        self.last_pass_at = datetime.now(timezone.utc)
+        if tokens:
+            logger.info(f"Token refresher renewed {len(tokens)} tokens")
+        return len(tokens)
+
+    async def _run(self) -> None:
+        # Workers started together should not poll in lockstep
+        await asyncio.sleep(random.uniform(0, settings.TOKEN_REFRESH_INTERVAL_SECONDS))
+        while True:
+            claimed = 0
+            try:
+                claimed = await self.run_once()
+            except Exception as e:
+                logger.error(f"Token refresh pass failed: {str(e)}")
+            if claimed < settings.TOKEN_REFRESH_BATCH_SIZE:
+                # A full batch means more tokens are due; otherwise wait for the next pass
+                await asyncio.sleep(settings.TOKEN_REFRESH_INTERVAL_SECONDS * random.uniform(0.8, 1.2))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "passes": self.passes,
+            "last_pass_at": self.last_pass_at,
+            "outcomes": dict(self.outcomes)
+        }
+
+token_refresher = TokenRefresher({"google": GoogleOAuth(), "slack": SlackOAuth()})
@@ -1,7 +1,26 @@
+"""Password hashing.
+
+bcrypt is deliberately slow (~100-300 ms per call at the default cost), so
+async code must use the ``*_async`` helpers, which run the work on a small
+thread pool (bcrypt releases the GIL) instead of blocking the event loop.
+The pool is bounded: once PASSWORD_HASH_MAX_PENDING calls are queued or
+running, further calls fail fast with PasswordHasherBusy rather than
+queueing without limit.
+"""
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
+import os
+import threading
 from passlib.context import CryptContext
+from app.core.config import settings
+
+T = TypeVar("T")
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context. Hashes made with a different cost than
+# BCRYPT_ROUNDS report needs_update, so they are rehashed on next login.
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
@@ -9,4 +28,79 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     """Generate password hash"""
-    return pwd_context.hash(password) 
\ No newline at end of file
+    return pwd_context.hash(password)
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password operations are already pending"""
+
+class PasswordHasher:
+    """Runs bcrypt calls on a bounded thread pool"""
+
+    def __init__(self, context: CryptContext, workers: int, max_pending: int):
+        self.context = context
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password")
+        return self._executor
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHasherBusy(f"{self._pending} password operations pending")
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), functools.partial(func, *args))
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(self.context.verify, plain_password, hashed_password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify and, if the hash uses outdated settings, return a new hash"""
+        return await self._run(self.context.verify_and_update, plain_password, hashed_password)
+
+    async def dummy_verify(self) -> bool:
+        """Spend the time of a verify, so unknown emails are not faster to reject"""
+        return await self._run(self.context.dummy_verify)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+password_hasher = PasswordHasher(
+    pwd_context,
+    workers=settings.PASSWORD_HASH_WORKERS or min(4, os.cpu_count() or 1),
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
+
+# Async helpers for request handlers
+get_password_hash_async = password_hasher.hash
+verify_password_async = password_hasher.verify
+verify_and_update_password = password_hasher.verify_and_update
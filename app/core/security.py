@@ -1,7 +1,6 @@
 from datetime import datetime, timedelta
 from typing import Any, Union
 from jose import jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -9,24 +8,15 @@ from app.db.session import get_db
 from app.models.user import User
 from app.crud.user import get_user as get_user_crud, get_user_by_email
 from app.core.config import settings
+from app.core.password import pwd_context, verify_password, get_password_hash  # noqa: F401
+from app.core.user_cache import CurrentUser, user_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password: str) -> str:
-    """Generate password hash"""
-    return pwd_context.hash(password)
-
 def create_access_token(
     data: dict,
     expires_delta: Union[timedelta, None] = None
@@ -48,8 +38,12 @@ def create_access_token(
 async def verify_token(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
-) -> User:
-    """Verify JWT token, fetch user, and return User object"""
+) -> CurrentUser:
+    """Verify JWT token and return a snapshot of the user.
+
+    The snapshot is detached from the session; endpoints that modify the
+    user must load the row themselves.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -67,11 +61,17 @@ async def verify_token(
     except jwt.JWTError:
         raise credentials_exception
         
+    current_user = user_cache.get(email)
+    if current_user is not None:
+        return current_user
+
     user = await get_user_by_email(db, email=email)
     if user is None:
         raise credentials_exception
         
-    return user
+    current_user = CurrentUser.from_user(user)
+    user_cache.set(current_user)
+    return current_user
 
 def setup_security():
     """Initialize security settings"""
@@ -0,0 +1,146 @@
+from typing import Dict, Any, List, Optional, Sequence, Mapping
+from dataclasses import dataclass, field
+from datetime import datetime
+import numpy as np
+from app.models.signal import Signal, SignalType
+
+# Columns understood by SignalEngine.process_batch, per metadata source.
+# Missing columns default to zero, mirroring the .get(..., 0) lookups of the
+# per-user path. Every source may also carry a boolean "present" column that
+# marks users for whom that source returned metadata at all.
+CALENDAR_COLUMNS = ("total_meetings", "total_duration_hours", "after_hours_meetings")
+SLACK_COLUMNS = ("channel_count", "reaction_count", "last_active_hour")
+GMAIL_COLUMNS = ("total_messages", "thread_count")
+
+SIGNAL_SOURCES = {
+    SignalType.MEETING_OVERLOAD: "calendar",
+    SignalType.SLACK_ACTIVITY: "slack",
+    SignalType.EMAIL_PATTERN: "gmail",
+}
+
+# Metadata columns copied into each signal's extra_data
+META_COLUMNS = {
+    SignalType.MEETING_OVERLOAD: ("total_meetings", "total_duration_hours"),
+    SignalType.SLACK_ACTIVITY: ("channel_count", "reaction_count"),
+    SignalType.EMAIL_PATTERN: ("total_messages", "thread_count"),
+}
+
+# Columns holding counts, rendered back as ints in extra_data
+INTEGER_COLUMNS = frozenset(
+    CALENDAR_COLUMNS + SLACK_COLUMNS + GMAIL_COLUMNS
+) - {"total_duration_hours", "last_active_hour"}
+
+Columns = Mapping[str, Sequence[Any]]
+
+def _last_active_hour(last_active: Optional[str]) -> float:
+    """Hour of the last Slack activity, NaN when unknown"""
+    if not last_active:
+        return np.nan
+    return float(datetime.fromisoformat(last_active).hour)
+
+def columns_from_metadata(
+    rows: Sequence[Optional[Dict[str, Any]]],
+    names: Sequence[str]
+) -> Dict[str, np.ndarray]:
+    """Convert per-user metadata dicts into the columnar layout of process_batch"""
+    columns: Dict[str, np.ndarray] = {
+        "present": np.fromiter((bool(row) for row in rows), dtype=bool, count=len(rows))
+    }
+    for name in names:
+        if name == "last_active_hour":
+            values = (_last_active_hour((row or {}).get("last_active")) for row in rows)
+        else:
+            values = ((row or {}).get(name, 0) for row in rows)
+        columns[name] = np.fromiter(values, dtype=np.float64, count=len(rows))
+    return columns
+
+def prepare_columns(columns: Optional[Columns], size: int, names: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Normalise caller supplied columns to float64 arrays of the batch size"""
+    if columns is None:
+        prepared = {name: np.zeros(size, dtype=np.float64) for name in names}
+        prepared["present"] = np.zeros(size, dtype=bool)
+        return prepared
+
+    prepared = {}
+    for name in names:
+        default = np.nan if name == "last_active_hour" else 0.0
+        values = columns.get(name)
+        if values is None:
+            prepared[name] = np.full(size, default, dtype=np.float64)
+        else:
+            prepared[name] = np.asarray(values, dtype=np.float64)
+    present = columns.get("present")
+    prepared["present"] = np.ones(size, dtype=bool) if present is None else np.asarray(present, dtype=bool)
+
+    for name, values in prepared.items():
+        if values.shape != (size,):
+            raise ValueError(f"Column '{name}' has shape {values.shape}, expected ({size},)")
+    return prepared
+
+@dataclass(frozen=True)
+class BatchResult:
+    """Signal scores for a batch of users.
+
+    ``scores`` maps every signal type to a float64 array aligned with
+    ``user_ids``; entries are NaN where the per-user path would not have
+    emitted that signal.
+    """
+    user_ids: Sequence[Any]
+    scores: Dict[SignalType, np.ndarray]
+    meta: Dict[str, np.ndarray] = field(default_factory=dict, repr=False)
+    thresholds: Dict[SignalType, Dict[str, Any]] = field(default_factory=dict, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def emitted(self, signal_type: SignalType) -> np.ndarray:
+        """Boolean mask of users that received the given signal"""
+        return ~np.isnan(self.scores[signal_type])
+
+    def for_user(self, index: int) -> Dict[SignalType, float]:
+        """Compact {signal type: score} view for one user"""
+        return {
+            signal_type: float(values[index])
+            for signal_type, values in self.scores.items()
+            if not np.isnan(values[index])
+        }
+
+    def signals(self, index: int) -> List[Signal]:
+        """Materialise one user's scores as Signal objects, as process_metadata would"""
+        signals = []
+        for signal_type, score in self.for_user(index).items():
+            if signal_type == SignalType.AFTER_HOURS_ACTIVITY:
+                extra_data, sources = self._after_hours_meta(index)
+                source = ",".join(sources)
+            else:
+                extra_data = {
+                    name: self._value(name, index)
+                    for name in META_COLUMNS[signal_type]
+                }
+                extra_data.update(self.thresholds[signal_type])
+                source = SIGNAL_SOURCES[signal_type]
+            signals.append(Signal(
+                user_id=self.user_ids[index],
+                type=signal_type,
+                source=source,
+                severity=score,
+                confidence=1.0,
+                extra_data=extra_data
+            ))
+        return signals
+
+    def _value(self, name: str, index: int) -> Any:
+        value = self.meta[name][index].item()
+        return int(value) if name in INTEGER_COLUMNS else value
+
+    def _after_hours_meta(self, index: int):
+        meta: Dict[str, Any] = {}
+        sources = []
+        if self.meta["calendar_present"][index]:
+            sources.append("calendar")
+            meta["after_hours_meetings"] = self._value("after_hours_meetings", index)
+        if self.meta["slack_present"][index]:
+            sources.append("slack")
+            if self.meta["late_night_slack"][index]:
+                meta["late_night_slack"] = True
+        return meta, sources
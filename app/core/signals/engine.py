@@ -1,26 +1,78 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Sequence
 from datetime import datetime, timedelta
-import yaml
+import numpy as np
 from pathlib import Path
 import logging
+import threading
+import time
 from app.models.signal import Signal, SignalType, Nudge
 from app.models.user import User
+from app.core.signals.batch import (
+    BatchResult,
+    Columns,
+    CALENDAR_COLUMNS,
+    SLACK_COLUMNS,
+    GMAIL_COLUMNS,
+    prepare_columns
+)
+from app.core.signals.plan import ScoringPlan, DEFAULT_RULES_PATH, compile_rules, load_plan
+from app.core.signals.window import ActivityState
 
 logger = logging.getLogger(__name__)
 
 class SignalEngine:
-    def __init__(self):
-        self.rules = self._load_rules()
-        
-    def _load_rules(self) -> Dict[str, Any]:
-        """Load signal rules from YAML file"""
+    def __init__(self, rules_path: Path = DEFAULT_RULES_PATH, reload_interval: float = 5.0):
+        self.rules_path = rules_path
+        self.reload_interval = reload_interval
+        self._reload_lock = threading.Lock()
+        self._next_check = time.monotonic() + reload_interval
+        self._failed_version: Optional[float] = None
+        self._plan = self._load_plan()
+
+    def _load_plan(self) -> ScoringPlan:
+        """Compile the rules file, falling back to built-in defaults"""
         try:
-            rules_path = Path(__file__).parent / "rules.yaml"
-            with open(rules_path, "r") as f:
-                return yaml.safe_load(f)
+            return load_plan(self.rules_path)
         except Exception as e:
             logger.error(f"Error loading signal rules: {str(e)}")
-            return {}
+            return compile_rules({})
+
+    @property
+    def plan(self) -> ScoringPlan:
+        """Current scoring plan, swapped for a fresh one when rules.yaml changes"""
+        if time.monotonic() >= self._next_check:
+            self.reload_if_changed()
+        return self._plan
+
+    def reload_if_changed(self) -> bool:
+        """Recompile the rules if the file's mtime moved; returns True when swapped.
+
+        A broken file keeps the previous plan in place and is not parsed
+        again until its mtime moves.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return False  # Another caller is already reloading
+        try:
+            self._next_check = time.monotonic() + self.reload_interval
+            try:
+                version = self.rules_path.stat().st_mtime
+            except OSError as e:
+                logger.error(f"Error checking signal rules: {str(e)}")
+                return False
+            if version in (self._plan.version, self._failed_version):
+                return False
+            try:
+                plan = load_plan(self.rules_path)
+            except Exception as e:
+                self._failed_version = version
+                logger.error(f"Error reloading signal rules, keeping previous plan: {str(e)}")
+                return False
+            self._failed_version = None
+            self._plan = plan
+            logger.info(f"Reloaded signal rules from {self.rules_path}")
+            return True
+        finally:
+            self._reload_lock.release()
 
     async def process_metadata(
         self,
@@ -31,16 +83,18 @@ class SignalEngine:
     ) -> List[Signal]:
         """Process metadata and generate signals"""
         signals = []
+        plan = self.plan
         
         # Process meeting overload signal
         if calendar_metadata:
-            meeting_signal = self._process_meeting_overload(calendar_metadata)
+            meeting_signal = self._process_meeting_overload(plan, calendar_metadata)
             if meeting_signal:
                 signals.append(meeting_signal)
         
         # Process after-hours activity signal
         if calendar_metadata or slack_metadata:
             after_hours_signal = self._process_after_hours_activity(
+                plan,
                 calendar_metadata,
                 slack_metadata
             )
@@ -49,43 +103,153 @@ class SignalEngine:
         
         # Process Slack activity signal
         if slack_metadata:
-            slack_signal = self._process_slack_activity(slack_metadata)
+            slack_signal = self._process_slack_activity(plan, slack_metadata)
             if slack_signal:
                 signals.append(slack_signal)
         
         # Process email pattern signal
         if gmail_metadata:
-            email_signal = self._process_email_pattern(gmail_metadata)
+            email_signal = self._process_email_pattern(plan, gmail_metadata)
             if email_signal:
                 signals.append(email_signal)
         
+        if user is not None:
+            for signal in signals:
+                signal.user_id = user.id
+        
         return signals
 
-    def _process_meeting_overload(self, calendar_metadata: Dict[str, Any]) -> Optional[Signal]:
+    async def process_state(
+        self,
+        user: User,
+        state: ActivityState,
+        now: Optional[datetime] = None
+    ) -> List[Signal]:
+        """Score a user from their rolling activity window, without re-fetching metadata"""
+        slack_metadata, calendar_metadata, gmail_metadata = state.to_metadata(now)
+        return await self.process_metadata(
+            user=user,
+            slack_metadata=slack_metadata,
+            calendar_metadata=calendar_metadata,
+            gmail_metadata=gmail_metadata
+        )
+
+    def process_batch(
+        self,
+        user_ids: Sequence[Any],
+        calendar: Optional[Columns] = None,
+        slack: Optional[Columns] = None,
+        gmail: Optional[Columns] = None
+    ) -> BatchResult:
+        """Score many users at once from columnar metadata.
+
+        Each source is a mapping of column name to a sequence aligned with
+        ``user_ids`` (see ``app.core.signals.batch``). The scores match what
+        process_metadata would return for every user individually.
+        """
+        size = len(user_ids)
+        cal = prepare_columns(calendar, size, CALENDAR_COLUMNS)
+        slk = prepare_columns(slack, size, SLACK_COLUMNS)
+        gml = prepare_columns(gmail, size, GMAIL_COLUMNS)
+
+        plan = self.plan
+        meeting = plan.meeting_overload
+        after_hours = plan.after_hours_activity
+        slack_rule = plan.slack_activity
+        email = plan.email_pattern
+
+        scores: Dict[SignalType, np.ndarray] = {}
+
+        # Meeting overload
+        meeting_score = (
+            np.minimum(cal["total_meetings"] / meeting.meeting_threshold, 1.0) * meeting.meeting_weight
+            + np.minimum(cal["total_duration_hours"] / meeting.duration_threshold, 1.0) * meeting.duration_weight
+        )
+        scores[SignalType.MEETING_OVERLOAD] = np.where(
+            cal["present"] & (meeting_score > meeting.cutoff), meeting_score, np.nan
+        )
+
+        # After-hours activity
+        late_night_slack = slk["present"] & (slk["last_active_hour"] >= after_hours.late_night_start)
+        after_hours_score = (
+            np.where(
+                cal["present"],
+                np.minimum(cal["after_hours_meetings"] / after_hours.calendar_threshold, 1.0) * after_hours.calendar_weight,
+                0.0
+            )
+            + np.where(late_night_slack, after_hours.slack_weight, 0.0)
+        )
+        scores[SignalType.AFTER_HOURS_ACTIVITY] = np.where(
+            (cal["present"] | slk["present"]) & (after_hours_score > after_hours.cutoff), after_hours_score, np.nan
+        )
+
+        # Slack activity
+        slack_score = (
+            np.minimum(slk["channel_count"] / slack_rule.channel_threshold, 1.0) * slack_rule.channel_weight
+            + np.minimum(slk["reaction_count"] / slack_rule.reaction_threshold, 1.0) * slack_rule.reaction_weight
+        )
+        scores[SignalType.SLACK_ACTIVITY] = np.where(slk["present"], slack_score, np.nan)
+
+        # Email pattern
+        email_score = (
+            np.minimum(gml["total_messages"] / email.message_threshold, 1.0) * email.message_weight
+            + np.minimum(gml["thread_count"] / email.thread_threshold, 1.0) * email.thread_weight
+        )
+        scores[SignalType.EMAIL_PATTERN] = np.where(gml["present"], email_score, np.nan)
+
+        meta = {name: cal[name] for name in CALENDAR_COLUMNS}
+        meta.update({name: slk[name] for name in SLACK_COLUMNS})
+        meta.update({name: gml[name] for name in GMAIL_COLUMNS})
+        meta.update(
+            calendar_present=cal["present"],
+            slack_present=slk["present"],
+            late_night_slack=late_night_slack
+        )
+        return BatchResult(
+            user_ids=user_ids,
+            scores=scores,
+            meta=meta,
+            thresholds={
+                SignalType.MEETING_OVERLOAD: {
+                    "meeting_threshold": meeting.meeting_threshold,
+                    "duration_threshold": meeting.duration_threshold
+                },
+                SignalType.SLACK_ACTIVITY: {
+                    "channel_threshold": slack_rule.channel_threshold,
+                    "reaction_threshold": slack_rule.reaction_threshold
+                },
+                SignalType.EMAIL_PATTERN: {
+                    "message_threshold": email.message_threshold,
+                    "thread_threshold": email.thread_threshold
+                },
+            }
+        )
+
+    def _process_meeting_overload(self, plan: ScoringPlan, calendar_metadata: Dict[str, Any]) -> Optional[Signal]:
         """Process meeting overload signal"""
         try:
+            rule = plan.meeting_overload
             total_meetings = calendar_metadata.get("total_meetings", 0)
             total_duration = calendar_metadata.get("total_duration_hours", 0)
             
             # Calculate meeting overload score (0-1)
-            meeting_threshold = self.rules.get("meeting_overload", {}).get("threshold", 12)
-            duration_threshold = self.rules.get("meeting_overload", {}).get("duration_threshold", 20)
-            
-            meeting_score = min(total_meetings / meeting_threshold, 1.0)
-            duration_score = min(total_duration / duration_threshold, 1.0)
+            meeting_score = min(total_meetings / rule.meeting_threshold, 1.0)
+            duration_score = min(total_duration / rule.duration_threshold, 1.0)
             
             # Combined score (weighted average)
-            score = (meeting_score * 0.6) + (duration_score * 0.4)
+            score = (meeting_score * rule.meeting_weight) + (duration_score * rule.duration_weight)
             
-            if score > 0.7:  # High meeting load
+            if score > rule.cutoff:  # High meeting load
                 return Signal(
                     type=SignalType.MEETING_OVERLOAD,
-                    value=score,
-                    meta={
+                    source="calendar",
+                    severity=score,
+                    confidence=1.0,
+                    extra_data={
                         "total_meetings": total_meetings,
                         "total_duration_hours": total_duration,
-                        "meeting_threshold": meeting_threshold,
-                        "duration_threshold": duration_threshold
+                        "meeting_threshold": rule.meeting_threshold,
+                        "duration_threshold": rule.duration_threshold
                     }
                 )
         except Exception as e:
@@ -94,89 +258,96 @@ class SignalEngine:
 
     def _process_after_hours_activity(
         self,
+        plan: ScoringPlan,
         calendar_metadata: Optional[Dict[str, Any]],
         slack_metadata: Optional[Dict[str, Any]]
     ) -> Optional[Signal]:
         """Process after-hours activity signal"""
         try:
+            rule = plan.after_hours_activity
             after_hours_score = 0
             meta = {}
+            sources = []
             
             if calendar_metadata:
+                sources.append("calendar")
                 after_hours_meetings = calendar_metadata.get("after_hours_meetings", 0)
                 meta["after_hours_meetings"] = after_hours_meetings
-                after_hours_score += min(after_hours_meetings / 3, 1.0) * 0.5
+                after_hours_score += min(after_hours_meetings / rule.calendar_threshold, 1.0) * rule.calendar_weight
             
             if slack_metadata:
+                sources.append("slack")
                 last_active = slack_metadata.get("last_active")
                 if last_active:
                     last_active_time = datetime.fromisoformat(last_active)
-                    if last_active_time.hour >= 21:  # After 9 PM
-                        after_hours_score += 0.5
+                    if last_active_time.hour >= rule.late_night_start:
+                        after_hours_score += rule.slack_weight
                         meta["late_night_slack"] = True
             
-            if after_hours_score > 0.6:  # Significant after-hours activity
+            if after_hours_score > rule.cutoff:  # Significant after-hours activity
                 return Signal(
                     type=SignalType.AFTER_HOURS_ACTIVITY,
-                    value=after_hours_score,
-                    meta=meta
+                    source=",".join(sources),
+                    severity=after_hours_score,
+                    confidence=1.0,
+                    extra_data=meta
                 )
         except Exception as e:
             logger.error(f"Error processing after-hours activity signal: {str(e)}")
         return None
 
-    def _process_slack_activity(self, slack_metadata: Dict[str, Any]) -> Optional[Signal]:
+    def _process_slack_activity(self, plan: ScoringPlan, slack_metadata: Dict[str, Any]) -> Optional[Signal]:
         """Process Slack activity signal"""
         try:
+            rule = plan.slack_activity
             channel_count = slack_metadata.get("channel_count", 0)
             reaction_count = slack_metadata.get("reaction_count", 0)
             
             # Calculate engagement score
-            channel_threshold = self.rules.get("slack_activity", {}).get("channel_threshold", 10)
-            reaction_threshold = self.rules.get("slack_activity", {}).get("reaction_threshold", 50)
-            
-            channel_score = min(channel_count / channel_threshold, 1.0)
-            reaction_score = min(reaction_count / reaction_threshold, 1.0)
+            channel_score = min(channel_count / rule.channel_threshold, 1.0)
+            reaction_score = min(reaction_count / rule.reaction_threshold, 1.0)
             
-            score = (channel_score * 0.4) + (reaction_score * 0.6)
+            score = (channel_score * rule.channel_weight) + (reaction_score * rule.reaction_weight)
             
             return Signal(
                 type=SignalType.SLACK_ACTIVITY,
-                value=score,
-                meta={
+                source="slack",
+                severity=score,
+                confidence=1.0,
+                extra_data={
                     "channel_count": channel_count,
                     "reaction_count": reaction_count,
-                    "channel_threshold": channel_threshold,
-                    "reaction_threshold": reaction_threshold
+                    "channel_threshold": rule.channel_threshold,
+                    "reaction_threshold": rule.reaction_threshold
                 }
             )
         except Exception as e:
             logger.error(f"Error processing Slack activity signal: {str(e)}")
         return None
 
-    def _process_email_pattern(self, gmail_metadata: Dict[str, Any]) -> Optional[Signal]:
+    def _process_email_pattern(self, plan: ScoringPlan, gmail_metadata: Dict[str, Any]) -> Optional[Signal]:
         """Process email pattern signal"""
         try:
+            rule = plan.email_pattern
             total_messages = gmail_metadata.get("total_messages", 0)
             thread_count = gmail_metadata.get("thread_count", 0)
             
             # Calculate email load score
-            message_threshold = self.rules.get("email_pattern", {}).get("message_threshold", 100)
-            thread_threshold = self.rules.get("email_pattern", {}).get("thread_threshold", 30)
-            
-            message_score = min(total_messages / message_threshold, 1.0)
-            thread_score = min(thread_count / thread_threshold, 1.0)
+            message_score = min(total_messages / rule.message_threshold, 1.0)
+            thread_score = min(thread_count / rule.thread_threshold, 1.0)
             
-            score = (message_score * 0.5) + (thread_score * 0.5)
+            score = (message_score * rule.message_weight) + (thread_score * rule.thread_weight)
             
             return Signal(
                 type=SignalType.EMAIL_PATTERN,
-                value=score,
-                meta={
+                source="gmail",
+                severity=score,
+                confidence=1.0,
+                extra_data={
                     "total_messages": total_messages,
                     "thread_count": thread_count,
-                    "message_threshold": message_threshold,
-                    "thread_threshold": thread_threshold
+                    "message_threshold": rule.message_threshold,
+                    "thread_threshold": rule.thread_threshold
                 }
             )
         except Exception as e:
@@ -186,15 +357,20 @@ class SignalEngine:
     def generate_nudge(self, signal: Signal) -> Optional[Nudge]:
         """Generate a nudge based on signal"""
         try:
-            nudge_templates = self.rules.get("nudges", {})
-            template = nudge_templates.get(signal.type.value, {}).get("template")
+            plan = self.plan
+            template = plan.nudge_templates.get(signal.type)
             
-            if template and signal.value > 0.7:  # Only generate nudges for significant signals
+            if template and signal.severity > plan.nudge_cutoff:  # Only generate nudges for significant signals
                 # Format template with signal meta
-                message = template.format(**(signal.meta or {}))
+                message = template.format(**(signal.extra_data or {}))
                 return Nudge(
+                    user_id=signal.user_id,
+                    signal_id=signal.id,
+                    type=signal.type.value,
+                    title=signal.type.value.replace("_", " ").capitalize(),
                     message=message,
-                    signal_id=signal.id
+                    priority="high" if signal.severity > 0.9 else "medium",
+                    extra_data={"severity": signal.severity}
                 )
         except Exception as e:
             logger.error(f"Error generating nudge: {str(e)}")
@@ -0,0 +1,235 @@
+"""Provider metadata fetch pipeline.
+
+Loads a user's stored tokens and runs the Slack, Calendar and Gmail
+fetchers concurrently, each under its own timeout, behind the metadata
+cache and inside the provider's bulkhead and circuit breaker. A provider
+that is not connected, times out or fails contributes ``None`` and the
+others still reach the engine; one whose circuit is open contributes its
+last good (stale) value if there is one, without being called. Per-provider
+latencies are kept per process for the metrics endpoint, so it is visible
+which integration dominates.
+"""
+from typing import Dict, Any, Optional, Tuple, Callable, Awaitable
+from dataclasses import dataclass, field, asdict
+from collections import Counter, deque
+from datetime import timezone
+import asyncio
+import logging
+import threading
+import time
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from app.core.config import settings
+from app.core.metadata_cache import metadata_cache
+from app.core.oauth.google import GoogleOAuth
+from app.core.oauth.resilience import ProviderUnavailable, provider_guards
+from app.core.oauth.slack import SlackOAuth
+from app.crud.integration import get_user_tokens
+from app.db.session import AsyncSessionLocal, ASYNC_DATABASE_URL
+from app.models.integration import IntegrationToken
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS = ("slack", "calendar", "gmail")
+
+slack_oauth = SlackOAuth()
+google_oauth = GoogleOAuth()
+
+@dataclass
+class ProviderFetch:
+    """Outcome of one provider fetch: ok, stale, unavailable, not_connected, timeout or error"""
+    status: str
+    latency_ms: float = 0.0
+    error: Optional[str] = None
+    cache: Optional[str] = None  # hit, miss, coalesced or stale
+
+@dataclass
+class FetchResult:
+    slack: Optional[Dict[str, Any]] = None
+    calendar: Optional[Dict[str, Any]] = None
+    gmail: Optional[Dict[str, Any]] = None
+    providers: Dict[str, ProviderFetch] = field(default_factory=dict)
+    elapsed_ms: float = 0.0
+
+    def as_metadata(self) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """(slack, calendar, gmail) as SignalEngine.process_metadata takes them"""
+        return self.slack, self.calendar, self.gmail
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "elapsed_ms": self.elapsed_ms,
+            "providers": {name: asdict(fetch) for name, fetch in self.providers.items()}
+        }
+
+class FetchStats:
+    """Recent per-provider latencies and outcome counts for this process"""
+
+    def __init__(self, window: int = 1000):
+        self._latencies = {provider: deque(maxlen=window) for provider in PROVIDERS}
+        self._outcomes = {provider: Counter() for provider in PROVIDERS}
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, fetch: ProviderFetch) -> None:
+        with self._lock:
+            self._outcomes[provider][fetch.status] += 1
+            if fetch.status != "not_connected":
+                self._latencies[provider].append(fetch.latency_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {}
+            for provider in PROVIDERS:
+                latencies = sorted(self._latencies[provider])
+                stats[provider] = {
+                    "samples": len(latencies),
+                    "p50_ms": latencies[len(latencies) // 2] if latencies else None,
+                    "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else None,
+                    "max_ms": latencies[-1] if latencies else None,
+                    "outcomes": dict(self._outcomes[provider])
+                }
+            return stats
+
+fetch_stats = FetchStats()
+
+def google_credentials(token: IntegrationToken) -> Dict[str, Any]:
+    """Authorized-user info for the Google client from a stored token"""
+    expiry = None
+    if token.expires_at:
+        expiry = token.expires_at.astimezone(timezone.utc).replace(tzinfo=None).isoformat(timespec="seconds") + "Z"
+    return {
+        "token": token.access_token,
+        "refresh_token": token.refresh_token,
+        "token_uri": settings.GOOGLE_TOKEN_URI,
+        "client_id": settings.GOOGLE_CLIENT_ID,
+        "client_secret": settings.GOOGLE_CLIENT_SECRET,
+        "expiry": expiry,
+        "scopes": token.scopes.split() if token.scopes else None
+    }
+
+async def _in_session(
+    session_factory: Callable[[], AsyncSession], fetch: Callable[[AsyncSession], Awaitable[Optional[Dict[str, Any]]]]
+) -> Optional[Dict[str, Any]]:
+    """Run a DB-backed fetch in its own session; sessions cannot be shared across concurrent tasks"""
+    async with session_factory() as db:
+        return await fetch(db)
+
+async def _timed(
+    provider: str,
+    user_id: Any,
+    fetch: Callable[[], Awaitable[Optional[Dict[str, Any]]]],
+    timeout: float
+):
+    start = time.perf_counter()
+    metadata = None
+    error = None
+    cache = None
+    guard = provider_guards[provider]
+    try:
+        metadata, cache = await asyncio.wait_for(
+            metadata_cache.get_or_fetch(provider, user_id, lambda: guard.call(fetch, timeout)), timeout
+        )
+        status = "ok" if metadata is not None else "error"
+        if metadata is None:
+            error = "no data returned"
+    except ProviderUnavailable as e:
+        # Circuit open or bulkhead full: answer now with the last good value, if any
+        metadata = await metadata_cache.get_stale(provider, user_id)
+        status = "stale" if metadata is not None else "unavailable"
+        cache = "stale" if metadata is not None else None
+        error = str(e)
+    except asyncio.TimeoutError:
+        status = "timeout"
+        error = f"no response within {timeout}s"
+    except Exception as e:
+        status = "error"
+        error = str(e)
+    result = ProviderFetch(
+        status=status, latency_ms=round((time.perf_counter() - start) * 1000, 1), error=error, cache=cache
+    )
+    fetch_stats.record(provider, result)
+    if status not in ("ok", "stale"):
+        logger.warning(f"{provider} metadata fetch {status} after {result.latency_ms}ms: {error}")
+    return metadata, result
+
+async def fetch_user_metadata(
+    user: Any,
+    tokens: Dict[str, IntegrationToken],
+    *,
+    session_factory: Callable[[], AsyncSession] = AsyncSessionLocal
+) -> FetchResult:
+    """Fetch every connected provider for ``user`` concurrently"""
+    start = time.perf_counter()
+    fetches = {}
+
+    slack_token = tokens.get("slack")
+    slack_user_id = getattr(user, "slack_user_id", None) or (
+        (slack_token.extra or {}).get("user_id") if slack_token else None
+    )
+    if slack_token and slack_user_id:
+        fetches["slack"] = (
+            lambda: slack_oauth.get_user_metadata(
+                slack_token.access_token, slack_user_id, (slack_token.extra or {}).get("team_id")
+            ),
+            settings.SLACK_FETCH_TIMEOUT_SECONDS
+        )
+
+    google_token = tokens.get("google")
+    if google_token:
+        credentials = google_credentials(google_token)
+        fetches["calendar"] = (
+            lambda: _in_session(
+                session_factory, lambda db: google_oauth.sync_calendar_metadata(db, user.id, credentials)
+            ),
+            settings.CALENDAR_FETCH_TIMEOUT_SECONDS
+        )
+        fetches["gmail"] = (
+            lambda: _in_session(
+                session_factory, lambda db: google_oauth.sync_gmail_metadata(db, user.id, credentials)
+            ),
+            settings.GMAIL_FETCH_TIMEOUT_SECONDS
+        )
+
+    outcomes = await asyncio.gather(*(
+        _timed(provider, user.id, fetch, timeout) for provider, (fetch, timeout) in fetches.items()
+    ))
+    result = FetchResult()
+    for provider, (metadata, fetch) in zip(fetches, outcomes):
+        setattr(result, provider, metadata)
+        result.providers[provider] = fetch
+    for provider in PROVIDERS:
+        if provider not in result.providers:
+            result.providers[provider] = ProviderFetch(status="not_connected")
+            fetch_stats.record(provider, result.providers[provider])
+    result.elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+    logger.info(
+        f"Fetched metadata for user {user.id} in {result.elapsed_ms}ms: " + ", ".join(
+            f"{provider} {fetch.status} {fetch.latency_ms}ms" for provider, fetch in result.providers.items()
+        )
+    )
+    return result
+
+_worker_engine = None
+_worker_sessions = None
+
+def worker_engine():
+    """Engine for sweep and Celery workers, which run each job on a fresh event loop, so no pooling"""
+    global _worker_engine
+    if _worker_engine is None:
+        _worker_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=NullPool)
+    return _worker_engine
+
+def worker_session_factory() -> Callable[[], AsyncSession]:
+    """Sessions on worker_engine"""
+    global _worker_sessions
+    if _worker_sessions is None:
+        _worker_sessions = sessionmaker(worker_engine(), class_=AsyncSession, expire_on_commit=False)
+    return _worker_sessions
+
+async def fetch_connected_metadata(user: Any):
+    """Sweep fetcher: stored tokens plus fetch_user_metadata for one user"""
+    session_factory = worker_session_factory()
+    async with session_factory() as db:
+        tokens = await get_user_tokens(db, user.id)
+    result = await fetch_user_metadata(user, tokens, session_factory=session_factory)
+    return result.as_metadata()
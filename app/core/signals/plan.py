@@ -0,0 +1,115 @@
+from typing import Dict, Any, Mapping, Optional
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+import yaml
+from app.models.signal import SignalType
+
+DEFAULT_RULES_PATH = Path(__file__).parent / "rules.yaml"
+
+@dataclass(frozen=True)
+class MeetingOverloadRule:
+    meeting_threshold: float
+    duration_threshold: float
+    meeting_weight: float
+    duration_weight: float
+    cutoff: float
+
+@dataclass(frozen=True)
+class AfterHoursRule:
+    calendar_threshold: float
+    late_night_start: int
+    calendar_weight: float
+    slack_weight: float
+    cutoff: float
+
+@dataclass(frozen=True)
+class SlackActivityRule:
+    channel_threshold: float
+    reaction_threshold: float
+    channel_weight: float
+    reaction_weight: float
+
+@dataclass(frozen=True)
+class EmailPatternRule:
+    message_threshold: float
+    thread_threshold: float
+    message_weight: float
+    thread_weight: float
+
+@dataclass(frozen=True)
+class ScoringPlan:
+    """Immutable, fully resolved form of rules.yaml.
+
+    Everything the engine needs per call is a plain attribute, so scoring
+    never walks the raw YAML dict. A new plan is compiled and swapped in
+    as a whole when the rules change.
+    """
+    meeting_overload: MeetingOverloadRule
+    after_hours_activity: AfterHoursRule
+    slack_activity: SlackActivityRule
+    email_pattern: EmailPatternRule
+    nudge_templates: Mapping[SignalType, str]
+    nudge_cutoff: float
+    version: Optional[float] = None
+
+def _section(rules: Dict[str, Any], name: str) -> Dict[str, Any]:
+    return rules.get(name) or {}
+
+def compile_rules(rules: Optional[Dict[str, Any]], version: Optional[float] = None) -> ScoringPlan:
+    """Resolve raw rules (as loaded from YAML) into a ScoringPlan, applying defaults"""
+    rules = rules or {}
+
+    meeting = _section(rules, "meeting_overload")
+    meeting_weight = meeting.get("weight") or {}
+    after_hours = _section(rules, "after_hours_activity")
+    after_hours_weight = after_hours.get("weight") or {}
+    slack = _section(rules, "slack_activity")
+    slack_weight = slack.get("weight") or {}
+    email = _section(rules, "email_pattern")
+    email_weight = email.get("weight") or {}
+    nudges = _section(rules, "nudges")
+
+    templates = {}
+    for signal_type in SignalType:
+        template = (nudges.get(signal_type.value) or {}).get("template")
+        if template:
+            templates[signal_type] = template
+
+    return ScoringPlan(
+        meeting_overload=MeetingOverloadRule(
+            meeting_threshold=meeting.get("threshold", 12),
+            duration_threshold=meeting.get("duration_threshold", 20),
+            meeting_weight=meeting_weight.get("meeting_count", 0.6),
+            duration_weight=meeting_weight.get("duration", 0.4),
+            cutoff=meeting.get("cutoff", 0.7)
+        ),
+        after_hours_activity=AfterHoursRule(
+            calendar_threshold=after_hours.get("calendar_threshold", 3),
+            late_night_start=after_hours.get("late_night_start", 21),
+            calendar_weight=after_hours_weight.get("calendar", 0.5),
+            slack_weight=after_hours_weight.get("slack", 0.5),
+            cutoff=after_hours.get("cutoff", 0.6)
+        ),
+        slack_activity=SlackActivityRule(
+            channel_threshold=slack.get("channel_threshold", 10),
+            reaction_threshold=slack.get("reaction_threshold", 50),
+            channel_weight=slack_weight.get("channels", 0.4),
+            reaction_weight=slack_weight.get("reactions", 0.6)
+        ),
+        email_pattern=EmailPatternRule(
+            message_threshold=email.get("message_threshold", 100),
+            thread_threshold=email.get("thread_threshold", 30),
+            message_weight=email_weight.get("messages", 0.5),
+            thread_weight=email_weight.get("threads", 0.5)
+        ),
+        nudge_templates=MappingProxyType(templates),
+        nudge_cutoff=nudges.get("cutoff", 0.7),
+        version=version
+    )
+
+def load_plan(path: Path = DEFAULT_RULES_PATH) -> ScoringPlan:
+    """Read and compile a rules file, tagging the plan with the file's mtime"""
+    version = path.stat().st_mtime
+    with open(path, "r") as f:
+        return compile_rules(yaml.safe_load(f), version=version)
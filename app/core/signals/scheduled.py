@@ -0,0 +1,97 @@
+"""Scheduled signal processing runs, shared by the Celery tasks and the job worker.
+
+A run covers one SIGNAL_PROCESSING_INTERVAL_SECONDS interval and is keyed
+by its start. Consenting users are grouped by team and split into chunks
+of SIGNAL_CHUNK_SIZE; each chunk is fetched, scored and written by
+``process_chunk``, and once all of a team's chunks are done
+``aggregate_team`` stores the team's anonymized metrics.
+
+Both steps are idempotent within a run: a user's signals and nudges are
+written in one transaction with a claim in signal_runs, so a redelivered
+or duplicated chunk skips the users it already wrote, and a team's
+metrics for a period replace any stored by an earlier attempt. Users whose
+fetch or scoring failed are not claimed, so a retry of the chunk or the
+next run picks them up.
+"""
+from typing import Dict, Any, List, Optional, Tuple, Callable, Sequence
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.signals.sweep import MetadataFetcher, list_sweep_users, persist_shard, score_users
+from app.crud.signal import claim_signal_runs, get_claimed_user_ids
+from app.crud.team import count_processed_team_members, get_team_signal_summary, replace_team_metrics
+
+def current_period(now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """The scheduling interval ``now`` falls in"""
+    interval = settings.SIGNAL_PROCESSING_INTERVAL_SECONDS
+    now = now or datetime.now(timezone.utc)
+    start = datetime.fromtimestamp(int(now.timestamp()) // interval * interval, timezone.utc)
+    return start, start + timedelta(seconds=interval)
+
+def run_key_for(period_start: datetime) -> str:
+    return f"signals:{period_start.isoformat()}"
+
+def chunk(user_ids: Sequence[str], size: int) -> List[List[str]]:
+    return [list(user_ids[i:i + size]) for i in range(0, len(user_ids), size)]
+
+async def users_by_team(db: AsyncSession) -> Dict[Optional[str], List[str]]:
+    """Ids of the users to process, by team id (None for users without a team), in a stable order"""
+    teams = defaultdict(list)
+    for user in await list_sweep_users(db):
+        teams[str(user.team_id) if user.team_id else None].append(str(user.id))
+    return {team_id: sorted(user_ids) for team_id, user_ids in teams.items()}
+
+async def process_chunk(
+    session_factory: Callable[[], AsyncSession], run_key: str, user_ids: List[UUID], fetcher: MetadataFetcher
+) -> Dict[str, Any]:
+    """Fetch, score and persist the users of ``user_ids`` not yet written for ``run_key``"""
+    async with session_factory() as db:
+        done = await get_claimed_user_ids(db, run_key, user_ids)
+        users = [user for user in await list_sweep_users(db, user_ids) if user.id not in done]
+
+    result = await score_users(0, users, fetcher)
+
+    async with session_factory() as db:
+        failed = set(result.failed_user_ids)
+        claimed = await claim_signal_runs(db, run_key, [user.id for user in users if user.id not in failed])
+        # Lost a race with a duplicate of this chunk: keep only the users claimed here
+        result.signals = [signal for signal in result.signals if signal["user_id"] in claimed]
+        signals, nudges = await persist_shard(db, result)
+        await db.commit()  # The claims, even for users with no signals
+    return {
+        "users": len(user_ids),
+        "processed": len(claimed),
+        "skipped": len(user_ids) - len(claimed) - len(failed),
+        "signals": signals,
+        "nudges": nudges,
+        "errors": result.errors,
+        "timed_out": False
+    }
+
+async def aggregate_team(
+    db: AsyncSession, results: List[Dict[str, Any]], team_id: UUID, start: datetime, end: datetime
+) -> Dict[str, Any]:
+    """Store a team's anonymized metrics for a run from its chunks' results"""
+    members = await count_processed_team_members(db, team_id=team_id)
+    if members < settings.TEAM_METRICS_MIN_MEMBERS:
+        return {"team_id": str(team_id), "metrics": 0, "suppressed": True}
+
+    summary = await get_team_signal_summary(db, team_id=team_id, start=start, end=end)
+    metrics = {
+        "processing_coverage": {
+            "members": members,
+            "processed": sum(result["processed"] for result in results),
+            "skipped": sum(result["skipped"] for result in results),
+            "errors": sum(result["errors"] for result in results),
+            "timed_out_chunks": sum(1 for result in results if result["timed_out"])
+        }
+    }
+    for signal_type, row in summary.items():
+        metrics[signal_type] = {
+            "share_of_members": round(row["members"] / members, 3),
+            "mean_severity": round(row["mean_severity"], 3)
+        }
+    stored = await replace_team_metrics(db, team_id=team_id, period_start=start, period_end=end, metrics=metrics)
+    return {"team_id": str(team_id), "metrics": len(stored), "suppressed": False}
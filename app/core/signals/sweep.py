@@ -0,0 +1,233 @@
+"""Org-wide signal sweep across a process pool.
+
+Users are sharded by a stable hash of their id; each shard is fetched and
+scored in a worker process and its results are written back in bulk as
+soon as the shard completes.
+
+Usage: python -m app.core.signals.sweep [--processes N] [--shards N] [--dry-run] [--no-fetch]
+"""
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple, Sequence
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.db import base  # noqa: F401
+from app.db.session import AsyncSessionLocal
+from app.models.user import User
+from app.crud.signal import create_signals_bulk, create_nudges_bulk
+from app.core.signals.engine import SignalEngine
+from app.core.signals.fetch import fetch_connected_metadata
+
+logger = logging.getLogger(__name__)
+
+Metadata = Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+@dataclass(frozen=True)
+class SweepUser:
+    """Picklable snapshot of the user fields a worker needs"""
+    id: Any
+    email: str = ""
+    team_id: Optional[Any] = None
+    slack_user_id: Optional[str] = None
+    google_user_id: Optional[str] = None
+
+# Fetches (slack, calendar, gmail) metadata for one user inside a worker.
+# Must be a module-level callable so it can be pickled to the pool.
+MetadataFetcher = Callable[[SweepUser], Awaitable[Metadata]]
+
+@dataclass
+class ShardResult:
+    shard: int
+    users: int
+    signals: List[Dict[str, Any]] = field(default_factory=list)
+    errors: int = 0
+    failed_user_ids: List[Any] = field(default_factory=list)
+    elapsed: float = 0.0
+
+@dataclass
+class SweepSummary:
+    users: int = 0
+    shards: int = 0
+    signals: int = 0
+    nudges: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+
+async def fetch_no_metadata(user: SweepUser) -> Metadata:
+    """Fetcher that calls no providers, e.g. to benchmark scoring alone"""
+    return None, None, None
+
+def shard_for(user_id: Any, shard_count: int) -> int:
+    """Stable shard index for a user id, independent of PYTHONHASHSEED"""
+    digest = hashlib.blake2b(str(user_id).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shard_count
+
+def shard_users(users: Sequence[SweepUser], shard_count: int) -> List[List[SweepUser]]:
+    shards: List[List[SweepUser]] = [[] for _ in range(shard_count)]
+    for user in users:
+        shards[shard_for(user.id, shard_count)].append(user)
+    return shards
+
+_worker_engine = None
+
+def _get_engine():
+    """One SignalEngine per process"""
+    global _worker_engine
+    if _worker_engine is None:
+        _worker_engine = SignalEngine()
+    return _worker_engine
+
+async def score_users(shard: int, users: List[SweepUser], fetcher: MetadataFetcher) -> ShardResult:
+    engine = _get_engine()
+    result = ShardResult(shard=shard, users=len(users))
+    for user in users:
+        try:
+            slack_metadata, calendar_metadata, gmail_metadata = await fetcher(user)
+            signals = await engine.process_metadata(
+                user=user,
+                slack_metadata=slack_metadata,
+                calendar_metadata=calendar_metadata,
+                gmail_metadata=gmail_metadata
+            )
+        except Exception as e:
+            logger.error(f"Error sweeping user {user.id}: {str(e)}")
+            result.errors += 1
+            result.failed_user_ids.append(user.id)
+            continue
+        for signal in signals:
+            result.signals.append({
+                "user_id": signal.user_id,
+                "type": signal.type,
+                "source": signal.source,
+                "severity": signal.severity,
+                "confidence": signal.confidence,
+                "extra_data": signal.extra_data,
+            })
+    return result
+
+def _run_shard(shard: int, users: List[SweepUser], fetcher: MetadataFetcher) -> ShardResult:
+    """Worker entry point: fetch and score one shard"""
+    start = time.perf_counter()
+    result = asyncio.run(score_users(shard, users, fetcher))
+    result.elapsed = time.perf_counter() - start
+    return result
+
+async def sweep_users(
+    users: Sequence[SweepUser],
+    *,
+    processes: Optional[int] = None,
+    shards: Optional[int] = None,
+    fetcher: MetadataFetcher = fetch_no_metadata,
+    on_shard_done: Optional[Callable[[ShardResult, int, int], Awaitable[None]]] = None
+) -> List[ShardResult]:
+    """Fetch and score ``users`` across a process pool, one task per shard.
+
+    ``on_shard_done(result, completed, total)`` is awaited in the calling
+    process as each shard finishes, e.g. to persist its results.
+    """
+    processes = processes or settings.SWEEP_PROCESSES or os.cpu_count() or 1
+    shard_count = shards or settings.SWEEP_SHARDS or processes * 4
+    batches = [(i, batch) for i, batch in enumerate(shard_users(users, shard_count)) if batch]
+
+    results = []
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [
+            asyncio.wrap_future(pool.submit(_run_shard, shard, batch, fetcher))
+            for shard, batch in batches
+        ]
+        for completed, future in enumerate(asyncio.as_completed(futures), start=1):
+            result = await future
+            results.append(result)
+            logger.info(
+                f"Shard {result.shard} done ({completed}/{len(futures)}): "
+                f"{result.users} users, {len(result.signals)} signals, "
+                f"{result.errors} errors in {result.elapsed:.2f}s"
+            )
+            if on_shard_done:
+                await on_shard_done(result, completed, len(futures))
+    return results
+
+async def list_sweep_users(db: AsyncSession, user_ids: Optional[Sequence[Any]] = None) -> List[SweepUser]:
+    """All active users who have given data consent, optionally only among ``user_ids``"""
+    query = (
+        select(User.id, User.email, User.team_id, User.slack_user_id, User.google_user_id)
+        .where(User.is_active.is_(True), User.data_consent_given.is_(True))
+    )
+    if user_ids is not None:
+        query = query.where(User.id.in_(user_ids))
+    result = await db.execute(query)
+    return [SweepUser(*row) for row in result.all()]
+
+async def persist_shard(db: AsyncSession, result: ShardResult) -> Tuple[int, int]:
+    """Write a shard's signals and nudges in a single transaction"""
+    if not result.signals:
+        return 0, 0
+    signals = await create_signals_bulk(db, result.signals)
+
+    engine = _get_engine()
+    nudges = [nudge for nudge in (engine.generate_nudge(signal) for signal in signals) if nudge]
+    await create_nudges_bulk(db, nudges)
+    await db.commit()
+    return len(signals), len(nudges)
+
+async def run_sweep(
+    *,
+    processes: Optional[int] = None,
+    shards: Optional[int] = None,
+    fetcher: MetadataFetcher = fetch_connected_metadata,
+    dry_run: bool = False
+) -> SweepSummary:
+    """List consenting users, score them across a process pool and persist the results"""
+    start = time.perf_counter()
+    summary = SweepSummary()
+    async with AsyncSessionLocal() as db:
+        users = await list_sweep_users(db)
+        summary.users = len(users)
+        logger.info(f"Sweeping {len(users)} users")
+
+        async def on_shard_done(result: ShardResult, completed: int, total: int) -> None:
+            summary.errors += result.errors
+            if dry_run:
+                summary.signals += len(result.signals)
+                return
+            signals, nudges = await persist_shard(db, result)
+            summary.signals += signals
+            summary.nudges += nudges
+
+        results = await sweep_users(
+            users,
+            processes=processes,
+            shards=shards,
+            fetcher=fetcher,
+            on_shard_done=on_shard_done
+        )
+    summary.shards = len(results)
+    summary.elapsed = time.perf_counter() - start
+    logger.info(
+        f"Sweep finished: {summary.users} users in {summary.shards} shards, "
+        f"{summary.signals} signals, {summary.nudges} nudges, {summary.errors} errors "
+        f"in {summary.elapsed:.2f}s"
+    )
+    return summary
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the org-wide signal sweep")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--shards", type=int, default=None, help="number of shards (default: 4 per process)")
+    parser.add_argument("--dry-run", action="store_true", help="score without writing results")
+    parser.add_argument("--no-fetch", action="store_true", help="score without calling providers")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    fetcher = fetch_no_metadata if args.no_fetch else fetch_connected_metadata
+    asyncio.run(run_sweep(processes=args.processes, shards=args.shards, fetcher=fetcher, dry_run=args.dry_run))
+
+if __name__ == "__main__":
+    main()
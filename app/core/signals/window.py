@@ -0,0 +1,195 @@
+from typing import Dict, Any, Optional, Tuple, Hashable
+from dataclasses import dataclass, field
+from collections import Counter, deque
+from datetime import datetime, date, timedelta
+import enum
+import threading
+
+# Same cut-off GoogleOAuth.get_calendar_metadata uses for after-hours meetings
+AFTER_HOURS_START = 18
+
+class ActivityKind(str, enum.Enum):
+    MEETING = "meeting"
+    EMAIL = "email"
+    SLACK_ACTIVITY = "slack_activity"
+    SLACK_CHANNELS = "slack_channels"
+
+@dataclass(frozen=True)
+class ActivityEvent:
+    """A single metadata-only activity event.
+
+    * ``MEETING``: ``timestamp`` is the start, ``duration_hours`` the length
+    * ``EMAIL``: one message, optionally in ``thread_id``
+    * ``SLACK_ACTIVITY``: presence/message burst at ``timestamp`` with
+      ``count`` reactions (0 for a plain presence change)
+    * ``SLACK_CHANNELS``: ``count`` is the current channel membership
+    """
+    kind: ActivityKind
+    timestamp: datetime
+    duration_hours: float = 0.0
+    count: int = 0
+    thread_id: Optional[str] = None
+
+@dataclass
+class _DayBucket:
+    day: date
+    meetings: int = 0
+    duration_hours: float = 0.0
+    after_hours_meetings: int = 0
+    messages: int = 0
+    reactions: int = 0
+    threads: set = field(default_factory=set)
+
+class ActivityState:
+    """Rolling window of one user's activity, kept as per-day buckets.
+
+    Each event updates one bucket and the running window totals in O(1);
+    buckets falling out of the window are subtracted from the totals as
+    time advances, so reading the aggregates never rescans events.
+    """
+
+    def __init__(self, window_days: int = 7):
+        self.window_days = window_days
+        self._buckets: Dict[date, _DayBucket] = {}
+        self._days: deque = deque()
+        self._thread_days: Counter = Counter()
+        self.total_meetings = 0
+        self.total_duration_hours = 0.0
+        self.after_hours_meetings = 0
+        self.total_messages = 0
+        self.reaction_count = 0
+        self.channel_count: Optional[int] = None
+        self.last_active: Optional[datetime] = None
+        self.sources: set = set()
+
+    @property
+    def thread_count(self) -> int:
+        return len(self._thread_days)
+
+    def _window_start(self, now: datetime) -> date:
+        return now.date() - timedelta(days=self.window_days - 1)
+
+    def expire(self, now: datetime) -> None:
+        """Drop buckets older than the window ending at ``now``"""
+        start = self._window_start(now)
+        while self._days and self._days[0] < start:
+            bucket = self._buckets.pop(self._days.popleft())
+            self.total_meetings -= bucket.meetings
+            self.total_duration_hours -= bucket.duration_hours
+            self.after_hours_meetings -= bucket.after_hours_meetings
+            self.total_messages -= bucket.messages
+            self.reaction_count -= bucket.reactions
+            for thread_id in bucket.threads:
+                self._thread_days[thread_id] -= 1
+                if not self._thread_days[thread_id]:
+                    del self._thread_days[thread_id]
+        if not self._days:
+            self.total_duration_hours = 0.0  # Shed accumulated float error
+        if self.last_active and self.last_active.date() < start:
+            self.last_active = None
+
+    def _bucket(self, day: date) -> _DayBucket:
+        bucket = self._buckets.get(day)
+        if bucket is None:
+            bucket = self._buckets[day] = _DayBucket(day=day)
+            if not self._days or day > self._days[-1]:
+                self._days.append(day)
+            else:
+                # Late event for an earlier day still inside the window
+                self._days = deque(sorted((*self._days, day)))
+        return bucket
+
+    def apply(self, event: ActivityEvent, now: Optional[datetime] = None) -> bool:
+        """Fold an event into the window; returns False if it is already expired"""
+        now = now or datetime.utcnow()
+        self.expire(now)
+        if event.kind == ActivityKind.SLACK_CHANNELS:
+            self.sources.add("slack")
+            self.channel_count = event.count
+            return True
+
+        day = event.timestamp.date()
+        if day < self._window_start(now):
+            return False
+        bucket = self._bucket(day)
+
+        if event.kind == ActivityKind.MEETING:
+            self.sources.add("calendar")
+            bucket.meetings += 1
+            bucket.duration_hours += event.duration_hours
+            self.total_meetings += 1
+            self.total_duration_hours += event.duration_hours
+            if event.timestamp.hour >= AFTER_HOURS_START:
+                bucket.after_hours_meetings += 1
+                self.after_hours_meetings += 1
+        elif event.kind == ActivityKind.EMAIL:
+            self.sources.add("gmail")
+            bucket.messages += 1
+            self.total_messages += 1
+            if event.thread_id and event.thread_id not in bucket.threads:
+                bucket.threads.add(event.thread_id)
+                self._thread_days[event.thread_id] += 1
+        elif event.kind == ActivityKind.SLACK_ACTIVITY:
+            self.sources.add("slack")
+            bucket.reactions += event.count
+            self.reaction_count += event.count
+            if self.last_active is None or event.timestamp > self.last_active:
+                self.last_active = event.timestamp
+        return True
+
+    def to_metadata(
+        self, now: Optional[datetime] = None
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Current window as (slack, calendar, gmail) metadata in the fetchers' shapes"""
+        self.expire(now or datetime.utcnow())
+        slack = calendar = gmail = None
+        if "slack" in self.sources:
+            slack = {
+                "channel_count": self.channel_count or 0,
+                "reaction_count": self.reaction_count,
+                "last_active": self.last_active.isoformat() if self.last_active else None
+            }
+        if "calendar" in self.sources:
+            calendar = {
+                "total_meetings": self.total_meetings,
+                "total_duration_hours": self.total_duration_hours,
+                "after_hours_meetings": self.after_hours_meetings,
+                "average_duration_hours": (
+                    self.total_duration_hours / self.total_meetings if self.total_meetings else 0
+                )
+            }
+        if "gmail" in self.sources:
+            gmail = {
+                "total_messages": self.total_messages,
+                "thread_count": self.thread_count
+            }
+        return slack, calendar, gmail
+
+class ActivityStore:
+    """In-process registry of per-user rolling windows"""
+
+    def __init__(self, window_days: int = 7):
+        self.window_days = window_days
+        self._states: Dict[Hashable, ActivityState] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: Hashable) -> Optional[ActivityState]:
+        return self._states.get(user_id)
+
+    def apply(self, user_id: Hashable, event: ActivityEvent, now: Optional[datetime] = None) -> ActivityState:
+        """Fold an event into the user's window, creating it on first use"""
+        with self._lock:
+            state = self._states.get(user_id)
+            if state is None:
+                state = self._states[user_id] = ActivityState(self.window_days)
+            state.apply(event, now)
+        return state
+
+    def discard(self, user_id: Hashable) -> None:
+        with self._lock:
+            self._states.pop(user_id, None)
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+activity_store = ActivityStore()
@@ -0,0 +1,128 @@
+"""Short-lived cache of authenticated users for verify_token.
+
+Entries are keyed by the token subject (the user's email) and hold a
+detached, read-only snapshot of the user row, so a cache hit costs no
+database round trip. The CRUD layer invalidates entries when a user,
+their role or their team membership changes. The cache is per process,
+so changes made by another worker become visible after at most
+USER_CACHE_TTL_SECONDS.
+"""
+from typing import Dict, Any, Optional, Hashable
+from dataclasses import dataclass
+from collections import OrderedDict
+from datetime import datetime
+from uuid import UUID
+import threading
+import time
+from app.core.config import settings
+from app.models.user import User, UserRole
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """Read-only snapshot of the user fields endpoints rely on"""
+    id: UUID
+    email: str
+    full_name: Optional[str]
+    role: UserRole
+    is_active: bool
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    slack_user_id: Optional[str]
+    google_user_id: Optional[str]
+    data_consent_given: bool
+    data_consent_updated_at: Optional[datetime]
+    team_id: Optional[UUID]
+
+    @classmethod
+    def from_user(cls, user: User) -> "CurrentUser":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            role=user.role,
+            is_active=user.is_active,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+            slack_user_id=user.slack_user_id,
+            google_user_id=user.google_user_id,
+            data_consent_given=user.data_consent_given,
+            data_consent_updated_at=user.data_consent_updated_at,
+            team_id=user.team_id
+        )
+
+class UserCache:
+    """Bounded LRU of CurrentUser snapshots with a per-entry TTL"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._emails_by_id: Dict[Hashable, str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, email: str) -> Optional[CurrentUser]:
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None:
+                self.misses += 1
+                return None
+            user, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._pop(email)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(email)
+            self.hits += 1
+            return user
+
+    def set(self, user: CurrentUser) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._pop(user.email)
+            self._entries[user.email] = (user, time.monotonic() + self.ttl)
+            self._emails_by_id[user.id] = user.email
+            while len(self._entries) > self.maxsize:
+                oldest = next(iter(self._entries))
+                self._pop(oldest)
+                self.evictions += 1
+
+    def _pop(self, email: str) -> None:
+        entry = self._entries.pop(email, None)
+        if entry is not None:
+            self._emails_by_id.pop(entry[0].id, None)
+
+    def invalidate(self, email: Optional[str] = None, user_id: Optional[Hashable] = None) -> None:
+        """Drop the entry for a user, looked up by email and/or id"""
+        with self._lock:
+            if user_id is not None and user_id in self._emails_by_id:
+                self._pop(self._emails_by_id[user_id])
+                self.invalidations += 1
+            if email is not None and email in self._entries:
+                self._pop(email)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._emails_by_id.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+user_cache = UserCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
@@ -0,0 +1,319 @@
+"""Push-based activity ingestion.
+
+Slack Events API callbacks and Google push notifications are verified,
+put on an in-process queue and acknowledged straight away; a consumer
+task drains the queue in batches:
+
+* Slack message, reaction and channel membership events update the
+  user's cached Slack metadata in place (last activity, reaction and
+  channel counts), so every worker's next signal run sees them. A user
+  with nothing cached is skipped: their next run fetches from Slack,
+  which already counts the event. Only the event type, user and
+  timestamp are read; message text never leaves the request.
+* Google Calendar and Gmail notifications carry no event data, only
+  "something changed" for a user. The consumer runs the incremental
+  Calendar/Gmail sync for that user (sync token / historyId, so only the
+  changes are fetched) and puts the result in the metadata cache, so the
+  next signal run is served without calling Google.
+
+Several notifications for one user in a batch cost one sync, and events
+Slack retries are recognised by their event_id and applied once.
+"""
+from typing import Dict, Any, Optional, List, Tuple, Callable
+from dataclasses import dataclass, field
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import time
+from uuid import UUID
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.metadata_cache import metadata_cache
+from app.core.oauth.google import GoogleOAuth
+from app.core.oauth.resilience import ProviderUnavailable, provider_guards
+from app.core.signals.fetch import google_credentials
+from app.crud.integration import get_user_token
+from app.db.session import AsyncSessionLocal
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+SLACK_SIGNATURE_VERSION = "v0"
+# Plain messages and the subtypes that are still a user writing something
+SLACK_MESSAGE_SUBTYPES = {None, "thread_broadcast", "file_share", "me_message"}
+# The only Slack event fields that are queued, so message text is never kept
+SLACK_EVENT_FIELDS = ("type", "subtype", "user", "ts", "event_ts")
+SEEN_EVENT_IDS = 10000  # Recent Slack event ids remembered for de-duplication
+
+def verify_slack_signature(
+    body: bytes, timestamp: Optional[str], signature: Optional[str], *, now: Optional[float] = None
+) -> bool:
+    """Slack request signature check (HMAC-SHA256 of ``v0:timestamp:body``), rejecting replays"""
+    if not settings.SLACK_SIGNING_SECRET or not timestamp or not signature:
+        return False
+    try:
+        age = abs((now or time.time()) - int(timestamp))
+    except ValueError:
+        return False
+    if age > settings.SLACK_REQUEST_MAX_AGE_SECONDS:
+        return False
+    basestring = f"{SLACK_SIGNATURE_VERSION}:{timestamp}:".encode() + body
+    expected = hmac.new(settings.SLACK_SIGNING_SECRET.encode(), basestring, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(f"{SLACK_SIGNATURE_VERSION}={expected}", signature)
+
+def _channel_signature(user_id: str) -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), f"push:{user_id}".encode(), hashlib.sha256).hexdigest()
+
+def push_channel_token(user_id: Any) -> str:
+    """Token for a Calendar watch channel; Google echoes it on every notification"""
+    return f"{user_id}.{_channel_signature(str(user_id))}"
+
+def user_for_channel_token(token: Optional[str]) -> Optional[str]:
+    """User id of a genuine channel token, else ``None``"""
+    if not token or "." not in token:
+        return None
+    user_id, signature = token.rsplit(".", 1)
+    return user_id if hmac.compare_digest(_channel_signature(user_id), signature) else None
+
+def verify_push_token(token: Optional[str]) -> bool:
+    """Shared secret in the Pub/Sub push subscription URL"""
+    return bool(settings.GOOGLE_PUSH_TOKEN) and hmac.compare_digest(settings.GOOGLE_PUSH_TOKEN, token or "")
+
+def gmail_notification(body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """``{emailAddress, historyId, message_id}`` from a Pub/Sub push body"""
+    message = body.get("message") or {}
+    try:
+        data = json.loads(base64.b64decode(message.get("data") or ""))
+    except ValueError:
+        return None
+    if not data.get("emailAddress"):
+        return None
+    return {**data, "message_id": message.get("messageId")}
+
+def _slack_time(value: Any) -> datetime:
+    return datetime.fromtimestamp(float(value), timezone.utc)
+
+@dataclass(frozen=True)
+class SlackActivity:
+    """What one Slack event changes in the user's metadata"""
+    active_at: Optional[datetime] = None
+    reactions: int = 0
+    channels: int = 0  # Membership change, +1 or -1
+
+def slack_activity(event: Dict[str, Any]) -> Optional[Tuple[str, SlackActivity]]:
+    """(slack user, SlackActivity) for the event types that change Slack metadata"""
+    event_type = event.get("type")
+    user = event.get("user")
+    if isinstance(user, dict):  # user_change and similar carry the whole profile
+        user = user.get("id")
+    if not user:
+        return None
+    if event_type == "message" and event.get("subtype") in SLACK_MESSAGE_SUBTYPES:
+        return user, SlackActivity(active_at=_slack_time(event["ts"]))
+    if event_type == "reaction_added":
+        return user, SlackActivity(active_at=_slack_time(event["event_ts"]), reactions=1)
+    if event_type == "member_joined_channel":
+        return user, SlackActivity(channels=1)
+    if event_type == "member_left_channel":
+        return user, SlackActivity(channels=-1)
+    return None
+
+def apply_slack_activity(metadata: Dict[str, Any], activities: List[SlackActivity]) -> Dict[str, Any]:
+    """SlackOAuth.get_user_metadata output with webhook activity folded in"""
+    metadata = dict(metadata)
+    last_active = metadata.get("last_active")
+    if last_active:
+        last_active = datetime.fromisoformat(last_active)
+        if last_active.tzinfo is None:
+            last_active = last_active.replace(tzinfo=timezone.utc)
+    for activity in activities:
+        if activity.active_at and (not last_active or activity.active_at > last_active):
+            last_active = activity.active_at
+        metadata["reaction_count"] = (metadata.get("reaction_count") or 0) + activity.reactions
+        if activity.channels and metadata.get("channel_count") is not None:
+            metadata["channel_count"] = max(0, metadata["channel_count"] + activity.channels)
+    metadata["last_active"] = last_active.isoformat() if last_active else None
+    return metadata
+
+@dataclass
+class WebhookEvent:
+    source: str  # slack, calendar or gmail
+    payload: Dict[str, Any]
+    received_at: float = field(default_factory=time.monotonic)
+
+class WebhookIngestor:
+    """Bounded queue of verified webhook events and the task that applies them"""
+
+    def __init__(
+        self,
+        maxsize: int,
+        batch_size: int,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal
+    ):
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+        self.google_oauth = GoogleOAuth()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self.counts = Counter()
+        self.max_lag_ms = 0.0
+
+    def submit(self, source: str, payload: Dict[str, Any], event_id: Optional[str] = None) -> bool:
+        """Queue an event without waiting; False when it was dropped because the queue is full"""
+        if event_id:
+            if event_id in self._seen:
+                self.counts["duplicate"] += 1
+                return True
+            self._seen[event_id] = None
+            if len(self._seen) > SEEN_EVENT_IDS:
+                self._seen.popitem(last=False)
+        try:
+            self._queue.put_nowait(WebhookEvent(source, payload))
+        except asyncio.QueueFull:
+            self.counts["dropped"] += 1
+            if event_id:
+                # Let the provider's retry through
+                self._seen.pop(event_id, None)
+            return False
+        self.counts[f"received_{source}"] += 1
+        return True
+
+    def _take_batch(self, limit: int) -> List[WebhookEvent]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _apply_slack(self, db: AsyncSession, events: List[Dict[str, Any]]) -> None:
+        activities = [activity for activity in map(slack_activity, events) if activity]
+        self.counts["ignored"] += len(events) - len(activities)
+        if not activities:
+            return
+        result = await db.execute(
+            select(User.slack_user_id, User.id).filter(
+                User.slack_user_id.in_({slack_user for slack_user, _ in activities})
+            )
+        )
+        users = dict(result.all())
+        by_user: Dict[Any, List[SlackActivity]] = {}
+        for slack_user, activity in activities:
+            user_id = users.get(slack_user)
+            if user_id is None:
+                self.counts["unmatched"] += 1
+                continue
+            by_user.setdefault(user_id, []).append(activity)
+        for user_id, changes in by_user.items():
+            updated = await metadata_cache.update(
+                "slack", user_id, lambda metadata: apply_slack_activity(metadata, changes)
+            )
+            if updated:
+                self.counts["applied"] += len(changes)
+            else:
+                self.counts["uncached"] += len(changes)
+
+    async def _gmail_users(self, db: AsyncSession, notifications: List[Dict[str, Any]]) -> List[Any]:
+        # Gmail names the mailbox only; it is matched to the Tend account email
+        addresses = {notification["emailAddress"].lower() for notification in notifications}
+        result = await db.execute(select(User.id, User.email).filter(func.lower(User.email).in_(addresses)))
+        users = result.all()
+        self.counts["unmatched"] += len(addresses) - len(users)
+        return [user_id for user_id, _ in users]
+
+    async def _sync(self, provider: str, user_id: Any) -> None:
+        """Incremental sync for one user after a push notification"""
+        try:
+            async with self.session_factory() as db:
+                token = await get_user_token(db, user_id, "google")
+                if token is None:
+                    self.counts["unmatched"] += 1
+                    return
+                sync = self.google_oauth.sync_calendar_metadata if provider == "calendar" \
+                    else self.google_oauth.sync_gmail_metadata
+                credentials = google_credentials(token)
+                metadata = await provider_guards[provider].call(lambda: sync(db, user_id, credentials))
+            if metadata is not None:
+                await metadata_cache.put(provider, user_id, metadata)
+                self.counts[f"synced_{provider}"] += 1
+        except ProviderUnavailable:
+            # The next notification or poll picks the changes up
+            self.counts["sync_deferred"] += 1
+        except Exception as e:
+            self.counts["sync_errors"] += 1
+            logger.error(f"{provider} push sync for user {user_id} failed: {str(e)}")
+
+    async def process(self, batch: List[WebhookEvent]) -> None:
+        """Apply one batch of events"""
+        by_source: Dict[str, List[Dict[str, Any]]] = {"slack": [], "calendar": [], "gmail": []}
+        now = time.monotonic()
+        for event in batch:
+            by_source[event.source].append(event.payload)
+            self.max_lag_ms = max(self.max_lag_ms, round((now - event.received_at) * 1000, 1))
+
+        syncs = {("calendar", UUID(payload["user_id"])) for payload in by_source["calendar"]}
+        async with self.session_factory() as db:
+            if by_source["slack"]:
+                await self._apply_slack(db, by_source["slack"])
+            if by_source["gmail"]:
+                syncs.update(("gmail", user_id) for user_id in await self._gmail_users(db, by_source["gmail"]))
+        self.counts["coalesced"] += len(by_source["calendar"]) + len(by_source["gmail"]) - len(syncs)
+
+        semaphore = asyncio.Semaphore(settings.WEBHOOK_SYNC_CONCURRENCY)
+
+        async def sync(provider: str, user_id: Any) -> None:
+            async with semaphore:
+                await self._sync(provider, user_id)
+
+        await asyncio.gather(*(sync(provider, user_id) for provider, user_id in syncs))
+
+    async def drain(self) -> int:
+        """Apply everything queued so far; returns the number of events"""
+        total = 0
+        while True:
+            batch = self._take_batch(self.batch_size)
+            if not batch:
+                return total
+            await self.process(batch)
+            total += len(batch)
+
+    async def _run(self) -> None:
+        while True:
+            first = await self._queue.get()
+            batch = [first] + self._take_batch(self.batch_size - 1)
+            try:
+                await self.process(batch)
+            except Exception as e:
+                self.counts["batch_errors"] += 1
+                logger.error(f"Webhook batch of {len(batch)} events failed: {str(e)}")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "queued": self._queue.qsize(),
+            "max_lag_ms": self.max_lag_ms,
+            **self.counts
+        }
+
+webhook_ingestor = WebhookIngestor(maxsize=settings.WEBHOOK_QUEUE_SIZE, batch_size=settings.WEBHOOK_BATCH_SIZE)
@@ -0,0 +1,239 @@
+from typing import Dict, Any, Optional, List, Tuple
+from datetime import datetime, date, timedelta, timezone
+from sqlalchemy import select, update, delete, or_, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.integration import IntegrationToken, CalendarSyncState, GmailSyncState, GmailDailyCount
+from app.core.config import settings
+from uuid import UUID
+import random
+
+# Token response fields that are stored in their own columns or never stored
+_TOKEN_FIELDS = {
+    "access_token", "token", "refresh_token", "expires_in", "expiry", "scope", "scopes",
+    "client_id", "client_secret", "token_uri", "id_token", "ok"
+}
+
+def refresh_due_at(expires_at: Optional[datetime]) -> Optional[datetime]:
+    """When to renew a token: TOKEN_REFRESH_MARGIN_SECONDS before expiry plus random
+    lead time, so tokens issued together are not all renewed in the same pass"""
+    if expires_at is None:
+        return None
+    lead = settings.TOKEN_REFRESH_MARGIN_SECONDS + random.uniform(0, settings.TOKEN_REFRESH_JITTER_SECONDS)
+    return expires_at - timedelta(seconds=lead)
+
+def _token_values(token_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Column values from a provider token response or GoogleOAuth.exchange_code result"""
+    access_token = token_data.get("access_token") or token_data.get("token") \
+        or (token_data.get("authed_user") or {}).get("access_token")
+    if not access_token:
+        raise ValueError("Token response has no access token")
+    expires_at = None
+    if token_data.get("expires_in"):
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=int(token_data["expires_in"]))
+    elif token_data.get("expiry"):
+        expires_at = datetime.fromisoformat(token_data["expiry"].replace("Z", "+00:00"))
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+    scopes = token_data.get("scope") or token_data.get("scopes")
+    if isinstance(scopes, (list, tuple)):
+        scopes = " ".join(scopes)
+    return {
+        "access_token": access_token,
+        "refresh_token": token_data.get("refresh_token"),
+        "scopes": scopes,
+        "expires_at": expires_at,
+        "refresh_after": refresh_due_at(expires_at),
+        "refresh_failures": 0,
+        "refresh_error": None,
+        # Only flat, non-secret values such as team and user ids
+        "extra": {
+            key: value for key, value in token_data.items()
+            if key not in _TOKEN_FIELDS and isinstance(value, (str, int, bool))
+        }
+    }
+
+async def get_user_tokens(db: AsyncSession, user_id: UUID) -> Dict[str, IntegrationToken]:
+    """A user's stored tokens by provider"""
+    result = await db.execute(select(IntegrationToken).filter(IntegrationToken.user_id == user_id))
+    return {token.provider: token for token in result.scalars()}
+
+async def get_user_token(db: AsyncSession, user_id: UUID, provider: str) -> Optional[IntegrationToken]:
+    """A user's stored token for one provider"""
+    result = await db.execute(
+        select(IntegrationToken).filter(IntegrationToken.user_id == user_id, IntegrationToken.provider == provider)
+    )
+    return result.scalar_one_or_none()
+
+async def store_oauth_tokens(
+    db: AsyncSession, user_id: UUID, provider: str, token_data: Dict[str, Any]
+) -> IntegrationToken:
+    """Insert or replace a user's tokens for a provider"""
+    values = _token_values(token_data)
+    if not values["refresh_token"]:
+        # Google only returns a refresh token on first consent; keep the one we have
+        values.pop("refresh_token")
+    stmt = insert(IntegrationToken).values(user_id=user_id, provider=provider, **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[IntegrationToken.user_id, IntegrationToken.provider],
+        set_={**values, "updated_at": datetime.now(timezone.utc)}
+    ).returning(IntegrationToken)
+    result = await db.execute(stmt, execution_options={"populate_existing": True})
+    token = result.scalar_one()
+    await db.commit()
+    return token
+
+async def delete_oauth_tokens(db: AsyncSession, user_id: UUID, provider: str) -> None:
+    """Forget a user's tokens for a provider"""
+    await db.execute(
+        delete(IntegrationToken).where(IntegrationToken.user_id == user_id, IntegrationToken.provider == provider)
+    )
+    await db.commit()
+
+async def claim_tokens_for_refresh(
+    db: AsyncSession, *, providers: List[str], limit: int, lease_seconds: int
+) -> List[IntegrationToken]:
+    """Tokens due for renewal, oldest due first.
+
+    Claimed rows get ``refresh_after`` pushed out by ``lease_seconds``, so
+    refreshers in other workers skip them; a successful refresh or a
+    recorded failure sets it again.
+    """
+    now = datetime.now(timezone.utc)
+    due = select(IntegrationToken.user_id, IntegrationToken.provider).where(
+        IntegrationToken.refresh_after <= now,
+        IntegrationToken.provider.in_(providers),
+        IntegrationToken.refresh_token.isnot(None)
+    ).order_by(IntegrationToken.refresh_after).limit(limit).with_for_update(skip_locked=True)
+    stmt = update(IntegrationToken).where(
+        tuple_(IntegrationToken.user_id, IntegrationToken.provider).in_(due)
+    ).values(refresh_after=now + timedelta(seconds=lease_seconds)).returning(IntegrationToken)
+    result = await db.execute(stmt, execution_options={"populate_existing": True})
+    tokens = list(result.scalars())
+    await db.commit()
+    return tokens
+
+async def record_token_refresh_failure(
+    db: AsyncSession, user_id: UUID, provider: str, *, error: str, retry_at: Optional[datetime]
+) -> None:
+    """Count a failed renewal; without ``retry_at`` the token is not retried until the user reconnects"""
+    await db.execute(
+        update(IntegrationToken).where(
+            IntegrationToken.user_id == user_id, IntegrationToken.provider == provider
+        ).values(
+            refresh_after=retry_at,
+            refresh_failures=IntegrationToken.refresh_failures + 1,
+            refresh_error=None if retry_at else error
+        )
+    )
+    await db.commit()
+
+async def get_calendar_sync_state(db: AsyncSession, user_id: UUID) -> Optional[CalendarSyncState]:
+    """Get a user's calendar sync state"""
+    result = await db.execute(select(CalendarSyncState).filter(CalendarSyncState.user_id == user_id))
+    return result.scalar_one_or_none()
+
+async def save_calendar_sync_state(
+    db: AsyncSession,
+    user_id: UUID,
+    *,
+    sync_token: Optional[str],
+    events: Dict[str, Any],
+    full_sync: bool
+) -> CalendarSyncState:
+    """Insert or update a user's calendar sync state in one statement"""
+    now = datetime.now(timezone.utc)
+    values = {"sync_token": sync_token, "events": events, "last_synced_at": now}
+    if full_sync:
+        values["last_full_sync_at"] = now
+    stmt = insert(CalendarSyncState).values(user_id=user_id, **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CalendarSyncState.user_id],
+        set_={**values, "updated_at": now}
+    ).returning(CalendarSyncState)
+    result = await db.execute(stmt, execution_options={"populate_existing": True})
+    state = result.scalar_one()
+    await db.commit()
+    return state
+
+async def reset_calendar_sync_state(db: AsyncSession, user_id: UUID) -> None:
+    """Forget a user's sync state, e.g. when Google is disconnected"""
+    await db.execute(delete(CalendarSyncState).where(CalendarSyncState.user_id == user_id))
+    await db.commit()
+
+async def get_gmail_sync_state(db: AsyncSession, user_id: UUID) -> Optional[GmailSyncState]:
+    """Get a user's Gmail sync state"""
+    result = await db.execute(select(GmailSyncState).filter(GmailSyncState.user_id == user_id))
+    return result.scalar_one_or_none()
+
+async def save_gmail_sync(
+    db: AsyncSession,
+    user_id: UUID,
+    *,
+    history_id: Optional[str],
+    messages: Dict[str, Any],
+    day_threads: Dict[date, List[str]],
+    window_start: date,
+    full_sync: bool
+) -> GmailSyncState:
+    """Store the sync checkpoint and the recounted days in one transaction.
+
+    ``day_threads`` maps each changed day to the thread id of every message
+    on it (empty for days that no longer have messages). A full sync
+    replaces every counter row; otherwise only the given days change and
+    rows that fell out of the window are dropped.
+    """
+    now = datetime.now(timezone.utc)
+    stale = delete(GmailDailyCount).where(GmailDailyCount.user_id == user_id)
+    if not full_sync:
+        stale = stale.where(or_(
+            GmailDailyCount.day < window_start,
+            GmailDailyCount.day.in_(list(day_threads))
+        ))
+    await db.execute(stale)
+    rows = [
+        {
+            "user_id": user_id,
+            "day": day,
+            "messages": len(thread_ids),
+            "threads": len(set(thread_ids)),
+            "thread_ids": sorted(set(thread_ids)),
+            "updated_at": now
+        }
+        for day, thread_ids in day_threads.items()
+        if thread_ids and day >= window_start
+    ]
+    if rows:
+        await db.execute(insert(GmailDailyCount), rows)
+
+    values = {"history_id": history_id, "messages": messages, "last_synced_at": now}
+    if full_sync:
+        values["last_full_sync_at"] = now
+    stmt = insert(GmailSyncState).values(user_id=user_id, **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[GmailSyncState.user_id],
+        set_={**values, "updated_at": now}
+    ).returning(GmailSyncState)
+    result = await db.execute(stmt, execution_options={"populate_existing": True})
+    state = result.scalar_one()
+    await db.commit()
+    return state
+
+async def get_gmail_window_counts(db: AsyncSession, user_id: UUID, since: date) -> Tuple[int, int]:
+    """(messages, distinct threads) across the counter rows from ``since`` on"""
+    result = await db.execute(
+        select(GmailDailyCount.messages, GmailDailyCount.thread_ids)
+        .filter(GmailDailyCount.user_id == user_id, GmailDailyCount.day >= since)
+    )
+    total_messages = 0
+    threads = set()
+    for messages, thread_ids in result:
+        total_messages += messages
+        threads.update(thread_ids)
+    return total_messages, len(threads)
+
+async def reset_gmail_sync_state(db: AsyncSession, user_id: UUID) -> None:
+    """Forget a user's Gmail checkpoint and counters"""
+    await db.execute(delete(GmailDailyCount).where(GmailDailyCount.user_id == user_id))
+    await db.execute(delete(GmailSyncState).where(GmailSyncState.user_id == user_id))
+    await db.commit()
@@ -0,0 +1,147 @@
+from typing import List, Optional, Dict, Any, Sequence, Set
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, update, delete, and_, or_, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.job import Job, JobStatus
+from uuid import UUID
+
+async def enqueue_jobs(db: AsyncSession, jobs: Sequence[Dict[str, Any]]) -> int:
+    """Queue jobs given as Job column values; those whose dedupe_key already exists are skipped.
+
+    Returns how many were queued.
+    """
+    if not jobs:
+        return 0
+    now = datetime.now(timezone.utc)
+    rows = [{"payload": {}, "dedupe_key": None, "group_key": None, "run_after": now, **job} for job in jobs]
+    result = await db.execute(
+        pg_insert(Job).values(rows).on_conflict_do_nothing(index_elements=[Job.dedupe_key]).returning(Job.id)
+    )
+    queued = len(result.all())
+    await db.commit()
+    return queued
+
+async def enqueue_job(
+    db: AsyncSession,
+    kind: str,
+    payload: Optional[Dict[str, Any]] = None,
+    *,
+    max_attempts: int,
+    dedupe_key: Optional[str] = None,
+    group_key: Optional[str] = None,
+    run_after: Optional[datetime] = None
+) -> bool:
+    """Queue one job; False if a job with ``dedupe_key`` already exists"""
+    job = {
+        "kind": kind,
+        "payload": payload or {},
+        "max_attempts": max_attempts,
+        "dedupe_key": dedupe_key,
+        "group_key": group_key,
+        "run_after": run_after or datetime.now(timezone.utc)
+    }
+    return await enqueue_jobs(db, [job]) == 1
+
+async def get_job(db: AsyncSession, job_id: UUID) -> Optional[Job]:
+    result = await db.execute(select(Job).filter(Job.id == job_id))
+    return result.scalar_one_or_none()
+
+async def claim_jobs(
+    db: AsyncSession, *, worker_id: str, limit: int, lease_seconds: int, kinds: Optional[List[str]] = None
+) -> List[Job]:
+    """Due jobs, oldest due first, leased to ``worker_id``.
+
+    Queued jobs past ``run_after`` are due, and so are running jobs whose
+    lease lapsed because their worker stopped renewing it. Rows locked by
+    another worker's claim are skipped, so concurrent workers never claim
+    the same job. Claiming counts an attempt.
+    """
+    now = datetime.now(timezone.utc)
+    due = select(Job.id).where(or_(
+        and_(Job.status == JobStatus.QUEUED, Job.run_after <= now),
+        and_(Job.status == JobStatus.RUNNING, Job.lease_expires_at < now)
+    ))
+    if kinds is not None:
+        due = due.where(Job.kind.in_(kinds))
+    due = due.order_by(Job.run_after).limit(limit).with_for_update(skip_locked=True)
+    stmt = update(Job).where(Job.id.in_(due)).values(
+        status=JobStatus.RUNNING,
+        locked_by=worker_id,
+        lease_expires_at=now + timedelta(seconds=lease_seconds),
+        attempts=Job.attempts + 1
+    ).returning(Job)
+    result = await db.execute(stmt, execution_options={"populate_existing": True})
+    jobs = sorted(result.scalars(), key=lambda job: job.run_after)
+    await db.commit()
+    return jobs
+
+async def renew_job_leases(
+    db: AsyncSession, *, worker_id: str, job_ids: Sequence[UUID], lease_seconds: int
+) -> Set[UUID]:
+    """Extend the leases ``worker_id`` still holds; returns their ids"""
+    if not job_ids:
+        return set()
+    result = await db.execute(
+        update(Job).where(
+            Job.id.in_(job_ids), Job.locked_by == worker_id, Job.status == JobStatus.RUNNING
+        ).values(
+            lease_expires_at=datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)
+        ).returning(Job.id)
+    )
+    held = set(result.scalars())
+    await db.commit()
+    return held
+
+async def _finish(db: AsyncSession, job_id: UUID, worker_id: str, **values: Any) -> bool:
+    # Only the lease holder may settle a job: a worker that lost its lease
+    # must not overwrite the outcome of the worker that took the job over
+    result = await db.execute(
+        update(Job).where(
+            Job.id == job_id, Job.locked_by == worker_id, Job.status == JobStatus.RUNNING
+        ).values(locked_by=None, lease_expires_at=None, **values)
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+async def complete_job(
+    db: AsyncSession, job_id: UUID, *, worker_id: str, result: Optional[Dict[str, Any]] = None
+) -> bool:
+    """Mark a job done; False if ``worker_id`` no longer holds it"""
+    return await _finish(
+        db, job_id, worker_id,
+        status=JobStatus.DONE, result=result, last_error=None, finished_at=datetime.now(timezone.utc)
+    )
+
+async def fail_job(
+    db: AsyncSession, job_id: UUID, *, worker_id: str, error: str, retry_at: Optional[datetime]
+) -> bool:
+    """Record a failed attempt; without ``retry_at`` the job is dead and not run again"""
+    if retry_at is None:
+        return await _finish(
+            db, job_id, worker_id, status=JobStatus.DEAD, last_error=error, finished_at=datetime.now(timezone.utc)
+        )
+    return await _finish(db, job_id, worker_id, status=JobStatus.QUEUED, last_error=error, run_after=retry_at)
+
+async def release_job(db: AsyncSession, job_id: UUID, *, worker_id: str, run_after: datetime) -> bool:
+    """Put a claimed job back without counting the attempt, e.g. on shutdown"""
+    return await _finish(
+        db, job_id, worker_id, status=JobStatus.QUEUED, attempts=Job.attempts - 1, run_after=run_after
+    )
+
+async def get_job_group(db: AsyncSession, group_key: str) -> List[Job]:
+    """Jobs queued together under ``group_key``"""
+    result = await db.execute(select(Job).filter(Job.group_key == group_key).order_by(Job.created_at, Job.id))
+    return list(result.scalars())
+
+async def count_jobs_by_status(db: AsyncSession) -> Dict[str, int]:
+    result = await db.execute(select(Job.status, func.count()).group_by(Job.status))
+    return {status: count for status, count in result.all()}
+
+async def delete_finished_jobs(db: AsyncSession, before: datetime) -> int:
+    """Delete done and dead jobs finished before ``before``"""
+    result = await db.execute(
+        delete(Job).where(Job.status.in_([JobStatus.DONE, JobStatus.DEAD]), Job.finished_at < before)
+    )
+    await db.commit()
+    return result.rowcount
@@ -0,0 +1,27 @@
+from typing import Any, Optional, Sequence, Tuple
+from datetime import datetime
+from uuid import UUID
+import base64
+
+Cursor = Tuple[datetime, UUID]
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    """Opaque keyset cursor for the row at (created_at, id)"""
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+def next_cursor(items: Sequence[Any], limit: int) -> Optional[str]:
+    """Cursor after the last item of a full page, None when the listing is exhausted"""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(last.created_at, last.id)
@@ -1,11 +1,55 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence, Union
 from datetime import datetime
-from sqlalchemy import select, and_, or_, desc
+from sqlalchemy import select, insert, update, delete, and_, or_, desc, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.signal import Signal, Nudge
+from app.models.signal import Signal, Nudge, SignalRun
 from app.schemas.signal import SignalCreate, SignalUpdate, NudgeCreate, NudgeUpdate
+from app.crud.pagination import Cursor
 from uuid import UUID
 
+SignalIn = Union[SignalCreate, Signal, Dict[str, Any]]
+NudgeIn = Union[NudgeCreate, Nudge, Dict[str, Any]]
+
+def _signal_values(signal_in: SignalIn) -> Dict[str, Any]:
+    """Column values for a signal given as a schema, transient model or dict"""
+    if isinstance(signal_in, dict):
+        return signal_in
+    if isinstance(signal_in, Signal):
+        return {
+            "user_id": signal_in.user_id,
+            "type": signal_in.type,
+            "source": signal_in.source,
+            "severity": signal_in.severity,
+            "confidence": signal_in.confidence,
+            "extra_data": signal_in.extra_data or {}
+        }
+    return {
+        "user_id": signal_in.user_id,
+        "type": signal_in.type,
+        "source": signal_in.source,
+        "severity": signal_in.severity,
+        "confidence": signal_in.confidence,
+        "extra_data": signal_in.metadata
+    }
+
+def _nudge_values(nudge_in: NudgeIn) -> Dict[str, Any]:
+    """Column values for a nudge given as a schema, transient model or dict"""
+    if isinstance(nudge_in, dict):
+        return {"is_read": False, **nudge_in}
+    extra_data = nudge_in.extra_data if isinstance(nudge_in, Nudge) else nudge_in.metadata
+    return {
+        "user_id": nudge_in.user_id,
+        "signal_id": nudge_in.signal_id,
+        "type": nudge_in.type,
+        "title": nudge_in.title,
+        "message": nudge_in.message,
+        "action_url": nudge_in.action_url,
+        "priority": nudge_in.priority,
+        "extra_data": extra_data or {},
+        "is_read": False
+    }
+
 # Signal CRUD operations
 async def get_signal(db: AsyncSession, signal_id: UUID) -> Optional[Signal]:
     """Get a signal by ID"""
@@ -18,35 +62,52 @@ async def get_user_signals(
     skip: int = 0,
     limit: int = 100,
     start_date: Optional[datetime] = None,
-    end_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None,
+    cursor: Optional[Cursor] = None
 ) -> List[Signal]:
-    """Get all signals for a user with optional date filtering"""
+    """Get all signals for a user with optional date filtering.
+
+    Pass a decoded ``cursor`` (created_at, id) to page by keyset instead
+    of offset, which costs the same however deep the page is.
+    """
     query = select(Signal).where(Signal.user_id == user_id)
     
     if start_date:
         query = query.where(Signal.created_at >= start_date)
     if end_date:
         query = query.where(Signal.created_at <= end_date)
+    if cursor:
+        query = query.where(tuple_(Signal.created_at, Signal.id) < tuple_(*cursor))
     
-    query = query.order_by(desc(Signal.created_at)).offset(skip).limit(limit)
+    query = query.order_by(desc(Signal.created_at), desc(Signal.id))
+    if skip:
+        query = query.offset(skip)
+    query = query.limit(limit)
     result = await db.execute(query)
     return result.scalars().all()
 
 async def create_signal(db: AsyncSession, signal_in: SignalCreate) -> Signal:
     """Create a new signal"""
-    signal = Signal(
-        user_id=signal_in.user_id,
-        type=signal_in.type,
-        source=signal_in.source,
-        severity=signal_in.severity,
-        metadata=signal_in.metadata,
-        confidence=signal_in.confidence
-    )
+    signal = Signal(**_signal_values(signal_in))
     db.add(signal)
     await db.commit()
     await db.refresh(signal)
     return signal
 
+async def create_signals_bulk(db: AsyncSession, signals_in: Sequence[SignalIn]) -> List[Signal]:
+    """Insert many signals with one multi-row INSERT ... RETURNING.
+
+    Does not commit, so callers can add the matching nudges and commit
+    the whole processing run as one transaction.
+    """
+    if not signals_in:
+        return []
+    result = await db.scalars(
+        insert(Signal).returning(Signal),
+        [_signal_values(signal_in) for signal_in in signals_in]
+    )
+    return list(result.all())
+
 async def update_signal(
     db: AsyncSession,
     db_obj: Signal,
@@ -61,12 +122,29 @@ async def update_signal(
     await db.refresh(db_obj)
     return db_obj
 
-async def delete_signal(db: AsyncSession, signal_id: UUID) -> None:
-    """Delete a signal"""
-    signal = await get_signal(db, signal_id)
-    if signal:
-        await db.delete(signal)
-        await db.commit()
+async def delete_signal(
+    db: AsyncSession,
+    signal_id: UUID,
+    user_id: Optional[UUID] = None
+) -> Optional[UUID]:
+    """Delete a signal and its nudges in one statement.
+
+    Pass ``user_id`` to only delete the signal if that user owns it.
+    Returns the deleted signal's ID, or None if nothing matched.
+    """
+    query = delete(Signal).where(Signal.id == signal_id)
+    if user_id is not None:
+        query = query.where(Signal.user_id == user_id)
+    deleted_signal = query.returning(Signal.id).cte("deleted_signal")
+    deleted_nudges = (
+        delete(Nudge)
+        .where(Nudge.signal_id.in_(select(deleted_signal.c.id)))
+        .cte("deleted_nudges")
+    )
+    result = await db.execute(select(deleted_signal.c.id).add_cte(deleted_nudges))
+    deleted_id = result.scalar_one_or_none()
+    await db.commit()
+    return deleted_id
 
 # Nudge CRUD operations
 async def get_nudge(db: AsyncSession, nudge_id: UUID) -> Optional[Nudge]:
@@ -79,36 +157,43 @@ async def get_user_nudges(
     user_id: UUID,
     skip: int = 0,
     limit: int = 100,
-    is_read: Optional[bool] = None
+    is_read: Optional[bool] = None,
+    cursor: Optional[Cursor] = None
 ) -> List[Nudge]:
-    """Get all nudges for a user with optional read status filtering"""
+    """Get all nudges for a user with optional read status and keyset cursor"""
     query = select(Nudge).where(Nudge.user_id == user_id)
     
     if is_read is not None:
-        query = query.where(Nudge.is_read == is_read)
+        # Literal IS true/false so the planner can use the partial unread index
+        query = query.where(Nudge.is_read.is_(is_read))
+    if cursor:
+        query = query.where(tuple_(Nudge.created_at, Nudge.id) < tuple_(*cursor))
     
-    query = query.order_by(desc(Nudge.created_at)).offset(skip).limit(limit)
+    query = query.order_by(desc(Nudge.created_at), desc(Nudge.id))
+    if skip:
+        query = query.offset(skip)
+    query = query.limit(limit)
     result = await db.execute(query)
     return result.scalars().all()
 
 async def create_nudge(db: AsyncSession, nudge_in: NudgeCreate) -> Nudge:
     """Create a new nudge"""
-    nudge = Nudge(
-        user_id=nudge_in.user_id,
-        signal_id=nudge_in.signal_id,
-        type=nudge_in.type,
-        title=nudge_in.title,
-        message=nudge_in.message,
-        action_url=nudge_in.action_url,
-        priority=nudge_in.priority,
-        metadata=nudge_in.metadata,
-        is_read=False
-    )
+    nudge = Nudge(**_nudge_values(nudge_in))
     db.add(nudge)
     await db.commit()
     await db.refresh(nudge)
     return nudge
 
+async def create_nudges_bulk(db: AsyncSession, nudges_in: Sequence[NudgeIn]) -> List[Nudge]:
+    """Insert many nudges with one multi-row INSERT ... RETURNING (no commit)"""
+    if not nudges_in:
+        return []
+    result = await db.scalars(
+        insert(Nudge).returning(Nudge),
+        [_nudge_values(nudge_in) for nudge_in in nudges_in]
+    )
+    return list(result.all())
+
 async def update_nudge(
     db: AsyncSession,
     db_obj: Nudge,
@@ -123,24 +208,78 @@ async def update_nudge(
     await db.refresh(db_obj)
     return db_obj
 
-async def delete_nudge(db: AsyncSession, nudge_id: UUID) -> None:
-    """Delete a nudge"""
-    nudge = await get_nudge(db, nudge_id)
-    if nudge:
-        await db.delete(nudge)
-        await db.commit()
+async def delete_nudge(
+    db: AsyncSession,
+    nudge_id: UUID,
+    user_id: Optional[UUID] = None
+) -> Optional[UUID]:
+    """Delete a nudge, only if owned by ``user_id`` when given.
+
+    Returns the deleted nudge's ID, or None if nothing matched.
+    """
+    query = delete(Nudge).where(Nudge.id == nudge_id)
+    if user_id is not None:
+        query = query.where(Nudge.user_id == user_id)
+    result = await db.execute(query.returning(Nudge.id))
+    deleted_id = result.scalar_one_or_none()
+    await db.commit()
+    return deleted_id
 
 async def mark_nudge_as_read(
     db: AsyncSession,
     nudge_id: UUID,
     user_id: UUID
 ) -> Optional[Nudge]:
-    """Mark a nudge as read"""
-    nudge = await get_nudge(db, nudge_id)
-    if not nudge or nudge.user_id != user_id:
-        return None
-    
-    nudge.is_read = True
+    """Mark a user's nudge as read with a single UPDATE ... RETURNING"""
+    result = await db.scalars(
+        update(Nudge)
+        .where(Nudge.id == nudge_id, Nudge.user_id == user_id)
+        .values(is_read=True)
+        .returning(Nudge)
+    )
+    nudge = result.one_or_none()
     await db.commit()
-    await db.refresh(nudge)
-    return nudge 
\ No newline at end of file
+    return nudge
+
+async def mark_all_nudges_as_read(db: AsyncSession, user_id: UUID) -> int:
+    """Mark every unread nudge of a user as read; returns how many changed"""
+    result = await db.execute(
+        update(Nudge)
+        .where(Nudge.user_id == user_id, Nudge.is_read.is_(False))
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
+
+# Processing run claims
+async def get_claimed_user_ids(db: AsyncSession, run_key: str, user_ids: Sequence[UUID]) -> set:
+    """Which of ``user_ids`` already have results written for ``run_key``"""
+    if not user_ids:
+        return set()
+    result = await db.execute(
+        select(SignalRun.user_id).where(SignalRun.run_key == run_key, SignalRun.user_id.in_(user_ids))
+    )
+    return set(result.scalars())
+
+async def claim_signal_runs(db: AsyncSession, run_key: str, user_ids: Sequence[UUID]) -> set:
+    """Claim ``run_key`` for ``user_ids``; returns the ids not claimed before (no commit).
+
+    Commit in the same transaction as the results. A concurrent claim of
+    the same user waits for the other transaction and then loses.
+    """
+    if not user_ids:
+        return set()
+    result = await db.execute(
+        pg_insert(SignalRun)
+        .values([{"run_key": run_key, "user_id": user_id} for user_id in user_ids])
+        .on_conflict_do_nothing(index_elements=[SignalRun.run_key, SignalRun.user_id])
+        .returning(SignalRun.user_id)
+    )
+    return set(result.scalars())
+
+async def delete_signal_runs_before(db: AsyncSession, before: datetime) -> int:
+    """Forget claims older than ``before``; returns how many were deleted"""
+    result = await db.execute(delete(SignalRun).where(SignalRun.created_at < before))
+    await db.commit()
+    return result.rowcount
@@ -1,7 +1,11 @@
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Dict
+from datetime import datetime, timezone
+from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, delete, func
 from app.crud.base import CRUDBase
+from app.core.user_cache import user_cache
+from app.models.signal import Signal
 from app.models.team import Team, TeamMetric
 from app.models.user import User
 from app.schemas.team import TeamCreate, TeamUpdate
@@ -45,6 +49,7 @@ class CRUDTeam(CRUDBase[Team, TeamCreate, TeamUpdate]):
             team.members.append(user)
             await db.commit()
             await db.refresh(team)
+            user_cache.invalidate(email=user.email, user_id=user.id)
         return team
 
     async def remove_member(self, db: AsyncSession, *, team_id: int, user_id: int) -> Team:
@@ -55,13 +60,66 @@ class CRUDTeam(CRUDBase[Team, TeamCreate, TeamUpdate]):
             team.members.remove(user)
             await db.commit()
             await db.refresh(team)
+            user_cache.invalidate(email=user.email, user_id=user.id)
         return team
 
-    # Placeholder function for team metrics
-    async def get_team_metrics(self, db: AsyncSession, *, team_id: int) -> List[Any]:
-        """Get team metrics (placeholder)"""
-        # TODO: Implement actual logic for fetching and calculating team metrics
-        return [] # Return an empty list for now
+    async def get_team_metrics(self, db: AsyncSession, *, team_id: UUID) -> List[TeamMetric]:
+        """The team's metrics for the most recent period"""
+        latest = select(func.max(TeamMetric.period_start)).where(TeamMetric.team_id == team_id).scalar_subquery()
+        result = await db.execute(
+            select(TeamMetric)
+            .where(TeamMetric.team_id == team_id, TeamMetric.period_start == latest)
+            .order_by(TeamMetric.metric_type)
+        )
+        return result.scalars().all()
+
+    async def count_processed_members(self, db: AsyncSession, *, team_id: UUID) -> int:
+        """Active members who have given data consent, i.e. whose signals are processed"""
+        return await db.scalar(
+            select(func.count()).select_from(User)
+            .where(User.team_id == team_id, User.is_active.is_(True), User.data_consent_given.is_(True))
+        )
+
+    async def get_signal_summary(
+        self, db: AsyncSession, *, team_id: UUID, start: datetime, end: datetime
+    ) -> Dict[str, Dict[str, Any]]:
+        """Per signal type, how many members had one and their mean severity, between ``start`` and ``end``"""
+        # signals.created_at is naive UTC
+        start, end = (value.astimezone(timezone.utc).replace(tzinfo=None) for value in (start, end))
+        result = await db.execute(
+            select(Signal.type, func.count(func.distinct(Signal.user_id)), func.avg(Signal.severity))
+            .join(User, User.id == Signal.user_id)
+            .where(User.team_id == team_id, Signal.created_at >= start, Signal.created_at < end)
+            .group_by(Signal.type)
+        )
+        return {
+            signal_type.value: {"members": members, "mean_severity": float(severity)}
+            for signal_type, members, severity in result.all()
+        }
+
+    async def replace_metrics(
+        self,
+        db: AsyncSession,
+        *,
+        team_id: UUID,
+        period_start: datetime,
+        period_end: datetime,
+        metrics: Dict[str, Dict[str, Any]]
+    ) -> List[TeamMetric]:
+        """Store a team's metrics for a period, replacing any stored for it before"""
+        await db.execute(
+            delete(TeamMetric).where(TeamMetric.team_id == team_id, TeamMetric.period_start == period_start)
+        )
+        rows = [
+            TeamMetric(
+                team_id=team_id, metric_type=metric_type, value=value,
+                period_start=period_start, period_end=period_end
+            )
+            for metric_type, value in metrics.items()
+        ]
+        db.add_all(rows)
+        await db.commit()
+        return rows
 
 team = CRUDTeam(Team)
 
@@ -76,5 +134,7 @@ update_team = team.update
 delete_team = team.remove
 add_team_member = team.add_member
 remove_team_member = team.remove_member
-# Export the new placeholder function
-get_team_metrics = team.get_team_metrics 
\ No newline at end of file
+get_team_metrics = team.get_team_metrics
+count_processed_team_members = team.count_processed_members
+get_team_signal_summary = team.get_signal_summary
+replace_team_metrics = team.replace_metrics 
\ No newline at end of file
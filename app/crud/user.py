@@ -2,8 +2,9 @@ from typing import Any, Dict, Optional, Union
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
-from app.core.password import get_password_hash, verify_password
+from app.core.password import get_password_hash_async, verify_and_update_password, password_hasher
 from app.crud.base import CRUDBase
+from app.core.user_cache import user_cache
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 
@@ -22,7 +23,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         """Create new user with hashed password"""
         db_obj = User(
             email=obj_in.email,
-            hashed_password=get_password_hash(obj_in.password),
+            hashed_password=await get_password_hash_async(obj_in.password),
             full_name=obj_in.full_name,
             role=obj_in.role,
             is_active=True,
@@ -47,21 +48,36 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             update_data = obj_in.dict(exclude_unset=True)
         
         if update_data.get("password"):
-            hashed_password = get_password_hash(update_data["password"])
+            hashed_password = await get_password_hash_async(update_data["password"])
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
         
-        return await super().update(db, db_obj=db_obj, obj_in=update_data)
+        # Drop the cached entry under both the old and (if changed) new email
+        user_cache.invalidate(email=db_obj.email, user_id=db_obj.id)
+        updated = await super().update(db, db_obj=db_obj, obj_in=update_data)
+        user_cache.invalidate(email=updated.email, user_id=updated.id)
+        return updated
+
+    async def remove(self, db: AsyncSession, *, id: Any) -> User:
+        """Delete user and drop them from the auth cache"""
+        obj = await super().remove(db, id=id)
+        user_cache.invalidate(email=obj.email if obj else None, user_id=id)
+        return obj
 
     async def authenticate(
         self, db: AsyncSession, *, email: str, password: str
     ) -> Optional[User]:
-        """Authenticate user"""
+        """Authenticate user, upgrading the stored hash if its settings are outdated"""
         user = await self.get_by_email(db, email=email)
         if not user:
+            await password_hasher.dummy_verify()
             return None
-        if not verify_password(password, user.hashed_password):
+        valid, new_hash = await verify_and_update_password(password, user.hashed_password)
+        if not valid:
             return None
+        if new_hash:
+            user.hashed_password = new_hash
+            await db.commit()
         return user
 
     async def is_active(self, user: User) -> bool:
@@ -1,6 +1,8 @@
 from app.db.base_class import Base
 from app.models.user import User # noqa
-from app.models.signal import Signal, Nudge # noqa
+from app.models.signal import Signal, Nudge, SignalRun # noqa
 from app.models.team import Team, TeamMetric # noqa
+from app.models.integration import IntegrationToken, CalendarSyncState, GmailSyncState, GmailDailyCount # noqa
+from app.models.job import Job # noqa
 
 # Import all the models here so that Alembic can see them 
\ No newline at end of file
@@ -0,0 +1,180 @@
+"""Monthly range partitions for signals and nudges.
+
+Both tables are partitioned on ``created_at``. Partitions are named
+``<table>_pYYYY_MM`` and cover one calendar month; ``<table>_default``
+catches anything outside the created ranges and should normally stay empty.
+Retention drops whole monthly partitions once every row in them is older
+than ``DATA_RETENTION_DAYS``, so expiry is a catalog operation rather than
+a large DELETE. Rows are therefore kept for up to one extra month.
+
+``maintain_partitions`` runs under a transaction-level advisory lock, so
+API workers booting together (which only create partitions) and the
+scheduled retention job (which also drops them) take turns rather than
+racing on the DDL.
+
+Usage: python -m app.db.partitions [--no-drop]
+"""
+from typing import List, Optional, Tuple
+from datetime import date, datetime, timedelta
+import argparse
+import asyncio
+import logging
+import re
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = ("signals", "nudges")
+
+# pg_advisory_xact_lock key serializing partition maintenance
+PARTITION_LOCK_KEY = 0x7465_6E64_5061_7274
+
+_PARTITION_NAME = re.compile(r"^(?P<table>\w+)_p(?P<year>\d{4})_(?P<month>\d{2})$")
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+def is_partition(name: str) -> bool:
+    """Whether ``name`` is one of the partitions managed here"""
+    match = _PARTITION_NAME.match(name)
+    if match:
+        return match.group("table") in PARTITIONED_TABLES
+    return name in {default_partition_name(table) for table in PARTITIONED_TABLES}
+
+def list_partitions(conn: Connection, table: str) -> List[str]:
+    """Names of the partitions currently attached to ``table``"""
+    result = conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table ORDER BY child.relname"
+        ),
+        {"table": table}
+    )
+    return list(result.scalars().all())
+
+def _create_month_partition(conn: Connection, table: str, month: date) -> None:
+    name = partition_name(table, month)
+    default = default_partition_name(table)
+    lower, upper = month, add_months(month, 1)
+    bounds = f"FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+    in_range = {"lower": lower, "upper": upper}
+
+    has_default = default in list_partitions(conn, table)
+    stray = has_default and conn.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE created_at >= :lower AND created_at < :upper)"),
+        in_range
+    ).scalar()
+    if not stray:
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} FOR VALUES {bounds}"))
+        return
+
+    # Postgres refuses a new range while the default partition holds rows
+    # in it, so move those rows across with the default detached.
+    logger.warning(f"Moving rows for {month:%Y-%m} out of {default} into {name}")
+    conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+    conn.execute(text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}"))
+    conn.execute(
+        text(f"INSERT INTO {table} SELECT * FROM {default} WHERE created_at >= :lower AND created_at < :upper"),
+        in_range
+    )
+    conn.execute(text(f"DELETE FROM {default} WHERE created_at >= :lower AND created_at < :upper"), in_range)
+    conn.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+
+def ensure_partitions(
+    conn: Connection,
+    *,
+    start: Optional[date] = None,
+    months_ahead: Optional[int] = None,
+    now: Optional[datetime] = None
+) -> List[str]:
+    """Create missing monthly partitions from ``start`` (default: this month)
+    through ``months_ahead`` months from now; returns the names created"""
+    now = now or datetime.utcnow()
+    months_ahead = settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    first = month_start(start or now.date())
+    last = add_months(month_start(now.date()), months_ahead)
+
+    created = []
+    for table in PARTITIONED_TABLES:
+        existing = set(list_partitions(conn, table))
+        default = default_partition_name(table)
+        if default not in existing:
+            conn.execute(text(f"CREATE TABLE IF NOT EXISTS {default} PARTITION OF {table} DEFAULT"))
+            created.append(default)
+        month = first
+        while month <= last:
+            name = partition_name(table, month)
+            if name not in existing:
+                _create_month_partition(conn, table, month)
+                created.append(name)
+            month = add_months(month, 1)
+    return created
+
+def drop_expired_partitions(
+    conn: Connection,
+    *,
+    retention_days: Optional[int] = None,
+    now: Optional[datetime] = None
+) -> List[str]:
+    """Drop monthly partitions that end before the retention cut-off;
+    returns the names dropped"""
+    now = now or datetime.utcnow()
+    retention_days = settings.DATA_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = now - timedelta(days=retention_days)
+
+    dropped = []
+    for table in PARTITIONED_TABLES:
+        for name in list_partitions(conn, table):
+            match = _PARTITION_NAME.match(name)
+            if not match or match.group("table") != table:
+                continue
+            month = date(int(match.group("year")), int(match.group("month")), 1)
+            if datetime.combine(add_months(month, 1), datetime.min.time()) <= cutoff:
+                conn.execute(text(f"DROP TABLE {name}"))
+                dropped.append(name)
+        # The default partition is expected to be tiny, so a DELETE is fine here
+        default = default_partition_name(table)
+        if default in list_partitions(conn, table):
+            conn.execute(text(f"DELETE FROM {default} WHERE created_at < :cutoff"), {"cutoff": cutoff})
+    return dropped
+
+async def maintain_partitions(engine, *, drop_expired: bool = True) -> Tuple[List[str], List[str]]:
+    """Create upcoming partitions and drop expired ones in one transaction"""
+    async with engine.begin() as conn:
+        # Held until commit; a concurrent caller waits, then finds the partitions already there
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+        created = await conn.run_sync(lambda sync_conn: ensure_partitions(sync_conn))
+        dropped = []
+        if drop_expired:
+            dropped = await conn.run_sync(lambda sync_conn: drop_expired_partitions(sync_conn))
+    if created:
+        logger.info(f"Created partitions: {', '.join(created)}")
+    if dropped:
+        logger.info(f"Dropped expired partitions: {', '.join(dropped)}")
+    return created, dropped
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Create upcoming and drop expired signal/nudge partitions")
+    parser.add_argument("--no-drop", action="store_true", help="only create partitions, drop nothing")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    from app.db.session import engine
+    asyncio.run(maintain_partitions(engine, drop_expired=not args.no_drop))
+
+if __name__ == "__main__":
+    main()
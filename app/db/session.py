@@ -3,6 +3,7 @@ from sqlalchemy.orm import sessionmaker
 from typing import AsyncGenerator
 from app.core.config import settings
 from app.db.base_class import Base
+from app.db.partitions import maintain_partitions
 
 # Use DATABASE_URL from settings, which should come from Render env var
 DATABASE_URL = settings.DATABASE_URL
@@ -33,6 +34,9 @@ async def init_db() -> None:
     # Create tables if they don't exist
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    # Every worker runs this on boot, so only create; expired partitions are dropped by the
+    # scheduled retention job (app.worker purge_retention, or the Celery beat task)
+    await maintain_partitions(engine, drop_expired=False)
 
     # Import init_db from app.db.init_db
     from app.db.init_db import init_db as initial_data_init
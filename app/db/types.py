@@ -0,0 +1,14 @@
+from sqlalchemy import String
+from sqlalchemy.types import TypeDecorator
+from app.core.encryption import encrypt_token, decrypt_token
+
+class EncryptedString(TypeDecorator):
+    """String column stored encrypted and read back as plaintext"""
+    impl = String
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return encrypt_token(value)
+
+    def process_result_value(self, value, dialect):
+        return decrypt_token(value)
@@ -7,8 +7,13 @@ from typing import Dict, Any
 
 from app.core.config import settings
 from app.api.v1.api import api_router
+from app.api.v1.endpoints.signals import NEXT_CURSOR_HEADER
 from app.core.security import setup_security
 from app.db.session import init_db
+from app.core.password import password_hasher
+from app.core.http_pool import http_pool
+from app.core.oauth.token_refresh import token_refresher
+from app.core.webhooks import webhook_ingestor
 from app.db import base
 
 # Configure logging
@@ -24,9 +29,17 @@ async def lifespan(app: FastAPI):
     logger.info("Starting up Tend application...")
     await init_db()
     setup_security()
+    await http_pool.start()
+    if settings.TOKEN_REFRESH_ENABLED:
+        token_refresher.start()
+    webhook_ingestor.start()
     yield
     # Shutdown
     logger.info("Shutting down Tend application...")
+    await webhook_ingestor.stop()
+    await token_refresher.stop()
+    await http_pool.close()
+    password_hasher.shutdown()
 
 app = FastAPI(
     title="Tend API",
@@ -42,7 +55,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
     allow_headers=["*"],
-    expose_headers=["*"],
+    # "*" is not honoured for credentialed requests, so exposed headers are listed
+    expose_headers=[NEXT_CURSOR_HEADER],
     max_age=3600,  # Cache preflight requests for 1 hour
 )
 
@@ -0,0 +1,82 @@
+from sqlalchemy import Column, String, Integer, Date, DateTime, JSON, ForeignKey
+from sqlalchemy.sql import func
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.session import Base
+from app.db.types import EncryptedString
+
+class IntegrationToken(Base):
+    """OAuth tokens for one user's connection to a provider, encrypted at rest"""
+    __tablename__ = "integration_tokens"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    provider = Column(String, primary_key=True)  # "slack", "google", ...
+    access_token = Column(EncryptedString, nullable=False)
+    refresh_token = Column(EncryptedString, nullable=True)
+    scopes = Column(String, nullable=True)  # Space separated
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+    extra = Column(JSON, nullable=True)  # Provider ids such as the Slack team and user
+    # When the background refresher should renew the access token: shortly
+    # before expiry with per-token jitter; null when it cannot be refreshed
+    refresh_after = Column(DateTime(timezone=True), nullable=True, index=True)
+    refresh_failures = Column(Integer, nullable=False, server_default="0")
+    refresh_error = Column(String, nullable=True)  # Set when the grant was revoked and the user must reconnect
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<IntegrationToken {self.provider} for user {self.user_id}>"
+
+class CalendarSyncState(Base):
+    """Incremental Google Calendar sync state for one user.
+
+    ``events`` is a compact index of the user's recent events,
+    ``{event_id: [start, end, all_day]}`` with no titles, attendees or
+    other content; ``sync_token`` is the Calendar API nextSyncToken that
+    fetches the changes since the index was last updated.
+    """
+    __tablename__ = "calendar_sync_states"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    sync_token = Column(String, nullable=True)
+    events = Column(JSON, nullable=False, default=dict)
+    last_full_sync_at = Column(DateTime(timezone=True), nullable=True)
+    last_synced_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<CalendarSyncState for user {self.user_id}>"
+
+class GmailSyncState(Base):
+    """Incremental Gmail sync state for one user.
+
+    ``history_id`` is the History API checkpoint; ``messages`` indexes
+    the messages in the counting window as ``{message_id: [day, thread_id]}``
+    so deletions can be taken off the right day's counters.
+    """
+    __tablename__ = "gmail_sync_states"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    history_id = Column(String, nullable=True)
+    messages = Column(JSON, nullable=False, default=dict)
+    last_full_sync_at = Column(DateTime(timezone=True), nullable=True)
+    last_synced_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<GmailSyncState for user {self.user_id}>"
+
+class GmailDailyCount(Base):
+    """Metadata-only Gmail counters for one user and day (UTC)"""
+    __tablename__ = "gmail_daily_counts"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    messages = Column(Integer, nullable=False, default=0)
+    threads = Column(Integer, nullable=False, default=0)
+    thread_ids = Column(JSON, nullable=False, default=list)  # Distinct threads, for window-wide thread counts
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<GmailDailyCount {self.day} for user {self.user_id}>"
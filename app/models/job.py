@@ -0,0 +1,53 @@
+from sqlalchemy import Column, String, Integer, DateTime, JSON, Index
+from sqlalchemy.sql import func
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from app.db.base_class import Base
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    DEAD = "dead"  # Out of attempts or not retryable; kept for inspection
+
+class Job(Base):
+    """A background job in the Postgres queue run by ``python -m app.worker``.
+
+    Workers claim due jobs with ``FOR UPDATE SKIP LOCKED`` and hold them
+    under a lease they renew while the job runs; a job whose lease lapses,
+    because its worker died, is claimed again by another worker.
+    ``dedupe_key`` makes enqueueing idempotent, e.g. one job per schedule
+    slot however many workers try to enqueue it.
+    """
+    __tablename__ = "jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    dedupe_key = Column(String, nullable=True, unique=True)
+    group_key = Column(String, nullable=True, index=True)  # Jobs that are waited on together
+    status = Column(String, nullable=False, default=JobStatus.QUEUED, server_default=JobStatus.QUEUED)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    max_attempts = Column(Integer, nullable=False)
+    run_after = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_by = Column(String, nullable=True)  # Worker holding the lease
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(String, nullable=True)
+    result = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<Job {self.kind} {self.id} {self.status}>"
+
+# Indexes matching the claim queries in app/crud/job.py
+Index(
+    "ix_jobs_queued_run_after", Job.run_after,
+    postgresql_where=Job.status == JobStatus.QUEUED
+)
+Index(
+    "ix_jobs_running_lease_expires_at", Job.lease_expires_at,
+    postgresql_where=Job.status == JobStatus.RUNNING
+)
+Index("ix_jobs_finished_at", Job.finished_at, postgresql_where=Job.finished_at.isnot(None))
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, Float, Boolean, ForeignKey, JSON, DateTime, Enum
+from sqlalchemy import Column, String, Float, Boolean, ForeignKey, JSON, DateTime, Enum, Index, DDL, event
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 from datetime import datetime
 import uuid
 import enum
@@ -13,8 +14,12 @@ class SignalType(enum.Enum):
     SLACK_ACTIVITY = "slack_activity"
     EMAIL_PATTERN = "email_pattern"
 
+# signals and nudges are range-partitioned by month on created_at (see
+# app/db/partitions.py), so created_at is part of the primary key and
+# nudges.signal_id cannot carry a foreign key to signals.id.
 class Signal(Base):
     __tablename__ = "signals"
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -23,19 +28,25 @@ class Signal(Base):
     severity = Column(Float, nullable=False)
     confidence = Column(Float, nullable=False)
     extra_data = Column(JSON, nullable=False, default=dict)
-    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    created_at = Column(DateTime, primary_key=True, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     user = relationship("User", back_populates="signals")
-    nudges = relationship("Nudge", back_populates="signal", cascade="all, delete-orphan")
+    nudges = relationship(
+        "Nudge",
+        primaryjoin="Signal.id == foreign(Nudge.signal_id)",
+        back_populates="signal",
+        cascade="all, delete-orphan"
+    )
 
 class Nudge(Base):
     __tablename__ = "nudges"
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    signal_id = Column(UUID(as_uuid=True), ForeignKey("signals.id"), nullable=True)
+    signal_id = Column(UUID(as_uuid=True), nullable=True)
     type = Column(String, nullable=False)
     title = Column(String, nullable=False)
     message = Column(String, nullable=False)
@@ -43,9 +54,45 @@ class Nudge(Base):
     priority = Column(String, nullable=False)
     extra_data = Column(JSON, nullable=False, default=dict)
     is_read = Column(Boolean, nullable=False, default=False)
-    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    created_at = Column(DateTime, primary_key=True, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     user = relationship("User", back_populates="nudges")
-    signal = relationship("Signal", back_populates="nudges") 
\ No newline at end of file
+    signal = relationship(
+        "Signal",
+        primaryjoin="foreign(Nudge.signal_id) == Signal.id",
+        back_populates="nudges"
+    )
+
+class SignalRun(Base):
+    """A user's results from one scheduled processing run have been written.
+
+    Claimed in the same transaction as the signals, so a retried or
+    duplicated task never writes a user's results twice.
+    """
+    __tablename__ = "signal_runs"
+
+    run_key = Column(String, primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+
+# Indexes matching the listing queries in app/crud/signal.py
+Index("ix_signals_user_id_created_at", Signal.user_id, Signal.created_at.desc(), Signal.id.desc())
+Index("ix_nudges_user_id_created_at", Nudge.user_id, Nudge.created_at.desc(), Nudge.id.desc())
+Index(
+    "ix_nudges_user_id_unread",
+    Nudge.user_id, Nudge.created_at.desc(), Nudge.id.desc(),
+    postgresql_where=Nudge.is_read.is_(False)
+)
+Index("ix_nudges_signal_id", Nudge.signal_id)
+
+# A partitioned table accepts no rows until it has a partition. The default
+# partition makes a create_all database usable straight away; monthly
+# partitions are added by app.db.partitions.ensure_partitions.
+for _table in (Signal.__table__, Nudge.__table__):
+    event.listen(
+        _table,
+        "after_create",
+        DDL("CREATE TABLE IF NOT EXISTS %(table)s_default PARTITION OF %(table)s DEFAULT")
+    )
@@ -1,6 +1,7 @@
 from typing import Optional, Dict, Any
 from pydantic import BaseModel
 from datetime import datetime
+from uuid import UUID
 
 # Shared properties
 class TeamBase(BaseModel):
@@ -39,8 +40,8 @@ class TeamMetricCreate(TeamMetricBase):
     team_id: str
 
 class TeamMetricInDBBase(TeamMetricBase):
-    id: str
-    team_id: str
+    id: UUID
+    team_id: UUID
     created_at: datetime
 
     class Config:
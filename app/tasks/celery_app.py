@@ -0,0 +1,47 @@
+"""Celery application for scheduled background processing.
+
+Run a worker and the scheduler with:
+
+    celery -A app.tasks.celery_app worker --loglevel=info
+    celery -A app.tasks.celery_app beat --loglevel=info
+
+The broker and result backend default to Redis at REDIS_HOST/REDIS_PORT.
+CELERY_BROKER_URL=memory:// with CELERY_RESULT_BACKEND=cache+memory://
+gives a local broker inside one process; CELERY_TASK_ALWAYS_EAGER runs
+tasks inline without a worker, as the tests do.
+"""
+from celery import Celery
+from app.core.config import settings
+
+REDIS_URL = f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/0"
+
+celery_app = Celery(
+    "tend",
+    broker=settings.CELERY_BROKER_URL or REDIS_URL,
+    backend=settings.CELERY_RESULT_BACKEND or REDIS_URL,
+    include=["app.tasks.signals", "app.tasks.retention"]
+)
+
+celery_app.conf.update(
+    task_always_eager=settings.CELERY_TASK_ALWAYS_EAGER,
+    task_eager_propagates=True,
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    # Tasks are idempotent, so a task lost with its worker is simply redelivered
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
+    result_expires=86400,
+    timezone="UTC",
+    beat_schedule={
+        "process-signals": {
+            "task": "app.tasks.signals.schedule_signal_processing",
+            "schedule": settings.SIGNAL_PROCESSING_INTERVAL_SECONDS
+        },
+        "purge-retention": {
+            "task": "app.tasks.retention.purge_retention",
+            "schedule": settings.RETENTION_PURGE_INTERVAL_SECONDS
+        }
+    }
+)
@@ -0,0 +1,26 @@
+"""Scheduled data retention for Celery deployments.
+
+``purge_retention`` runs from beat every RETENTION_PURGE_INTERVAL_SECONDS,
+like the job worker's purge_retention: it creates upcoming signal/nudge
+partitions and drops the ones past DATA_RETENTION_DAYS. API workers only
+create partitions on boot, so without this nothing expires. Stale signal
+run claims are already pruned by each schedule_signal_processing run.
+"""
+from typing import Dict, Any
+import asyncio
+import logging
+from app.core.signals.fetch import worker_engine
+from app.db.partitions import maintain_partitions
+from app.tasks.celery_app import celery_app
+
+logger = logging.getLogger(__name__)
+
+# Looked up at call time, so tests can point the task at their own database
+get_engine = worker_engine
+
+@celery_app.task(name="app.tasks.retention.purge_retention", soft_time_limit=300, time_limit=360)
+def purge_retention() -> Dict[str, Any]:
+    """Create upcoming and drop expired signal/nudge partitions"""
+    created, dropped = asyncio.run(maintain_partitions(get_engine()))
+    logger.info(f"Retention purge created {len(created)} and dropped {len(dropped)} partitions")
+    return {"partitions_created": created, "partitions_dropped": dropped}
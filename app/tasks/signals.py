@@ -0,0 +1,120 @@
+"""Scheduled signal processing, fanned out per team.
+
+``schedule_signal_processing`` runs from beat every
+SIGNAL_PROCESSING_INTERVAL_SECONDS. It groups consenting users by team and
+queues ``process_user_chunk`` tasks of SIGNAL_CHUNK_SIZE users; each team's
+chunks form a chord whose callback, ``aggregate_team_metrics``, stores the
+team's anonymized metrics once every member has been processed. Users
+without a team are processed in a plain group.
+
+Every task is idempotent within its run, keyed by the start of the
+scheduling interval: a user's signals and nudges are written in one
+transaction with a claim in signal_runs, so a redelivered or duplicated
+chunk skips the users it already wrote, and a team's metrics for a period
+replace any stored by an earlier attempt.
+"""
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timedelta
+from uuid import UUID
+import asyncio
+import logging
+from celery import chord, group
+from celery.exceptions import SoftTimeLimitExceeded
+from sqlalchemy.exc import DBAPIError
+from app.core.config import settings
+from app.core.signals.fetch import fetch_connected_metadata, worker_session_factory
+from app.core.signals.scheduled import aggregate_team, chunk, current_period, process_chunk, run_key_for, users_by_team
+from app.crud.signal import delete_signal_runs_before
+from app.db import base  # noqa: F401
+from app.tasks.celery_app import celery_app
+
+logger = logging.getLogger(__name__)
+
+# Looked up at call time, so tests can point the tasks at their own database and fetcher
+get_session_factory = worker_session_factory
+metadata_fetcher = fetch_connected_metadata
+
+async def _users_by_team() -> Dict[Optional[str], List[str]]:
+    sessions = get_session_factory()
+    async with sessions() as db:
+        return await users_by_team(db)
+
+async def _prune_claims(before: datetime) -> int:
+    sessions = get_session_factory()
+    async with sessions() as db:
+        return await delete_signal_runs_before(db, before)
+
+@celery_app.task(name="app.tasks.signals.schedule_signal_processing", soft_time_limit=60, time_limit=90)
+def schedule_signal_processing() -> Dict[str, Any]:
+    """Queue this interval's processing: one chord per team, one group for users without a team"""
+    period_start, period_end = current_period()
+    run_key = run_key_for(period_start)
+    teams = asyncio.run(_users_by_team())
+
+    tasks = 0
+    for team_id, user_ids in teams.items():
+        chunks = [process_user_chunk.s(run_key, ids) for ids in chunk(user_ids, settings.SIGNAL_CHUNK_SIZE)]
+        tasks += len(chunks)
+        if team_id is None:
+            group(chunks).apply_async()
+        else:
+            chord(chunks)(aggregate_team_metrics.s(team_id, period_start.isoformat(), period_end.isoformat()))
+
+    # Claims only guard against redelivery within a run
+    pruned = asyncio.run(_prune_claims(period_start - timedelta(seconds=settings.SIGNAL_PROCESSING_INTERVAL_SECONDS)))
+    users = sum(len(user_ids) for user_ids in teams.values())
+    logger.info(f"Queued {run_key}: {users} users in {tasks} tasks across {len(teams)} teams, pruned {pruned} claims")
+    return {"run_key": run_key, "users": users, "teams": len([team for team in teams if team]), "tasks": tasks}
+
+@celery_app.task(
+    bind=True,
+    name="app.tasks.signals.process_user_chunk",
+    soft_time_limit=settings.SIGNAL_CHUNK_SOFT_TIME_LIMIT_SECONDS,
+    time_limit=settings.SIGNAL_CHUNK_TIME_LIMIT_SECONDS,
+    autoretry_for=(DBAPIError,),
+    retry_backoff=True,
+    max_retries=3
+)
+def process_user_chunk(self, run_key: str, user_ids: List[str]) -> Dict[str, Any]:
+    """Fetch, score and persist one chunk of users for ``run_key``"""
+    try:
+        return asyncio.run(process_chunk(
+            get_session_factory(), run_key, [UUID(user_id) for user_id in user_ids], metadata_fetcher
+        ))
+    except SoftTimeLimitExceeded:
+        # Nothing was written; the next run picks these users up, and the chord still completes
+        logger.warning(f"Chunk of {len(user_ids)} users for {run_key} hit its time limit")
+        return {
+            "users": len(user_ids), "processed": 0, "skipped": 0,
+            "signals": 0, "nudges": 0, "errors": 0, "timed_out": True
+        }
+    except Exception as e:
+        if isinstance(e, DBAPIError) and self.request.retries < self.max_retries:
+            raise  # autoretry_for retries it with backoff
+        # A failed chunk must not fail the chord, or the team's metrics are never stored
+        logger.exception(f"Chunk of {len(user_ids)} users for {run_key} failed: {str(e)}")
+        return {
+            "users": len(user_ids), "processed": 0, "skipped": 0,
+            "signals": 0, "nudges": 0, "errors": len(user_ids), "timed_out": False
+        }
+
+async def _aggregate(results: List[Dict[str, Any]], team_id: UUID, start: datetime, end: datetime) -> Dict[str, Any]:
+    sessions = get_session_factory()
+    async with sessions() as db:
+        return await aggregate_team(db, results, team_id, start, end)
+
+@celery_app.task(
+    name="app.tasks.signals.aggregate_team_metrics",
+    soft_time_limit=settings.TEAM_METRICS_TIME_LIMIT_SECONDS,
+    time_limit=settings.TEAM_METRICS_TIME_LIMIT_SECONDS + 30,
+    autoretry_for=(DBAPIError,),
+    retry_backoff=True,
+    max_retries=3
+)
+def aggregate_team_metrics(
+    results: List[Dict[str, Any]], team_id: str, period_start: str, period_end: str
+) -> Dict[str, Any]:
+    """Chord callback: store a team's anonymized metrics once all its chunks are done"""
+    return asyncio.run(_aggregate(
+        results, UUID(team_id), datetime.fromisoformat(period_start), datetime.fromisoformat(period_end)
+    ))
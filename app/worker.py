@@ -0,0 +1,400 @@
+"""Background worker on a Postgres job queue, for deployments without Redis.
+
+Run any number of workers, on any number of nodes, against the API's database:
+
+    python -m app.worker [--concurrency N] [--no-schedule]
+
+Jobs live in the ``jobs`` table (see app/models/job.py). A worker claims
+due jobs with ``SELECT ... FOR UPDATE SKIP LOCKED``, so no job is claimed
+by two workers, and renews a lease on each while it runs. If the worker
+dies its leases lapse and another worker takes the jobs over; a worker
+that finds it has lost a lease stops the job. Failed attempts are retried
+with exponential backoff up to JOB_MAX_ATTEMPTS, after which the job is
+dead and kept for inspection. A poison job, one that takes down every
+worker running it so its lease lapses instead of it failing, is dead
+once its lease has lapsed on every attempt.
+
+Each worker also enqueues the periodic jobs: signal processing every
+SIGNAL_PROCESSING_INTERVAL_SECONDS, token refresh every
+TOKEN_REFRESH_INTERVAL_SECONDS and the retention purge every
+RETENTION_PURGE_INTERVAL_SECONDS. A periodic job is keyed by its interval,
+so it is queued once however many workers enqueue it.
+
+Signal processing fans out like the Celery tasks in app/tasks/signals.py:
+a planning job queues one job per chunk of a team's users plus a team
+metrics job that waits for the team's chunks. Users are claimed per run
+in signal_runs, so a chunk that runs twice, e.g. after its worker lost the
+lease mid-write, never writes a user's results twice.
+"""
+from typing import Dict, Any, Optional, Callable, Awaitable, Set
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+import argparse
+import asyncio
+import logging
+import os
+import random
+import signal
+import socket
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.http_pool import http_pool
+from app.core.oauth.token_refresh import token_refresher
+from app.core.signals.fetch import fetch_connected_metadata
+from app.core.signals.scheduled import aggregate_team, chunk, current_period, process_chunk, run_key_for, users_by_team
+from app.core.signals.sweep import MetadataFetcher
+from app.crud.job import (
+    claim_jobs, complete_job, delete_finished_jobs, enqueue_job, enqueue_jobs,
+    fail_job, get_job_group, release_job, renew_job_leases
+)
+from app.crud.signal import delete_signal_runs_before
+from app.db import base  # noqa: F401
+from app.db.partitions import maintain_partitions
+from app.db.session import AsyncSessionLocal, engine as default_engine
+from app.models.job import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+TEAM_METRICS_RECHECK_SECONDS = 15  # Between checks on whether a team's chunks have finished
+
+class PermanentJobError(Exception):
+    """The job cannot succeed however often it is retried, e.g. its payload is invalid"""
+
+class JobDeferred(Exception):
+    """The job is not ready to run; it is put back without counting the attempt"""
+
+    def __init__(self, seconds: float):
+        super().__init__(f"Deferred for {seconds}s")
+        self.seconds = seconds
+
+JobHandler = Callable[["JobWorker", Job], Awaitable[Optional[Dict[str, Any]]]]
+
+@dataclass(frozen=True)
+class JobKind:
+    handler: JobHandler
+    timeout: Optional[int] = None  # Seconds per attempt; JOB_TIMEOUT_SECONDS if unset
+    interval: Optional[int] = None  # Enqueued every this many seconds if set
+
+def _backoff(attempts: int) -> timedelta:
+    seconds = min(settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.JOB_RETRY_MAX_SECONDS)
+    return timedelta(seconds=seconds * random.uniform(0.8, 1.2))
+
+async def plan_signal_processing(worker: "JobWorker", job: Job) -> Dict[str, Any]:
+    """Queue a run's chunk jobs and, per team, the metrics job that waits for them"""
+    period_start, period_end = current_period(datetime.fromisoformat(job.payload["slot"]))
+    run_key = run_key_for(period_start)
+    async with worker.session_factory() as db:
+        teams = await users_by_team(db)
+
+    jobs = []
+    for team_id, user_ids in teams.items():
+        group_key = f"{run_key}:team:{team_id}" if team_id else None
+        for i, ids in enumerate(chunk(user_ids, settings.SIGNAL_CHUNK_SIZE)):
+            jobs.append({
+                "kind": "process_signals",
+                "payload": {"run_key": run_key, "user_ids": ids},
+                "dedupe_key": f"{run_key}:{team_id or 'no-team'}:{i}",
+                "group_key": group_key,
+                "max_attempts": settings.JOB_MAX_ATTEMPTS
+            })
+        if team_id:
+            jobs.append({
+                "kind": "aggregate_team_metrics",
+                "payload": {
+                    "team_id": team_id,
+                    "group_key": group_key,
+                    "period_start": period_start.isoformat(),
+                    "period_end": period_end.isoformat()
+                },
+                "dedupe_key": f"{group_key}:metrics",
+                "max_attempts": settings.JOB_MAX_ATTEMPTS
+            })
+
+    async with worker.session_factory() as db:
+        queued = await enqueue_jobs(db, jobs)
+    users = sum(len(user_ids) for user_ids in teams.values())
+    logger.info(f"Planned {run_key}: {users} users, queued {queued} jobs across {len(teams)} teams")
+    return {"run_key": run_key, "users": users, "jobs": queued}
+
+async def process_signal_chunk(worker: "JobWorker", job: Job) -> Dict[str, Any]:
+    """Fetch, score and persist one chunk of users for a run"""
+    try:
+        user_ids = [UUID(user_id) for user_id in job.payload["user_ids"]]
+        run_key = job.payload["run_key"]
+    except (KeyError, TypeError, ValueError) as e:
+        raise PermanentJobError(f"Invalid payload: {str(e)}")
+    return await process_chunk(worker.session_factory, run_key, user_ids, worker.fetcher)
+
+async def aggregate_team_metrics(worker: "JobWorker", job: Job) -> Dict[str, Any]:
+    """Store a team's anonymized metrics once all of its chunks have finished"""
+    async with worker.session_factory() as db:
+        chunks = await get_job_group(db, job.payload["group_key"])
+    if any(chunk_job.status in (JobStatus.QUEUED, JobStatus.RUNNING) for chunk_job in chunks):
+        raise JobDeferred(TEAM_METRICS_RECHECK_SECONDS)
+
+    results = []
+    for chunk_job in chunks:
+        if chunk_job.status == JobStatus.DONE and chunk_job.result:
+            results.append(chunk_job.result)
+        else:
+            # Dead: its users are picked up by the next run
+            results.append({"processed": 0, "skipped": 0, "errors": 0, "timed_out": True})
+    async with worker.session_factory() as db:
+        return await aggregate_team(
+            db,
+            results,
+            UUID(job.payload["team_id"]),
+            datetime.fromisoformat(job.payload["period_start"]),
+            datetime.fromisoformat(job.payload["period_end"])
+        )
+
+async def refresh_tokens(worker: "JobWorker", job: Job) -> Dict[str, Any]:
+    """Renew every token that is due, a batch at a time"""
+    claimed = 0
+    while True:
+        batch = await token_refresher.run_once()
+        claimed += batch
+        if batch < settings.TOKEN_REFRESH_BATCH_SIZE:
+            return {"claimed": claimed, "outcomes": dict(token_refresher.outcomes)}
+
+async def purge_retention(worker: "JobWorker", job: Job) -> Dict[str, Any]:
+    """Drop expired signal/nudge partitions, stale run claims and old finished jobs"""
+    now = datetime.now(timezone.utc)
+    created, dropped = await maintain_partitions(worker.engine)
+    async with worker.session_factory() as db:
+        # Claims only guard against running a chunk twice within its run
+        claims = await delete_signal_runs_before(
+            db, now - timedelta(seconds=2 * settings.SIGNAL_PROCESSING_INTERVAL_SECONDS)
+        )
+        jobs = await delete_finished_jobs(db, now - timedelta(days=settings.JOB_RETENTION_DAYS))
+    logger.info(f"Retention purge dropped {len(dropped)} partitions, {claims} run claims and {jobs} jobs")
+    return {"partitions_created": created, "partitions_dropped": dropped, "claims": claims, "jobs": jobs}
+
+JOB_KINDS: Dict[str, JobKind] = {
+    "schedule_signals": JobKind(plan_signal_processing, interval=settings.SIGNAL_PROCESSING_INTERVAL_SECONDS),
+    "process_signals": JobKind(process_signal_chunk, timeout=settings.SIGNAL_CHUNK_TIME_LIMIT_SECONDS),
+    "aggregate_team_metrics": JobKind(aggregate_team_metrics, timeout=settings.TEAM_METRICS_TIME_LIMIT_SECONDS),
+    "refresh_tokens": JobKind(refresh_tokens, interval=settings.TOKEN_REFRESH_INTERVAL_SECONDS),
+    "purge_retention": JobKind(purge_retention, interval=settings.RETENTION_PURGE_INTERVAL_SECONDS)
+}
+
+class JobWorker:
+    """Claims jobs from the queue and runs up to ``concurrency`` of them at once"""
+
+    def __init__(
+        self,
+        kinds: Optional[Dict[str, JobKind]] = None,
+        *,
+        engine=None,
+        worker_id: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        schedule: bool = True,
+        fetcher: MetadataFetcher = fetch_connected_metadata
+    ):
+        self.kinds = kinds if kinds is not None else JOB_KINDS
+        self.engine = engine or default_engine
+        self.session_factory: Callable[[], AsyncSession] = AsyncSessionLocal if engine is None else sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self.concurrency = concurrency or settings.WORKER_CONCURRENCY
+        self.schedule = schedule
+        self.fetcher = fetcher
+        self.outcomes = Counter()
+        self._running: Dict[UUID, asyncio.Task] = {}
+        self._settling: Set[UUID] = set()
+        self._lost: Set[UUID] = set()
+        self._scheduled: Dict[str, int] = {}  # Kind -> last interval enqueued by this worker
+        self._wake = asyncio.Event()
+        self._stopping = False
+
+    async def enqueue_periodic(self, now: Optional[datetime] = None) -> int:
+        """Queue the periodic jobs due in the current interval; returns how many this worker queued"""
+        now = now or datetime.now(timezone.utc)
+        queued = 0
+        for name, kind in self.kinds.items():
+            if not kind.interval:
+                continue
+            slot = int(now.timestamp()) // kind.interval * kind.interval
+            if self._scheduled.get(name) == slot:
+                continue
+            slot_start = datetime.fromtimestamp(slot, timezone.utc).isoformat()
+            async with self.session_factory() as db:
+                if await enqueue_job(
+                    db, name, {"slot": slot_start},
+                    max_attempts=settings.JOB_MAX_ATTEMPTS, dedupe_key=f"{name}:{slot_start}"
+                ):
+                    queued += 1
+            self._scheduled[name] = slot
+        return queued
+
+    async def run_once(self) -> int:
+        """Claim due jobs for the free slots and start them; returns how many were claimed"""
+        free = self.concurrency - len(self._running)
+        if free <= 0:
+            return 0
+        async with self.session_factory() as db:
+            jobs = await claim_jobs(
+                db,
+                worker_id=self.worker_id,
+                limit=free,
+                lease_seconds=settings.JOB_LEASE_SECONDS,
+                kinds=list(self.kinds)
+            )
+        for job in jobs:
+            self._running[job.id] = asyncio.create_task(self._execute(job))
+        return len(jobs)
+
+    async def drain(self) -> None:
+        """Wait for the running jobs to finish"""
+        while self._running:
+            await asyncio.gather(*list(self._running.values()), return_exceptions=True)
+
+    async def _settle(self, settle: Callable[..., Awaitable[bool]], job: Job, outcome: str, **values: Any) -> None:
+        self._settling.add(job.id)
+        try:
+            async with self.session_factory() as db:
+                if not await settle(db, job.id, worker_id=self.worker_id, **values):
+                    outcome = "lost"
+                    logger.warning(f"Job {job.kind} {job.id} was taken over by another worker before it finished")
+        except Exception as e:
+            # The lease lapses and the job runs again
+            outcome = "unsettled"
+            logger.error(f"Could not record the outcome of job {job.kind} {job.id}: {str(e)}")
+        self.outcomes[outcome] += 1
+
+    async def _execute(self, job: Job) -> None:
+        try:
+            await self._attempt(job)
+        finally:
+            self._running.pop(job.id, None)
+            self._settling.discard(job.id)
+            self._lost.discard(job.id)
+            self._wake.set()
+
+    async def _attempt(self, job: Job) -> None:
+        if job.attempts > job.max_attempts:
+            # No attempt failed, yet all are used up: each one lost its worker before finishing
+            error = f"Lease lapsed on all {job.max_attempts} attempts"
+            logger.error(f"Job {job.kind} {job.id} is dead: {error}")
+            await self._settle(fail_job, job, "dead", error=error, retry_at=None)
+            return
+
+        kind = self.kinds[job.kind]
+        try:
+            result = await asyncio.wait_for(kind.handler(self, job), kind.timeout or settings.JOB_TIMEOUT_SECONDS)
+        except JobDeferred as e:
+            run_after = datetime.now(timezone.utc) + timedelta(seconds=e.seconds)
+            await self._settle(release_job, job, "deferred", run_after=run_after)
+        except asyncio.CancelledError:
+            if job.id in self._lost:
+                self.outcomes["lost"] += 1
+                logger.warning(f"Stopped job {job.kind} {job.id}: another worker took over its lease")
+                return
+            # Shutting down: hand the job to another worker straight away
+            await self._settle(release_job, job, "released", run_after=datetime.now(timezone.utc))
+            raise
+        except PermanentJobError as e:
+            logger.error(f"Job {job.kind} {job.id} is dead: {str(e)}")
+            await self._settle(fail_job, job, "dead", error=str(e), retry_at=None)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            if job.attempts < job.max_attempts:
+                logger.warning(f"Job {job.kind} {job.id} failed on attempt {job.attempts}, retrying: {error}")
+                retry_at = datetime.now(timezone.utc) + _backoff(job.attempts)
+                await self._settle(fail_job, job, "retry", error=error, retry_at=retry_at)
+            else:
+                logger.error(f"Job {job.kind} {job.id} is dead after {job.attempts} attempts: {error}")
+                await self._settle(fail_job, job, "dead", error=error, retry_at=None)
+        else:
+            await self._settle(complete_job, job, "done", result=result)
+
+    async def renew_leases(self) -> None:
+        """Extend the leases on running jobs and stop those another worker has taken over"""
+        job_ids = [job_id for job_id in self._running if job_id not in self._settling]
+        if not job_ids:
+            return
+        try:
+            async with self.session_factory() as db:
+                held = await renew_job_leases(
+                    db, worker_id=self.worker_id, job_ids=job_ids, lease_seconds=settings.JOB_LEASE_SECONDS
+                )
+        except Exception as e:
+            logger.error(f"Could not renew job leases: {str(e)}")
+            return
+        for job_id in job_ids:
+            if job_id not in held and job_id in self._running and job_id not in self._settling:
+                self._lost.add(job_id)
+                self._running[job_id].cancel()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(settings.JOB_LEASE_SECONDS / 3)
+            await self.renew_leases()
+
+    async def run(self) -> None:
+        """Poll for jobs until ``stop()``, then let running jobs finish within the shutdown grace period"""
+        logger.info(f"Worker {self.worker_id} running up to {self.concurrency} jobs")
+        heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            while not self._stopping:
+                # A job finishing or stop() wakes the worker before the poll interval is up
+                self._wake.clear()
+                try:
+                    if self.schedule:
+                        await self.enqueue_periodic()
+                    await self.run_once()
+                except Exception as e:
+                    logger.error(f"Job poll failed: {str(e)}")
+                try:
+                    await asyncio.wait_for(
+                        self._wake.wait(), settings.JOB_POLL_INTERVAL_SECONDS * random.uniform(0.8, 1.2)
+                    )
+                except asyncio.TimeoutError:
+                    pass
+
+            if self._running:
+                logger.info(f"Waiting up to {settings.WORKER_SHUTDOWN_GRACE_SECONDS}s for {len(self._running)} jobs")
+                _, pending = await asyncio.wait(
+                    list(self._running.values()), timeout=settings.WORKER_SHUTDOWN_GRACE_SECONDS
+                )
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    def stop(self) -> None:
+        self._stopping = True
+        self._wake.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"worker_id": self.worker_id, "running": len(self._running), "outcomes": dict(self.outcomes)}
+
+async def _serve(worker: JobWorker) -> None:
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, worker.stop)
+    await http_pool.start()
+    try:
+        await worker.run()
+    finally:
+        await http_pool.close()
+        await default_engine.dispose()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run background jobs from the Postgres job queue")
+    parser.add_argument("--concurrency", type=int, default=None, help="jobs run at once (WORKER_CONCURRENCY)")
+    parser.add_argument("--no-schedule", action="store_true", help="run queued jobs but enqueue no periodic ones")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    asyncio.run(_serve(JobWorker(concurrency=args.concurrency, schedule=not args.no_schedule)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""Load test: synthetic users through fetch → engine → persist against fake providers.
+
+Starts benchmarks.fake_providers in a child process (or uses one already
+running at ``--fake-url``) and points the Slack and Google clients at it
+through configuration (SLACK_API_BASE_URL, GOOGLE_API_BASE_URL,
+GOOGLE_TOKEN_URI). Creates ``--users`` users with Slack and Google
+tokens in the configured database, then runs each one, ``--concurrency``
+at a time, through the production path: stored tokens,
+fetch_user_metadata (cache, bulkheads and circuit breakers included),
+SignalEngine.process_metadata and a bulk insert of its signals and
+nudges. Reports throughput, per-stage and per-provider latency
+percentiles, fetch outcomes and what the fake server answered. The
+synthetic users and everything they produced are deleted afterwards.
+
+Usage: python -m benchmarks.bench_integrations [--users 2000] [--concurrency 100] [--latency 0.05]
+    [--error-rate 0.01] [--rate-limit-rate 0.005] [--page-size N] [--bulkhead N] [--fake-url URL]
+"""
+from typing import Dict, Any, List
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+import httpx
+
+from benchmarks.fake_providers import FakeProviders
+
+def _serve_fake(options: Dict[str, Any], urls: multiprocessing.Queue) -> None:
+    """Child process entry point; its own interpreter keeps the fake off the app's GIL"""
+    fake = FakeProviders(**options)
+    urls.put(fake.start())
+    threading.Event().wait()
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        name: ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+        for name, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))
+    }
+
+async def run(args: argparse.Namespace) -> None:
+    # Imported here: settings and the client singletons read the environment set up in main()
+    from sqlalchemy import delete
+    from app.db import base  # noqa: F401
+    from app.db.session import AsyncSessionLocal
+    from app.core.http_pool import http_pool
+    from app.core.signals.engine import SignalEngine
+    from app.core.signals.fetch import fetch_user_metadata
+    from app.core.signals.sweep import ShardResult, SweepUser, persist_shard
+    from app.crud.integration import get_user_tokens
+    from app.models.integration import IntegrationToken
+    from app.models.signal import Nudge, Signal
+    from app.models.user import User
+
+    run_id = uuid.uuid4().hex[:8]
+    users = [
+        SweepUser(id=uuid.uuid4(), email=f"load-{run_id}-{i}@example.com", slack_user_id=f"ULOAD{run_id}{i}")
+        for i in range(args.users)
+    ]
+    expires_at = datetime.now(timezone.utc) + timedelta(hours=1)  # No refreshes during the run
+    async with AsyncSessionLocal() as db:
+        db.add_all([
+            User(
+                id=user.id, email=user.email, hashed_password="-", full_name="Load Test",
+                slack_user_id=user.slack_user_id, data_consent_given=True
+            )
+            for user in users
+        ])
+        await db.flush()
+        for user in users:
+            db.add(IntegrationToken(
+                user_id=user.id, provider="slack", access_token=f"xoxp-{user.id}",
+                extra={"user_id": user.slack_user_id}
+            ))
+            db.add(IntegrationToken(
+                user_id=user.id, provider="google", access_token=f"ya29.{user.id}",
+                refresh_token=f"refresh-{user.id}", expires_at=expires_at
+            ))
+        await db.commit()
+
+    engine = SignalEngine()
+    stages: Dict[str, List[float]] = defaultdict(list)
+    providers: Dict[str, List[float]] = defaultdict(list)
+    outcomes: Dict[str, Counter] = defaultdict(Counter)
+    totals = Counter()
+    errors = Counter()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(user: SweepUser) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as db:
+                    tokens = await get_user_tokens(db, user.id)
+                fetched = await fetch_user_metadata(user, tokens)
+                fetch_done = time.perf_counter()
+                slack, calendar, gmail = fetched.as_metadata()
+                signals = await engine.process_metadata(
+                    user=user, slack_metadata=slack, calendar_metadata=calendar, gmail_metadata=gmail
+                )
+                engine_done = time.perf_counter()
+                result = ShardResult(shard=0, users=1, signals=[{
+                    "user_id": signal.user_id,
+                    "type": signal.type,
+                    "source": signal.source,
+                    "severity": signal.severity,
+                    "confidence": signal.confidence,
+                    "extra_data": signal.extra_data,
+                } for signal in signals])
+                async with AsyncSessionLocal() as db:
+                    persisted, nudges = await persist_shard(db, result)
+                done = time.perf_counter()
+            except Exception as e:
+                errors[type(e).__name__] += 1
+                return
+            stages["fetch"].append((fetch_done - start) * 1000)
+            stages["engine"].append((engine_done - fetch_done) * 1000)
+            stages["persist"].append((done - engine_done) * 1000)
+            stages["total"].append((done - start) * 1000)
+            totals["signals"] += persisted
+            totals["nudges"] += nudges
+            for provider, outcome in fetched.providers.items():
+                outcomes[provider][outcome.status] += 1
+                if outcome.status != "not_connected":
+                    providers[provider].append(outcome.latency_ms)
+
+    await http_pool.start()
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(one(user) for user in users))
+        elapsed = time.perf_counter() - start
+    finally:
+        await http_pool.close()
+        user_ids = [user.id for user in users]
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Nudge).where(Nudge.user_id.in_(user_ids)))
+            await db.execute(delete(Signal).where(Signal.user_id.in_(user_ids)))
+            await db.execute(delete(User).where(User.id.in_(user_ids)))  # Tokens and sync state cascade
+            await db.commit()
+
+    completed = len(stages["total"])
+    print(
+        f"{completed}/{args.users} users in {elapsed:.2f}s: {completed / elapsed:,.1f} users/s, "
+        f"{totals['signals']} signals, {totals['nudges']} nudges, {sum(errors.values())} errors"
+        + (f" ({', '.join(f'{name} {count}' for name, count in errors.most_common())})" if errors else "")
+    )
+    print(f"{'latency ms':>12} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for name, samples in [*stages.items(), *providers.items()]:
+        values = percentiles(samples)
+        print(f"{name:>12} " + " ".join(f"{values[q]:>8.1f}" for q in ("p50", "p95", "p99", "max")))
+    for provider, counts in outcomes.items():
+        print(f"{provider:>12} outcomes: " + ", ".join(f"{status} {count}" for status, count in counts.most_common()))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100, help="users in flight at once")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per provider HTTP request")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.01, help="share of provider requests answered 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.005, help="share answered 429")
+    parser.add_argument("--page-size", type=int, default=None, help="cap on items per page, to force pagination")
+    parser.add_argument("--bulkhead", type=int, default=None, help="override each provider's max concurrency")
+    parser.add_argument("--fake-url", default=None, help="use a fake provider server that is already running")
+    args = parser.parse_args()
+
+    server = None
+    if args.fake_url:
+        base_url = args.fake_url.rstrip("/") + "/"
+        print(f"{args.users} users, {args.concurrency} concurrent, fake providers at {base_url}")
+    else:
+        options = dict(
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+            retry_after=0,
+            page_size=args.page_size
+        )
+        urls = multiprocessing.Queue()
+        server = multiprocessing.Process(target=_serve_fake, args=(options, urls), daemon=True)
+        server.start()
+        base_url = urls.get(timeout=30)
+        print(
+            f"{args.users} users, {args.concurrency} concurrent, {args.latency * 1000:.0f}ms per request, "
+            f"{args.error_rate:.1%} errors, {args.rate_limit_rate:.1%} rate limited"
+        )
+    os.environ.update(FakeProviders.settings(base_url))
+    if args.bulkhead:
+        for name in ("SLACK_MAX_CONCURRENCY", "CALENDAR_MAX_CONCURRENCY", "GMAIL_MAX_CONCURRENCY"):
+            os.environ[name] = str(args.bulkhead)
+    # Failed fetches are counted in the report; their log lines would drown it
+    logging.basicConfig(level=logging.CRITICAL)
+
+    try:
+        asyncio.run(run(args))
+        stats = httpx.get(f"{base_url}_fake/stats").json()
+        print("fake provider responses: " + "; ".join(
+            f"{provider} " + ", ".join(f"{status}: {count}" for status, count in statuses.items())
+            for provider, statuses in stats.items()
+        ))
+    finally:
+        if server:
+            server.terminate()
+
+if __name__ == "__main__":
+    main()
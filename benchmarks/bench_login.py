@@ -0,0 +1,83 @@
+"""Login latency under concurrent load, bcrypt inline vs on the password pool.
+
+Fires ``--logins`` password verifications with ``--concurrency`` in flight
+while an unrelated "request" ticks every 10 ms on the same event loop. With
+bcrypt inline every tick waits behind whole hashes; on the pool the ticks
+stay on time and only the logins themselves queue.
+
+Usage: python -m benchmarks.bench_login [--logins 200] [--concurrency 32] [--rounds 12]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from passlib.context import CryptContext
+
+from app.core.password import PasswordHasher
+
+TICK_INTERVAL = 0.01
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+async def _ticker(stop: asyncio.Event, lags: list) -> None:
+    """Stand-in for unrelated requests: how late does each 10 ms tick run?"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_INTERVAL)
+        lags.append(time.perf_counter() - start - TICK_INTERVAL)
+
+async def _run(verify, logins: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, lags = [], []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(stop, lags))
+    await asyncio.sleep(0)
+
+    async def login(arrived: float) -> None:
+        async with semaphore:
+            await verify()
+        latencies.append(time.perf_counter() - arrived)
+
+    # Every login arrives at once; latency includes time waiting for a slot
+    start = time.perf_counter()
+    await asyncio.gather(*(login(start) for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    return latencies, lags, elapsed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    args = parser.parse_args()
+
+    context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=args.rounds)
+    hashed = context.hash("correct horse battery staple")
+    hasher = PasswordHasher(context, workers=args.workers, max_pending=args.logins)
+
+    async def inline():
+        return context.verify("correct horse battery staple", hashed)
+
+    async def pooled():
+        return await hasher.verify("correct horse battery staple", hashed)
+
+    print(f"{args.logins} logins, concurrency {args.concurrency}, bcrypt cost {args.rounds}, {args.workers} workers")
+    print(f"{'mode':>8} {'logins/s':>9} {'login p50':>10} {'login p99':>10} {'tick p99 lag':>13} {'tick max lag':>13}")
+    for name, verify in (("inline", inline), ("pool", pooled)):
+        latencies, lags, elapsed = asyncio.run(_run(verify, args.logins, args.concurrency))
+        print(
+            f"{name:>8} {args.logins / elapsed:>9.1f} "
+            f"{statistics.median(latencies) * 1000:>8.0f}ms {percentile(latencies, 99) * 1000:>8.0f}ms "
+            f"{percentile(lags, 99) * 1000:>11.1f}ms {max(lags) * 1000:>11.1f}ms"
+        )
+    hasher.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Throughput of SignalEngine.process_batch against the per-user path.
+
+Usage: python -m benchmarks.bench_signal_batch [--sizes 10000 100000]
+"""
+import argparse
+import asyncio
+import time
+import numpy as np
+
+from app.db import base  # noqa: F401
+from app.core.signals.engine import SignalEngine
+
+def synthetic_columns(size: int, seed: int = 0):
+    """Random but plausible weekly metadata for ``size`` users"""
+    rng = np.random.default_rng(seed)
+    calendar = {
+        "total_meetings": rng.integers(0, 30, size).astype(np.float64),
+        "total_duration_hours": rng.uniform(0, 40, size),
+        "after_hours_meetings": rng.integers(0, 6, size).astype(np.float64),
+        "present": rng.random(size) < 0.9,
+    }
+    slack = {
+        "channel_count": rng.integers(0, 25, size).astype(np.float64),
+        "reaction_count": rng.integers(0, 120, size).astype(np.float64),
+        "last_active_hour": rng.integers(0, 24, size).astype(np.float64),
+        "present": rng.random(size) < 0.8,
+    }
+    gmail = {
+        "total_messages": rng.integers(0, 250, size).astype(np.float64),
+        "thread_count": rng.integers(0, 60, size).astype(np.float64),
+        "present": rng.random(size) < 0.7,
+    }
+    return calendar, slack, gmail
+
+def _rows(columns, index, names):
+    if not columns["present"][index]:
+        return None
+    return {name: columns[name][index].item() for name in names}
+
+async def _per_user(engine: SignalEngine, calendar, slack, gmail, size: int) -> None:
+    for index in range(size):
+        slack_row = _rows(slack, index, ("channel_count", "reaction_count"))
+        if slack_row is not None:
+            slack_row["last_active"] = f"2025-05-20T{int(slack['last_active_hour'][index]):02d}:00:00"
+        await engine.process_metadata(
+            user=None,
+            calendar_metadata=_rows(calendar, index, ("total_meetings", "total_duration_hours", "after_hours_meetings")),
+            slack_metadata=slack_row,
+            gmail_metadata=_rows(gmail, index, ("total_messages", "thread_count"))
+        )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = SignalEngine()
+    print(f"{'users':>8} {'batch users/s':>15} {'per-user users/s':>17} {'speedup':>8}")
+    for size in args.sizes:
+        calendar, slack, gmail = synthetic_columns(size)
+        user_ids = np.arange(size)
+
+        batch_times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            engine.process_batch(user_ids, calendar=calendar, slack=slack, gmail=gmail)
+            batch_times.append(time.perf_counter() - start)
+        batch_rate = size / min(batch_times)
+
+        start = time.perf_counter()
+        asyncio.run(_per_user(engine, calendar, slack, gmail, size))
+        scalar_rate = size / (time.perf_counter() - start)
+
+        print(f"{size:>8} {batch_rate:>15,.0f} {scalar_rate:>17,.0f} {batch_rate / scalar_rate:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
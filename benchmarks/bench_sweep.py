@@ -0,0 +1,77 @@
+"""Scaling of the process-pool signal sweep with worker count.
+
+Each synthetic user gets a week of generated calendar events, Slack
+activity and email which the fetcher aggregates the same way the
+provider clients do, so workers do representative CPU work without any
+network or database.
+
+Usage: python -m benchmarks.bench_sweep [--users 20000] [--processes 1 2 4 8]
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.core.signals.sweep import SweepUser, sweep_users
+
+async def synthetic_fetcher(user: SweepUser):
+    """Generate and aggregate a week of metadata for one user"""
+    rng = random.Random(str(user.id))
+    now = datetime(2025, 5, 20, 12)
+
+    total_duration = 0.0
+    after_hours = 0
+    meetings = rng.randint(0, 40)
+    for _ in range(meetings):
+        start = now - timedelta(minutes=rng.randint(0, 7 * 24 * 60))
+        end = start + timedelta(minutes=rng.choice((15, 30, 45, 60, 90)))
+        start = datetime.fromisoformat(start.isoformat())
+        end = datetime.fromisoformat(end.isoformat())
+        total_duration += (end - start).total_seconds() / 3600
+        if start.hour >= 18:
+            after_hours += 1
+
+    threads = {f"t{rng.randint(0, 80)}" for _ in range(rng.randint(0, 200))}
+    calendar = {
+        "total_meetings": meetings,
+        "total_duration_hours": total_duration,
+        "after_hours_meetings": after_hours,
+        "average_duration_hours": total_duration / meetings if meetings else 0
+    }
+    slack = {
+        "channel_count": rng.randint(0, 30),
+        "reaction_count": rng.randint(0, 150),
+        "last_active": (now - timedelta(hours=rng.randint(0, 48))).isoformat()
+    }
+    gmail = {"total_messages": rng.randint(0, 300), "thread_count": len(threads)}
+    return slack, calendar, gmail
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--processes", type=int, nargs="+", default=None)
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    process_counts = args.processes or sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1)))
+    users = [SweepUser(id=i, email=f"user{i}@example.com") for i in range(args.users)]
+
+    print(f"{args.users} synthetic users, {cpus} CPUs")
+    print(f"{'processes':>9} {'seconds':>8} {'users/s':>10} {'speedup':>8} {'efficiency':>10}")
+    baseline = None
+    for processes in process_counts:
+        start = time.perf_counter()
+        results = asyncio.run(sweep_users(users, processes=processes, fetcher=synthetic_fetcher))
+        elapsed = time.perf_counter() - start
+        assert sum(r.users for r in results) == args.users
+        baseline = baseline or elapsed
+        speedup = baseline / elapsed
+        print(
+            f"{processes:>9} {elapsed:>8.2f} {args.users / elapsed:>10,.0f} "
+            f"{speedup:>7.2f}x {speedup / processes:>9.0%}"
+        )
+
+if __name__ == "__main__":
+    main()
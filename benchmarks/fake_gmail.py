@@ -0,0 +1,180 @@
+"""Minimal fake of the Gmail endpoints GoogleOAuth uses, for benchmarks.
+
+Serves getProfile, history.list, messages.list (paged), messages.get
+and the multipart batch endpoint with a fixed per-HTTP-request latency,
+which is what makes sequential GETs expensive against the real API.
+"""
+from typing import Optional
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import json
+import re
+import threading
+import time
+import uuid
+
+MESSAGE_PATH = re.compile(r"^/gmail/v1/users/me/messages/(?P<id>[^/?]+)$")
+
+class FakeGmail:
+    def __init__(self, messages: int = 1000, threads: int = 300, latency: float = 0.02, fail_every: int = 0):
+        self.message_ids = [f"m{i:06d}" for i in range(messages)]
+        self.threads = threads
+        self.latency = latency
+        self.fail_every = fail_every
+        self.requests = 0
+        # Newest first like Gmail, one minute apart
+        now_ms = int(time.time() * 1000)
+        self.internal_dates = {m: now_ms - i * 60000 for i, m in enumerate(self.message_ids)}
+        self.thread_ids = {m: f"t{i % threads:06d}" for i, m in enumerate(self.message_ids)}
+        self.history_id = 1000
+        self.oldest_history_id = 1000  # Older checkpoints get a 404, as when Gmail expires history
+        self.history: list = []
+        self._failed = set()
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def message(self, message_id: str) -> dict:
+        index = int(message_id[1:])
+        return {
+            "id": message_id,
+            "threadId": self.thread_ids[message_id],
+            "internalDate": str(self.internal_dates[message_id]),
+            "payload": {"headers": [
+                {"name": "From", "value": f"sender{index % 17}@example.com"},
+                {"name": "Date", "value": "Tue, 20 May 2025 09:00:00 +0000"},
+            ]}
+        }
+
+    def add_message(self, thread_id: Optional[str] = None, internal_date: Optional[int] = None) -> str:
+        """Deliver a new message, recorded in the history"""
+        with self._lock:
+            message_id = f"m{len(self.internal_dates):06d}"
+            self.message_ids.insert(0, message_id)
+            self.internal_dates[message_id] = internal_date or int(time.time() * 1000)
+            self.thread_ids[message_id] = thread_id or f"t{len(self.internal_dates):06d}"
+            self.history_id += 1
+            self.history.append({"id": str(self.history_id), "messagesAdded": [
+                {"message": {"id": message_id, "threadId": self.thread_ids[message_id], "labelIds": ["INBOX"]}}
+            ]})
+            return message_id
+
+    def delete_message(self, message_id: str) -> None:
+        with self._lock:
+            self.message_ids.remove(message_id)
+            self.history_id += 1
+            self.history.append({"id": str(self.history_id), "messagesDeleted": [
+                {"message": {"id": message_id, "threadId": self.thread_ids[message_id]}}
+            ]})
+
+    def history_since(self, query: dict) -> Optional[dict]:
+        start = int(query["startHistoryId"][0])
+        if start < self.oldest_history_id:
+            return None
+        return {
+            "history": [record for record in self.history if int(record["id"]) > start],
+            "historyId": str(self.history_id)
+        }
+
+    def get_status(self, message_id: str) -> int:
+        """503 the first time every ``fail_every``-th message is requested"""
+        if self.fail_every and int(message_id[1:]) % self.fail_every == 0:
+            with self._lock:
+                if message_id not in self._failed:
+                    self._failed.add(message_id)
+                    return 503
+        return 200
+
+    def list_page(self, query: dict) -> dict:
+        size = int(query.get("maxResults", ["100"])[0])
+        start = int(query.get("pageToken", ["0"])[0])
+        page = self.message_ids[start:start + size]
+        body = {
+            "messages": [{"id": m, "threadId": self.thread_ids[m]} for m in page],
+            "resultSizeEstimate": len(self.message_ids)
+        }
+        if start + size < len(self.message_ids):
+            body["nextPageToken"] = str(start + size)
+        return body
+
+    def start(self, port: int = 0) -> str:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str = "application/json") -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self) -> None:
+                with fake._lock:
+                    fake.requests += 1
+                time.sleep(fake.latency)
+                url = urlparse(self.path)
+                if url.path == "/gmail/v1/users/me/messages":
+                    self._send(200, json.dumps(fake.list_page(parse_qs(url.query))).encode())
+                    return
+                if url.path == "/gmail/v1/users/me/profile":
+                    body = {"emailAddress": "me@example.com", "historyId": str(fake.history_id)}
+                    self._send(200, json.dumps(body).encode())
+                    return
+                if url.path == "/gmail/v1/users/me/history":
+                    history = fake.history_since(parse_qs(url.query))
+                    if history is None:
+                        self._send(404, json.dumps({"error": {"code": 404}}).encode())
+                    else:
+                        self._send(200, json.dumps(history).encode())
+                    return
+                match = MESSAGE_PATH.match(url.path)
+                if match:
+                    status = fake.get_status(match.group("id"))
+                    body = fake.message(match.group("id")) if status == 200 else {"error": {"code": status}}
+                    self._send(status, json.dumps(body).encode())
+                    return
+                self._send(404, b"{}")
+
+            def do_POST(self) -> None:
+                with fake._lock:
+                    fake.requests += 1
+                time.sleep(fake.latency)
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                if urlparse(self.path).path != "/batch":
+                    self._send(404, b"{}")
+                    return
+                envelope = BytesParser(policy=HTTP).parsebytes(
+                    f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body
+                )
+                boundary = uuid.uuid4().hex
+                parts = []
+                for part in envelope.iter_parts():
+                    content_id = part["Content-ID"].strip("<>")
+                    request_line = part.get_payload(decode=True).decode().split("\r\n", 1)[0]
+                    match = MESSAGE_PATH.match(urlparse(request_line.split(" ")[1]).path)
+                    status = fake.get_status(match.group("id")) if match else 404
+                    result = fake.message(match.group("id")) if status == 200 else {"error": {"code": status}}
+                    payload = json.dumps(result)
+                    parts.append(
+                        f"--{boundary}\r\nContent-Type: application/http\r\n"
+                        f"Content-ID: <response-{content_id}>\r\n\r\n"
+                        f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                        f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n{payload}\r\n"
+                    )
+                response = "".join(parts) + f"--{boundary}--\r\n"
+                self._send(200, response.encode(), f"multipart/mixed; boundary={boundary}")
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_address[1]}/"
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
@@ -0,0 +1,396 @@
+"""Local fake of the Slack, Google Calendar and Gmail endpoints Tend calls.
+
+Serves the subset of the Slack Web API (auth.test, oauth.v2.access,
+users.getPresence, users.conversations, reactions.list), Calendar v3
+(events.list with sync tokens, events.watch), Gmail v1 (getProfile,
+history.list, messages.list/get, the batch endpoint, users.watch) and the
+Google token endpoint, with deterministic per-user data keyed on the
+bearer token. Every request gets ``latency`` (plus up to ``jitter``) of
+delay, then with probability ``rate_limit_rate`` a 429 with Retry-After
+or with probability ``error_rate`` a 503. ``page_size`` caps pages below
+what the client asks for, to force pagination. GET /_fake/stats returns
+the responses served so far by provider and status.
+
+Point the app at it through configuration:
+
+    SLACK_API_BASE_URL=http://127.0.0.1:8900/api/
+    GOOGLE_API_BASE_URL=http://127.0.0.1:8900/
+    GOOGLE_TOKEN_URI=http://127.0.0.1:8900/token
+
+Usage: python -m benchmarks.fake_providers [--port 8900] [--latency 0.05] [--error-rate 0.01]
+"""
+from typing import Dict, Any, Optional, Tuple
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from email.parser import BytesParser
+from email.policy import HTTP
+from urllib.parse import urlparse
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from aiohttp import web
+
+MESSAGE_PATH = re.compile(r"^/gmail/v1/users/me/messages/(?P<id>[^/?]+)$")
+SLACK_METHODS = {"auth.test", "oauth.v2.access", "users.getPresence", "users.conversations", "reactions.list"}
+
+class FakeProviders:
+    def __init__(
+        self,
+        *,
+        latency: float = 0.02,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 1,
+        page_size: Optional[int] = None,
+        channels: int = 40,
+        reactions: int = 80,
+        events: int = 25,
+        messages: int = 200,
+        threads: int = 60,
+        seed: int = 0
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.page_size = page_size
+        # Per-user counts vary around these means
+        self.channels = channels
+        self.reactions = reactions
+        self.events = events
+        self.messages = messages
+        self.threads = threads
+        self.seed = seed
+        self.requests: Counter = Counter()  # (provider, status)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    # Per-user data, derived from the access token so every worker sees the same account
+
+    def _user(self, request: web.Request) -> Tuple[str, random.Random]:
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        digest = hashlib.sha256(f"{self.seed}:{token}".encode()).hexdigest()
+        return digest[:10], random.Random(digest)
+
+    def _count(self, rng: random.Random, mean: int) -> int:
+        return max(0, int(rng.gauss(mean, mean / 3)))
+
+    def _page(self, params: Dict[str, Any], requested: str, default: int) -> Tuple[int, int]:
+        """(start, size) of the page asked for, capped at ``page_size``"""
+        size = int(params.get(requested) or default)
+        if self.page_size:
+            size = min(size, self.page_size)
+        return int(params.get("cursor") or params.get("pageToken") or 0), size
+
+    def _chaos(self) -> Optional[int]:
+        """Status of an injected failure for this request, if any"""
+        with self._lock:
+            roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 503
+        return None
+
+    def _record(self, provider: str, status: int) -> None:
+        with self._lock:
+            self.requests[(provider, status)] += 1
+
+    async def _delay(self) -> None:
+        with self._lock:
+            jitter = self._random.random() * self.jitter
+        await asyncio.sleep(self.latency + jitter)
+
+    def _json(self, provider: str, body: Dict[str, Any], status: int = 200, headers=None) -> web.Response:
+        self._record(provider, status)
+        return web.json_response(body, status=status, headers=headers)
+
+    def _google_error(self, provider: str, status: int) -> web.Response:
+        headers = {"Retry-After": str(self.retry_after)} if status == 429 else None
+        message = "Rate Limit Exceeded" if status == 429 else "Backend Error"
+        return self._json(provider, {"error": {"code": status, "message": message}}, status, headers)
+
+    # Slack
+
+    async def slack(self, request: web.Request) -> web.Response:
+        await self._delay()
+        method = request.match_info["method"]
+        params = {**request.query, **(await request.post())}
+        failure = self._chaos()
+        if failure == 429:
+            return self._json(
+                "slack", {"ok": False, "error": "ratelimited"}, 429, {"Retry-After": str(int(self.retry_after))}
+            )
+        if failure:
+            return self._json("slack", {"ok": False, "error": "internal_error"}, failure)
+        if method not in SLACK_METHODS:
+            return self._json("slack", {"ok": False, "error": "unknown_method"})
+
+        if method == "oauth.v2.access":
+            return self._json("slack", {
+                "ok": True,
+                "access_token": f"xoxe.xoxp-{uuid.uuid4().hex}",
+                "refresh_token": f"xoxe-{uuid.uuid4().hex}",
+                "expires_in": 43200,
+                "team": {"id": "TFAKE"},
+                "authed_user": {"id": "UFAKE"}
+            })
+        key, rng = self._user(request)
+        if method == "auth.test":
+            return self._json("slack", {"ok": True, "user_id": f"U{key}", "team_id": "TFAKE", "user": f"user-{key}"})
+        if method == "users.getPresence":
+            return self._json("slack", {
+                "ok": True,
+                "presence": rng.choice(["active", "away"]),
+                "last_activity": int(time.time()) - rng.randint(0, 48 * 3600)
+            })
+
+        start, size = self._page(params, "limit", 100)
+        if method == "users.conversations":
+            total = self._count(rng, self.channels)
+            body = {"ok": True, "channels": [{"id": f"C{key}{i}"} for i in range(start, min(start + size, total))]}
+        else:
+            # Newest first, spread over the last 45 days so part falls outside the 30-day window
+            total = self._count(rng, self.reactions)
+            now = time.time()
+            body = {"ok": True, "items": [
+                {"type": "message", "message": {"ts": f"{now - i * 45 * 86400 / max(total, 1):.6f}"}}
+                for i in range(start, min(start + size, total))
+            ]}
+        if start + size < total:
+            body["response_metadata"] = {"next_cursor": str(start + size)}
+        return self._json("slack", body)
+
+    # Google
+
+    async def token(self, request: web.Request) -> web.Response:
+        await self._delay()
+        form = await request.post()
+        failure = self._chaos()
+        if failure:
+            return self._google_error("google_token", failure)
+        if form.get("grant_type") == "refresh_token" and not form.get("refresh_token"):
+            return self._json("google_token", {"error": "invalid_grant"}, 400)
+        # Derived from the grant, so a refreshed token still maps to the same account
+        grant = form.get("refresh_token") or form.get("code") or ""
+        return self._json("google_token", {
+            "access_token": f"ya29.{hashlib.sha256(grant.encode()).hexdigest()[:32]}",
+            "expires_in": 3599,
+            "token_type": "Bearer",
+            "scope": "https://www.googleapis.com/auth/calendar.readonly https://www.googleapis.com/auth/gmail.metadata"
+        })
+
+    async def calendar_events(self, request: web.Request) -> web.Response:
+        await self._delay()
+        failure = self._chaos()
+        if failure:
+            return self._google_error("calendar", failure)
+        key, rng = self._user(request)
+        params = request.query
+        if params.get("syncToken"):
+            # Nothing changed since the last sync
+            return self._json("calendar", {"items": [], "nextSyncToken": params["syncToken"]})
+
+        # Working-hours meetings over the last week, a few running late
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        total = self._count(rng, self.events)
+        items = []
+        for i in range(total):
+            start = today - timedelta(days=rng.randint(1, 6), hours=-rng.choice([9, 10, 11, 13, 14, 15, 16, 18, 19]))
+            end = start + timedelta(minutes=rng.choice([15, 30, 30, 60, 60, 90]))
+            items.append({
+                "id": f"e{key}{i}",
+                "status": "confirmed",
+                "start": {"dateTime": start.isoformat()},
+                "end": {"dateTime": end.isoformat()}
+            })
+        start, size = self._page(params, "maxResults", 250)
+        body = {"items": items[start:start + size]}
+        if start + size < total:
+            body["nextPageToken"] = str(start + size)
+        else:
+            body["nextSyncToken"] = f"sync-{key}"
+        return self._json("calendar", body)
+
+    async def watch(self, request: web.Request) -> web.Response:
+        await self._delay()
+        return self._json("google_watch", {"id": str(uuid.uuid4()), "expiration": str(int(time.time() + 86400) * 1000)})
+
+    def _mailbox(self, request: web.Request) -> Tuple[str, int, int]:
+        key, rng = self._user(request)
+        return key, self._count(rng, self.messages), max(1, self._count(rng, self.threads))
+
+    def _message(self, message_id: str, total: int, threads: int) -> Dict[str, Any]:
+        # Newest first, spread evenly over the last week
+        index = int(message_id[1:])
+        internal_date = int((time.time() - index * 7 * 86400 / max(total, 1)) * 1000)
+        return {
+            "id": message_id,
+            "threadId": f"t{index % threads:06d}",
+            "internalDate": str(internal_date),
+            "payload": {"headers": [
+                {"name": "From", "value": f"sender{index % 17}@example.com"},
+                {"name": "Date", "value": "Tue, 20 May 2025 09:00:00 +0000"}
+            ]}
+        }
+
+    async def gmail(self, request: web.Request) -> web.Response:
+        await self._delay()
+        failure = self._chaos()
+        if failure:
+            return self._google_error("gmail", failure)
+        _, total, threads = self._mailbox(request)
+        path = request.path
+        if path == "/gmail/v1/users/me/profile":
+            return self._json("gmail", {"emailAddress": "me@example.com", "historyId": "1000"})
+        if path == "/gmail/v1/users/me/history":
+            return self._json("gmail", {"history": [], "historyId": "1000"})
+        if path == "/gmail/v1/users/me/messages":
+            start, size = self._page(request.query, "maxResults", 100)
+            page = range(start, min(start + size, total))
+            body = {
+                "messages": [{"id": f"m{i:06d}", "threadId": f"t{i % threads:06d}"} for i in page],
+                "resultSizeEstimate": total
+            }
+            if start + size < total:
+                body["nextPageToken"] = str(start + size)
+            return self._json("gmail", body)
+        match = MESSAGE_PATH.match(path)
+        if match and int(match.group("id")[1:]) < total:
+            return self._json("gmail", self._message(match.group("id"), total, threads))
+        return self._json("gmail", {"error": {"code": 404, "message": "Not Found"}}, 404)
+
+    async def batch(self, request: web.Request) -> web.Response:
+        await self._delay()
+        failure = self._chaos()
+        if failure:
+            return self._google_error("gmail", failure)
+        _, total, threads = self._mailbox(request)
+        envelope = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {request.headers['Content-Type']}\r\n\r\n".encode() + await request.read()
+        )
+        boundary = uuid.uuid4().hex
+        parts = []
+        for part in envelope.iter_parts():
+            content_id = part["Content-ID"].strip("<>")
+            request_line = part.get_payload(decode=True).decode().split("\r\n", 1)[0]
+            match = MESSAGE_PATH.match(urlparse(request_line.split(" ")[1]).path)
+            # Items fail independently inside a batch, as they do against Gmail
+            status = self._chaos() or (200 if match and int(match.group("id")[1:]) < total else 404)
+            result = self._message(match.group("id"), total, threads) if status == 200 else {"error": {"code": status}}
+            payload = json.dumps(result)
+            parts.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n{payload}\r\n"
+            )
+        self._record("gmail", 200)
+        return web.Response(
+            body=("".join(parts) + f"--{boundary}--\r\n").encode(),
+            headers={"Content-Type": f"multipart/mixed; boundary={boundary}"}
+        )
+
+    async def stats_endpoint(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats())
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=16 * 1024 * 1024)
+        app.router.add_route("*", "/api/{method}", self.slack)
+        app.router.add_post("/token", self.token)
+        app.router.add_get("/calendar/v3/calendars/{calendar}/events", self.calendar_events)
+        app.router.add_post("/calendar/v3/calendars/{calendar}/events/watch", self.watch)
+        app.router.add_post("/gmail/v1/users/me/watch", self.watch)
+        app.router.add_get("/gmail/v1/users/me/{path:.*}", self.gmail)
+        app.router.add_post("/batch/{path:.*}", self.batch)
+        app.router.add_post("/batch", self.batch)
+        app.router.add_get("/_fake/stats", self.stats_endpoint)
+        return app
+
+    def stats(self) -> Dict[str, Dict[int, int]]:
+        with self._lock:
+            stats: Dict[str, Dict[int, int]] = {}
+            for (provider, status), count in sorted(self.requests.items()):
+                stats.setdefault(provider, {})[status] = count
+            return stats
+
+    @staticmethod
+    def settings(base_url: str) -> Dict[str, str]:
+        """Environment pointing the app's clients at this server"""
+        return {
+            "SLACK_API_BASE_URL": f"{base_url}api/",
+            "GOOGLE_API_BASE_URL": base_url,
+            "GOOGLE_TOKEN_URI": f"{base_url}token"
+        }
+
+    def start(self, port: int = 0) -> str:
+        """Serve on a background thread with its own event loop; returns the base URL"""
+        started = threading.Event()
+
+        async def serve() -> None:
+            self._runner = web.AppRunner(self.app(), access_log=None)
+            await self._runner.setup()
+            site = web.TCPSite(self._runner, "127.0.0.1", port)
+            await site.start()
+            started.set()
+
+        def run() -> None:
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(serve())
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        started.wait()
+        return f"http://127.0.0.1:{self._runner.addresses[0][1]}/"
+
+    def stop(self) -> None:
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per HTTP request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random seconds per request, up to")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of requests answered 429")
+    parser.add_argument("--retry-after", type=float, default=1)
+    parser.add_argument("--page-size", type=int, default=None, help="cap on items per page")
+    args = parser.parse_args()
+
+    fake = FakeProviders(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        page_size=args.page_size
+    )
+    base_url = fake.start(args.port)
+    print(f"Fake providers on {base_url}")
+    for name, value in fake.settings(base_url).items():
+        print(f"{name}={value}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        fake.stop()
+
+if __name__ == "__main__":
+    main()
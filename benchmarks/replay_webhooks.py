@@ -0,0 +1,133 @@
+"""Replay recorded Slack and Google webhook payloads against the app.
+
+A local stand-in for the providers: each line of the recording is one
+delivery (``source``, original ``at`` time, ``body`` and/or ``headers``).
+Payloads are re-addressed to one Tend user, re-signed with this
+deployment's secrets and shifted so the newest event happens now, then
+POSTed in order, optionally at their recorded pace.
+
+Usage: python -m benchmarks.replay_webhooks --email someone@example.com
+       [--base-url http://localhost:8000] [--file benchmarks/webhook_events.jsonl] [--speed 0]
+"""
+from typing import Dict, Any, List, Optional
+from collections import Counter
+import argparse
+import asyncio
+import base64
+import copy
+import hashlib
+import hmac
+import json
+import os
+import time
+import uuid
+
+import httpx
+
+from app.core.config import settings
+from app.core.webhooks import push_channel_token
+
+RECORDING = os.path.join(os.path.dirname(__file__), "webhook_events.jsonl")
+WEBHOOKS = f"{settings.API_V1_STR}/webhooks"
+
+def load(path: str = RECORDING) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def _slack_request(record: Dict[str, Any], shift: float, slack_user_id: str, run: str) -> Dict[str, Any]:
+    body = copy.deepcopy(record["body"])
+    body["event_id"] = f"{body['event_id']}-{run}"
+    event = body["event"]
+    if "user" in event:
+        event["user"] = slack_user_id
+    for key in ("ts", "event_ts"):
+        if key in event:
+            event[key] = f"{float(event[key]) + shift:.6f}"
+    content = json.dumps(body).encode()
+    timestamp = str(int(time.time()))
+    signature = hmac.new(
+        settings.SLACK_SIGNING_SECRET.encode(), f"v0:{timestamp}:".encode() + content, hashlib.sha256
+    ).hexdigest()
+    headers = {
+        **record.get("headers", {}),
+        "Content-Type": "application/json",
+        "X-Slack-Request-Timestamp": timestamp,
+        "X-Slack-Signature": f"v0={signature}"
+    }
+    return {"url": f"{WEBHOOKS}/slack/events", "content": content, "headers": headers}
+
+def _calendar_request(record: Dict[str, Any], user_id: Any, run: str) -> Dict[str, Any]:
+    headers = {**record["headers"], "X-Goog-Channel-Token": push_channel_token(user_id)}
+    headers["X-Goog-Channel-ID"] = f"{headers['X-Goog-Channel-ID']}-{run}"
+    return {"url": f"{WEBHOOKS}/google/calendar", "headers": headers}
+
+def _gmail_request(record: Dict[str, Any], email: str, run: str) -> Dict[str, Any]:
+    body = copy.deepcopy(record["body"])
+    data = json.loads(base64.b64decode(body["message"]["data"]))
+    data["emailAddress"] = email
+    body["message"]["data"] = base64.b64encode(json.dumps(data).encode()).decode()
+    body["message"]["messageId"] = f"{body['message']['messageId']}-{run}"
+    return {"url": f"{WEBHOOKS}/google/gmail", "params": {"token": settings.GOOGLE_PUSH_TOKEN}, "json": body}
+
+async def replay(
+    client: httpx.AsyncClient,
+    records: List[Dict[str, Any]],
+    *,
+    user_id: Any,
+    slack_user_id: Optional[str],
+    email: str,
+    speed: float = 0
+) -> Dict[str, Any]:
+    """POST every recorded delivery; returns status counts and acknowledgement latencies"""
+    run = uuid.uuid4().hex[:8]  # Fresh ids per run; retries within the recording keep theirs
+    shift = time.time() - max(record["at"] for record in records)
+    statuses = Counter()
+    latencies = []
+    previous = None
+    for record in records:
+        if speed and previous is not None:
+            await asyncio.sleep((record["at"] - previous) / speed)
+        previous = record["at"]
+        if record["source"] == "slack":
+            request = _slack_request(record, shift, slack_user_id or "", run)
+        elif record["source"] == "calendar":
+            request = _calendar_request(record, user_id, run)
+        else:
+            request = _gmail_request(record, email, run)
+        start = time.perf_counter()
+        response = await client.post(**request)
+        latencies.append((time.perf_counter() - start) * 1000)
+        statuses[response.status_code] += 1
+    latencies.sort()
+    return {
+        "deliveries": len(records),
+        "statuses": dict(statuses),
+        "ack_p50_ms": round(latencies[len(latencies) // 2], 2),
+        "ack_max_ms": round(latencies[-1], 2)
+    }
+
+async def _main(args: argparse.Namespace) -> None:
+    from sqlalchemy import select
+    from app.db import base  # noqa: F401
+    from app.db.session import AsyncSessionLocal
+    from app.models.user import User
+
+    async with AsyncSessionLocal() as db:
+        user = (await db.execute(select(User).filter(User.email == args.email))).scalar_one()
+    async with httpx.AsyncClient(base_url=args.base_url) as client:
+        result = await replay(
+            client, load(args.file),
+            user_id=user.id, slack_user_id=user.slack_user_id, email=user.email, speed=args.speed
+        )
+    print(json.dumps(result, indent=2))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--email", required=True, help="Tend user the recording is replayed as")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--file", default=RECORDING)
+    parser.add_argument("--speed", type=float, default=0, help="1 = recorded pace, 0 = as fast as possible")
+    asyncio.run(_main(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import json
+import pytest
+from datetime import datetime, timedelta, timezone
+from googleapiclient.discovery import build_from_document
+from googleapiclient.http import HttpMockSequence
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import base  # noqa: F401
+from app.core.oauth import google
+from app.core.oauth.google import GoogleOAuth
+from app.core.oauth.google_clients import GoogleServiceFactory
+from app.crud.integration import get_calendar_sync_state
+from app.crud.user import create_user
+from app.schemas.user import UserCreate
+from app.models.user import UserRole
+
+def _event(event_id: str, start: datetime, hours: float = 1, **extra):
+    return {
+        "id": event_id,
+        "status": "confirmed",
+        "start": {"dateTime": start.isoformat()},
+        "end": {"dateTime": (start + timedelta(hours=hours)).isoformat()},
+        **extra
+    }
+
+def _page(items, **tokens):
+    return ({"status": "200"}, json.dumps({"items": items, **tokens}))
+
+class RecordingSequence(HttpMockSequence):
+    """HttpMockSequence that keeps the requested URIs"""
+
+    def __init__(self, iterable):
+        super().__init__(iterable)
+        self.uris = []
+
+    def request(self, uri, *args, **kwargs):
+        self.uris.append(uri)
+        return super().request(uri, *args, **kwargs)
+
+@pytest.mark.asyncio
+async def test_calendar_sync_is_incremental(db: AsyncSession, monkeypatch):
+    user = await create_user(db, obj_in=UserCreate(
+        email="calendar-sync@example.com",
+        password="testpass123",
+        full_name="Calendar User",
+        role=UserRole.EMPLOYEE
+    ))
+    day = datetime.now(timezone.utc).replace(hour=10, minute=0, second=0, microsecond=0) - timedelta(days=2)
+    responses = RecordingSequence([
+        # Full sync over two pages
+        _page([_event("a", day), _event("b", day.replace(hour=19), 2)], nextPageToken="p2"),
+        _page([_event("c", day + timedelta(days=1))], nextSyncToken="sync-1"),
+        # Incremental: one cancelled, one moved, one far-future instance
+        _page([
+            {"id": "a", "status": "cancelled"},
+            _event("c", day + timedelta(days=1), 3),
+            _event("far", day + timedelta(days=90))
+        ], nextSyncToken="sync-2"),
+        # Token expired, then full resync
+        ({"status": "410"}, json.dumps({"error": {"code": 410, "message": "Sync token is no longer valid"}})),
+        _page([_event("d", day)], nextSyncToken="sync-3"),
+        # Horizon reached: full sync without trying the token
+        _page([_event("e", day)], nextSyncToken="sync-4"),
+    ])
+    service = build_from_document(GoogleServiceFactory().document("calendar", "v3"), http=responses)
+    monkeypatch.setattr(google.google_services, "service", lambda *args: service)
+    oauth = GoogleOAuth()
+
+    metadata = await oauth.sync_calendar_metadata(db, user.id, {}, full_sync=True)
+    assert metadata["sync"] == "full"
+    assert metadata["api_calls"] == 2
+    assert metadata["total_meetings"] == 3
+    assert metadata["after_hours_meetings"] == 1
+    assert metadata["total_duration_hours"] == 4
+    # A full sync is bounded on both sides, so recurring events are not expanded indefinitely
+    assert "timeMin=" in responses.uris[0] and "timeMax=" in responses.uris[0]
+
+    metadata = await oauth.sync_calendar_metadata(db, user.id, {})
+    assert metadata["sync"] == "incremental"
+    assert metadata["events_changed"] == 3
+    assert "timeMax=" not in responses.uris[2]
+    assert metadata["total_meetings"] == 2
+    assert metadata["total_duration_hours"] == 5
+    state = await get_calendar_sync_state(db, user.id)
+    assert state.sync_token == "sync-2"
+    assert sorted(state.events) == ["b", "c"]
+
+    metadata = await oauth.sync_calendar_metadata(db, user.id, {})
+    assert metadata["sync"] == "full"
+    assert metadata["total_meetings"] == 1
+    state = await get_calendar_sync_state(db, user.id)
+    assert state.sync_token == "sync-3"
+    assert list(state.events) == ["d"]
+    assert state.last_full_sync_at == state.last_synced_at
+
+    state.last_full_sync_at -= timedelta(days=google.CALENDAR_HORIZON_DAYS)
+    await db.commit()
+    metadata = await oauth.sync_calendar_metadata(db, user.id, {})
+    assert metadata["sync"] == "full"
+    assert metadata["api_calls"] == 1
+    assert "syncToken=" not in responses.uris[-1]
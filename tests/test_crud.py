@@ -1,9 +1,17 @@
 import pytest
+from datetime import datetime, timedelta
+from uuid import uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.crud.user import create_user, get_user, get_user_by_email
+from app.crud.user import create_user, get_user, get_user_by_email, update_user, authenticate
+from app.core.password import pwd_context, PasswordHasher, PasswordHasherBusy
+from app.core.security import create_access_token, verify_token
+from app.core.user_cache import user_cache
 from app.crud.team import create_team, get_team, add_team_member
 from app.crud.signal import create_signal, get_user_signals
 from app.crud.signal import create_nudge, get_user_nudges, mark_nudge_as_read
+from app.crud.signal import create_signals_bulk, create_nudges_bulk
+from app.crud.signal import delete_signal, delete_nudge, mark_all_nudges_as_read
+from app.crud.pagination import decode_cursor, next_cursor
 from app.schemas.user import UserCreate
 from app.schemas.team import TeamCreate
 from app.schemas.signal import SignalCreate, NudgeCreate
@@ -110,4 +118,179 @@ async def test_nudge_crud(db: AsyncSession):
     
     # Mark nudge as read
     updated_nudge = await mark_nudge_as_read(db, nudge_id=nudge.id, user_id=user.id)
-    assert updated_nudge.is_read == True 
\ No newline at end of file
+    assert updated_nudge.is_read == True 
+@pytest.mark.asyncio
+async def test_bulk_signal_and_nudge_crud(db: AsyncSession):
+    user_in = UserCreate(
+        email="bulk@example.com",
+        password="testpass123",
+        full_name="Bulk User",
+        role=UserRole.EMPLOYEE
+    )
+    user = await create_user(db, obj_in=user_in)
+
+    signals = await create_signals_bulk(db, [
+        {
+            "user_id": user.id,
+            "type": signal_type,
+            "source": "calendar",
+            "severity": 0.9,
+            "confidence": 1.0,
+            "extra_data": {}
+        }
+        for signal_type in (SignalType.MEETING_OVERLOAD, SignalType.EMAIL_PATTERN)
+    ])
+    assert len(signals) == 2
+    assert all(signal.id is not None for signal in signals)
+
+    nudges = await create_nudges_bulk(db, [
+        {
+            "user_id": user.id,
+            "signal_id": signal.id,
+            "type": signal.type.value,
+            "title": "Heads up",
+            "message": "Test nudge message",
+            "priority": "medium"
+        }
+        for signal in signals
+    ])
+    await db.commit()
+    assert [nudge.signal_id for nudge in nudges] == [signal.id for signal in signals]
+
+    stored = await get_user_signals(db, user_id=user.id)
+    assert {signal.id for signal in stored} == {signal.id for signal in signals}
+    assert len(await get_user_nudges(db, user_id=user.id)) == 2
+
+@pytest.mark.asyncio
+async def test_signal_keyset_pagination(db: AsyncSession):
+    user_in = UserCreate(
+        email="pages@example.com",
+        password="testpass123",
+        full_name="Pages User",
+        role=UserRole.EMPLOYEE
+    )
+    user = await create_user(db, obj_in=user_in)
+    now = datetime.utcnow()
+    await create_signals_bulk(db, [
+        {
+            "user_id": user.id,
+            "type": SignalType.SLACK_ACTIVITY,
+            "source": "slack",
+            "severity": 0.5,
+            "confidence": 1.0,
+            "extra_data": {},
+            # Two rows share a timestamp so the id tie-breaker is exercised
+            "created_at": now - timedelta(minutes=i // 2)
+        }
+        for i in range(5)
+    ])
+    await db.commit()
+
+    expected = await get_user_signals(db, user_id=user.id)
+    pages, cursor = [], None
+    while True:
+        page = await get_user_signals(db, user_id=user.id, limit=2, cursor=cursor)
+        pages.extend(page)
+        token = next_cursor(page, 2)
+        if token is None:
+            break
+        cursor = decode_cursor(token)
+
+    assert [signal.id for signal in pages] == [signal.id for signal in expected]
+
+
+@pytest.mark.asyncio
+async def test_nudge_updates_enforce_ownership(db: AsyncSession):
+    user_in = UserCreate(
+        email="owner@example.com",
+        password="testpass123",
+        full_name="Owner User",
+        role=UserRole.EMPLOYEE
+    )
+    user = await create_user(db, obj_in=user_in)
+    signals = await create_signals_bulk(db, [{
+        "user_id": user.id,
+        "type": SignalType.MEETING_OVERLOAD,
+        "source": "calendar",
+        "severity": 0.9,
+        "confidence": 1.0,
+        "extra_data": {}
+    }])
+    nudges = await create_nudges_bulk(db, [
+        {
+            "user_id": user.id,
+            "signal_id": signals[0].id,
+            "type": "meeting_overload",
+            "title": "Heads up",
+            "message": "Test nudge message",
+            "priority": "high"
+        }
+        for _ in range(3)
+    ])
+    await db.commit()
+    stranger = uuid4()
+
+    assert await mark_nudge_as_read(db, nudge_id=nudges[0].id, user_id=stranger) is None
+    read = await mark_nudge_as_read(db, nudge_id=nudges[0].id, user_id=user.id)
+    assert read.is_read is True
+
+    assert await mark_all_nudges_as_read(db, user_id=user.id) == 2
+    assert await get_user_nudges(db, user_id=user.id, is_read=False) == []
+
+    assert await delete_nudge(db, nudge_id=nudges[0].id, user_id=stranger) is None
+    assert await delete_nudge(db, nudge_id=nudges[0].id, user_id=user.id) == nudges[0].id
+
+    # Deleting the signal takes its remaining nudges with it
+    assert await delete_signal(db, signal_id=signals[0].id, user_id=stranger) is None
+    assert await delete_signal(db, signal_id=signals[0].id, user_id=user.id) == signals[0].id
+    assert await get_user_nudges(db, user_id=user.id) == []
+
+
+@pytest.mark.asyncio
+async def test_verify_token_uses_user_cache(db: AsyncSession):
+    user_in = UserCreate(
+        email="cached@example.com",
+        password="testpass123",
+        full_name="Cached User",
+        role=UserRole.EMPLOYEE
+    )
+    user = await create_user(db, obj_in=user_in)
+    token = create_access_token({"sub": user.email})
+    user_cache.clear()
+    hits = user_cache.hits
+
+    first = await verify_token(token=token, db=db)
+    second = await verify_token(token=token, db=db)
+    assert second is first
+    assert user_cache.hits == hits + 1
+
+    # A role change through the CRUD layer is visible on the next request
+    await update_user(db, db_obj=user, obj_in={"role": UserRole.MANAGER})
+    refreshed = await verify_token(token=token, db=db)
+    assert refreshed.role == UserRole.MANAGER
+
+
+@pytest.mark.asyncio
+async def test_authenticate_rehashes_outdated_hash(db: AsyncSession):
+    user_in = UserCreate(
+        email="rehash@example.com",
+        password="testpass123",
+        full_name="Rehash User",
+        role=UserRole.EMPLOYEE
+    )
+    user = await create_user(db, obj_in=user_in)
+    weak_hash = pwd_context.hash("testpass123", rounds=4)
+    await update_user(db, db_obj=user, obj_in={"hashed_password": weak_hash})
+
+    assert await authenticate(db, email=user.email, password="wrong") is None
+    authenticated = await authenticate(db, email=user.email, password="testpass123")
+    assert authenticated.id == user.id
+    assert authenticated.hashed_password != weak_hash
+    assert not pwd_context.needs_update(authenticated.hashed_password)
+
+@pytest.mark.asyncio
+async def test_password_hasher_rejects_when_full():
+    hasher = PasswordHasher(pwd_context, workers=1, max_pending=0)
+    with pytest.raises(PasswordHasherBusy):
+        await hasher.hash("testpass123")
+    assert hasher.rejected == 1
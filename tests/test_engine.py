@@ -0,0 +1,148 @@
+import os
+import random
+from datetime import datetime, timedelta
+import pytest
+from app.db import base  # noqa: F401
+from app.core.signals import engine as signal_engine
+from app.core.signals.engine import SignalEngine
+from app.core.signals.plan import compile_rules, load_plan
+from app.core.signals.window import ActivityEvent, ActivityKind, ActivityState
+from app.models.signal import SignalType
+from app.core.signals.batch import (
+    CALENDAR_COLUMNS,
+    SLACK_COLUMNS,
+    GMAIL_COLUMNS,
+    columns_from_metadata
+)
+
+def _random_metadata(rng: random.Random, size: int):
+    calendar, slack, gmail = [], [], []
+    for _ in range(size):
+        calendar.append(rng.choice([None, {}, {
+            "total_meetings": rng.randint(0, 30),
+            "total_duration_hours": rng.uniform(0, 40),
+            "after_hours_meetings": rng.randint(0, 6)
+        }]))
+        slack.append(rng.choice([None, {
+            "channel_count": rng.randint(0, 25),
+            "reaction_count": rng.randint(0, 120),
+            "last_active": rng.choice([None, f"2025-05-20T{rng.randint(0, 23):02d}:15:00"])
+        }]))
+        gmail.append(rng.choice([None, {
+            "total_messages": rng.randint(0, 250),
+            "thread_count": rng.randint(0, 60)
+        }]))
+    return calendar, slack, gmail
+
+@pytest.mark.asyncio
+async def test_process_batch_matches_per_user_path():
+    engine = SignalEngine()
+    rng = random.Random(7)
+    calendar, slack, gmail = _random_metadata(rng, 500)
+    user_ids = list(range(500))
+
+    result = engine.process_batch(
+        user_ids,
+        calendar=columns_from_metadata(calendar, CALENDAR_COLUMNS),
+        slack=columns_from_metadata(slack, SLACK_COLUMNS),
+        gmail=columns_from_metadata(gmail, GMAIL_COLUMNS)
+    )
+
+    for index in user_ids:
+        expected = await engine.process_metadata(
+            user=None,
+            slack_metadata=slack[index],
+            calendar_metadata=calendar[index],
+            gmail_metadata=gmail[index]
+        )
+        batch_signals = result.signals(index)
+        assert [s.type for s in batch_signals] == [s.type for s in expected]
+        for got, want in zip(batch_signals, expected):
+            assert got.severity == want.severity
+            assert got.source == want.source
+            assert got.extra_data == want.extra_data
+
+def test_process_batch_without_sources_emits_nothing():
+    engine = SignalEngine()
+    result = engine.process_batch(["a", "b"])
+    assert len(result) == 2
+    assert result.for_user(0) == {}
+    assert result.signals(1) == []
+
+def test_rules_hot_reload(tmp_path, monkeypatch):
+    rules_path = tmp_path / "rules.yaml"
+    rules_path.write_text("meeting_overload:\n  threshold: 12\n")
+    engine = SignalEngine(rules_path=rules_path, reload_interval=0)
+    assert engine.plan.meeting_overload.meeting_threshold == 12
+
+    rules_path.write_text(
+        "meeting_overload:\n  threshold: 5\n  weight:\n    meeting_count: 1.0\n    duration: 0.0\n"
+    )
+    os.utime(rules_path, (engine.plan.version + 10, engine.plan.version + 10))
+    assert engine.plan.meeting_overload.meeting_threshold == 5
+    assert engine.plan.meeting_overload.meeting_weight == 1.0
+
+    # A broken file keeps the last good plan and is parsed once, not on every check
+    loads = []
+    monkeypatch.setattr(signal_engine, "load_plan", lambda path: loads.append(path) or load_plan(path))
+    broken = engine.plan.version + 10
+    rules_path.write_text("meeting_overload: [")
+    os.utime(rules_path, (broken, broken))
+    for _ in range(3):
+        assert engine.plan.meeting_overload.meeting_threshold == 5
+    assert len(loads) == 1
+
+    # Fixing it moves the mtime again, so it is picked up
+    rules_path.write_text("meeting_overload:\n  threshold: 7\n")
+    os.utime(rules_path, (broken + 10, broken + 10))
+    assert engine.plan.meeting_overload.meeting_threshold == 7
+    assert len(loads) == 2
+
+def test_compile_rules_uses_yaml_weights():
+    plan = compile_rules({"slack_activity": {"weight": {"channels": 1.0, "reactions": 0.0}}})
+    assert plan.slack_activity.channel_weight == 1.0
+    assert plan.slack_activity.reaction_weight == 0.0
+    assert plan.email_pattern.message_threshold == 100
+
+def test_activity_window_expires_old_buckets():
+    state = ActivityState(window_days=7)
+    start = datetime(2025, 5, 1, 9)
+    state.apply(ActivityEvent(ActivityKind.MEETING, start, duration_hours=2), now=start)
+    state.apply(ActivityEvent(ActivityKind.MEETING, start + timedelta(days=3, hours=10), duration_hours=1), now=start)
+    state.apply(ActivityEvent(ActivityKind.EMAIL, start, thread_id="t1"), now=start)
+    state.apply(ActivityEvent(ActivityKind.EMAIL, start + timedelta(days=2), thread_id="t1"), now=start)
+
+    now = start + timedelta(days=3, hours=12)
+    _, calendar, gmail = state.to_metadata(now)
+    assert calendar["total_meetings"] == 2
+    assert calendar["total_duration_hours"] == 3
+    assert calendar["after_hours_meetings"] == 1
+    assert gmail == {"total_messages": 2, "thread_count": 1}
+
+    # Day one falls out of the window
+    now = start + timedelta(days=7)
+    slack, calendar, gmail = state.to_metadata(now)
+    assert slack is None
+    assert calendar["total_meetings"] == 1
+    assert gmail == {"total_messages": 1, "thread_count": 1}
+
+    assert not state.apply(ActivityEvent(ActivityKind.EMAIL, start), now=now)
+
+@pytest.mark.asyncio
+async def test_process_state_matches_process_metadata():
+    engine = SignalEngine()
+    now = datetime(2025, 5, 8, 12)
+    state = ActivityState()
+    for day in range(5):
+        for hour in (9, 11, 14, 19):
+            state.apply(ActivityEvent(ActivityKind.MEETING, now - timedelta(days=day, hours=12 - hour), duration_hours=1.5), now=now)
+    state.apply(ActivityEvent(ActivityKind.SLACK_CHANNELS, now, count=12), now=now)
+    state.apply(ActivityEvent(ActivityKind.SLACK_ACTIVITY, now.replace(hour=22) - timedelta(days=1), count=30), now=now)
+
+    slack, calendar, gmail = state.to_metadata(now)
+    expected = await engine.process_metadata(None, slack_metadata=slack, calendar_metadata=calendar, gmail_metadata=gmail)
+    signals = await engine.process_state(None, state, now=now)
+    assert [(s.type, s.severity) for s in signals] == [(s.type, s.severity) for s in expected]
+    assert {s.type for s in signals} == {
+        SignalType.MEETING_OVERLOAD, SignalType.AFTER_HOURS_ACTIVITY, SignalType.SLACK_ACTIVITY
+    }
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.core.config import settings
+from app.core.oauth import google, slack
+from app.core.oauth.google_clients import GoogleServiceFactory
+from app.core.oauth.rate_limit import RateLimiter
+from app.core.oauth.slack import SlackOAuth
+from benchmarks.fake_providers import FakeProviders
+
+@pytest.fixture
+def fake(monkeypatch):
+    fake = FakeProviders(latency=0, page_size=10)
+    base_url = fake.start()
+    for name, value in FakeProviders.settings(base_url).items():
+        monkeypatch.setattr(settings, name, value)
+    monkeypatch.setattr(google, "google_services", GoogleServiceFactory(base_url=base_url))
+    monkeypatch.setattr(slack, "slack_rate_limiter", RateLimiter({}, default_rate=60000))
+    yield fake
+    fake.stop()
+
+@pytest.mark.asyncio
+async def test_slack_client_pages_through_fake_and_retries_429(fake):
+    fake.rate_limit_rate = 0.3
+    fake.retry_after = 0
+    metadata = await SlackOAuth().get_user_metadata("xoxp-fake", "U1")
+    assert metadata["channel_count"] > 10  # More than one page
+    assert 0 < metadata["reaction_count"] < fake.reactions * 3
+    datetime.fromisoformat(metadata["last_active"])
+    assert fake.stats()["slack"][429] > 0
+
+def test_expired_google_credentials_refresh_against_configured_token_uri(fake):
+    credentials = {
+        "token": "ya29.expired",
+        "refresh_token": "refresh-fake",
+        "client_id": "client",
+        "client_secret": "secret",
+        "token_uri": settings.GOOGLE_TOKEN_URI,
+        "expiry": "2000-01-01T00:00:00Z"
+    }
+    now = datetime.now(timezone.utc)
+    items, sync_token, calls, _ = google._calendar_changes(
+        credentials, None, now - timedelta(days=7), now + timedelta(days=7)
+    )
+    assert calls == len(items) // 10 + 1 and sync_token
+    assert google.calendar_metrics(google.apply_calendar_changes({}, items), now)["total_meetings"] == len(items)
+
+    # Incremental sync with the returned token
+    assert google._calendar_changes(credentials, sync_token, now, now)[0] == []
+    assert fake.stats()["google_token"] == {200: 1}
@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import base  # noqa: F401
+from app.core.config import settings
+from app.core.oauth.slack import slack_token_data
+from app.core.signals import fetch
+from app.crud.integration import get_user_tokens, store_oauth_tokens
+from app.crud.user import create_user
+from app.schemas.user import UserCreate
+from app.models.user import UserRole
+from tests.conftest import TestingSessionLocal
+
+@pytest.mark.asyncio
+async def test_store_oauth_tokens_keeps_refresh_token(db: AsyncSession):
+    user = await create_user(db, obj_in=UserCreate(
+        email="tokens@example.com",
+        password="testpass123",
+        full_name="Token User",
+        role=UserRole.EMPLOYEE
+    ))
+    await store_oauth_tokens(db, user.id, "google", {
+        "access_token": "a1", "refresh_token": "r1", "expires_in": 3600,
+        "scope": "calendar gmail", "client_secret": "never stored", "id_token": "jwt"
+    })
+    # A later grant without a refresh token keeps the stored one
+    await store_oauth_tokens(db, user.id, "google", {"access_token": "a2", "expires_in": 3600, "token_type": "Bearer"})
+    await store_oauth_tokens(db, user.id, "slack", {
+        "access_token": "xoxp", "team_id": "T1", "user_id": "U1", "authed_user": {"access_token": "secret"}
+    })
+
+    tokens = await get_user_tokens(db, user.id)
+    assert tokens["google"].access_token == "a2"
+    assert tokens["google"].refresh_token == "r1"
+    assert tokens["google"].expires_at is not None
+    assert tokens["google"].extra == {"token_type": "Bearer"}
+    assert tokens["slack"].extra == {"team_id": "T1", "user_id": "U1"}
+
+    credentials = fetch.google_credentials(tokens["google"])
+    assert credentials["token"] == "a2"
+    assert credentials["refresh_token"] == "r1"
+    assert credentials["expiry"].endswith("Z")
+
+@pytest.mark.asyncio
+async def test_store_oauth_tokens_flattens_slack_grant(db: AsyncSession):
+    user = await create_user(db, obj_in=UserCreate(
+        email="slackgrant@example.com",
+        password="testpass123",
+        full_name="Slack Grant",
+        role=UserRole.EMPLOYEE
+    ))
+    # oauth.v2.access as the generic integrations callback receives it
+    await store_oauth_tokens(db, user.id, "slack", slack_token_data({
+        "ok": True, "access_token": "xoxb-bot", "token_type": "bot", "scope": "chat:write",
+        "team": {"id": "T1", "name": "Team"},
+        "authed_user": {"id": "U1", "access_token": "xoxp-user", "scope": "users:read", "token_type": "user"}
+    }))
+
+    tokens = await get_user_tokens(db, user.id)
+    assert tokens["slack"].access_token == "xoxp-user"
+    assert tokens["slack"].extra == {"team_id": "T1", "user_id": "U1"}
+
+@pytest.mark.asyncio
+async def test_fetch_runs_providers_concurrently_with_partial_results(db: AsyncSession, monkeypatch):
+    user = await create_user(db, obj_in=UserCreate(
+        email="fetch@example.com",
+        password="testpass123",
+        full_name="Fetch User",
+        role=UserRole.EMPLOYEE
+    ))
+    await store_oauth_tokens(db, user.id, "slack", {"access_token": "xoxp", "user_id": "U1"})
+    await store_oauth_tokens(db, user.id, "google", {"access_token": "ya29", "refresh_token": "r"})
+
+    async def slack_metadata(access_token, slack_user_id, team_id=None):
+        await asyncio.sleep(0.2)
+        return {"channel_count": 3, "reaction_count": 1, "last_active": None}
+
+    async def calendar_metadata(db, user_id, credentials):
+        await asyncio.sleep(0.2)
+        raise RuntimeError("calendar is down")
+
+    async def gmail_metadata(db, user_id, credentials):
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(fetch.slack_oauth, "get_user_metadata", slack_metadata)
+    monkeypatch.setattr(fetch.google_oauth, "sync_calendar_metadata", calendar_metadata)
+    monkeypatch.setattr(fetch.google_oauth, "sync_gmail_metadata", gmail_metadata)
+    monkeypatch.setattr(settings, "GMAIL_FETCH_TIMEOUT_SECONDS", 0.3)
+
+    tokens = await get_user_tokens(db, user.id)
+    result = await fetch.fetch_user_metadata(user, tokens, session_factory=TestingSessionLocal)
+
+    assert result.slack == {"channel_count": 3, "reaction_count": 1, "last_active": None}
+    assert result.calendar is None and result.gmail is None
+    statuses = {provider: outcome.status for provider, outcome in result.providers.items()}
+    assert statuses == {"slack": "ok", "calendar": "error", "gmail": "timeout"}
+    # Bounded by the slowest provider's timeout, not the sum of the three
+    assert result.elapsed_ms < 450
+    assert fetch.fetch_stats.stats()["gmail"]["outcomes"]["timeout"] >= 1
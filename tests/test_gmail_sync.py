@@ -0,0 +1,76 @@
+import time
+from datetime import datetime, timezone
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import base  # noqa: F401
+from app.core.config import settings
+from app.core.oauth import google
+from app.core.oauth.google import GoogleOAuth
+from app.core.oauth.google_clients import GoogleServiceFactory
+from app.crud.user import create_user
+from app.models.integration import GmailDailyCount
+from app.schemas.user import UserCreate
+from app.models.user import UserRole
+from benchmarks.fake_gmail import FakeGmail
+
+DAY_MS = 24 * 3600 * 1000
+CREDENTIALS = {
+    "token": "token",
+    "refresh_token": "gmail-sync",
+    "client_id": "client",
+    "client_secret": "secret",
+    "expiry": "2999-01-01T00:00:00Z"
+}
+
+@pytest.mark.asyncio
+async def test_gmail_sync_uses_history_and_daily_counters(db: AsyncSession, monkeypatch):
+    user = await create_user(db, obj_in=UserCreate(
+        email="gmail-sync@example.com",
+        password="testpass123",
+        full_name="Gmail User",
+        role=UserRole.EMPLOYEE
+    ))
+    fake = FakeGmail(messages=20, threads=8, latency=0)
+    now_ms = int(time.time() * 1000)
+    # Two messages three days ago, one outside the 7-day window
+    fake.internal_dates["m000018"] = fake.internal_dates["m000019"] = now_ms - 3 * DAY_MS
+    fake.internal_dates["m000017"] = now_ms - 10 * DAY_MS
+    monkeypatch.setattr(google, "google_services", GoogleServiceFactory(base_url=fake.start()))
+    oauth = GoogleOAuth()
+    try:
+        metadata = await oauth.sync_gmail_metadata(db, user.id, CREDENTIALS, full_sync=True)
+        assert metadata["sync"] == "full"
+        assert metadata["total_messages"] == 19
+        assert metadata["thread_count"] == 8
+
+        # Within the sync interval the counters are served without calling Google
+        requests = fake.requests
+        metadata = await oauth.sync_gmail_metadata(db, user.id, CREDENTIALS)
+        assert metadata["sync"] == "cached"
+        assert metadata["total_messages"] == 19
+        assert fake.requests == requests
+
+        monkeypatch.setattr(settings, "GMAIL_SYNC_INTERVAL_SECONDS", 0)
+        fake.add_message(thread_id="t000001")
+        fake.add_message(thread_id="t-new")
+        fake.delete_message("m000018")
+        metadata = await oauth.sync_gmail_metadata(db, user.id, CREDENTIALS)
+        assert metadata["sync"] == "incremental"
+        assert metadata["messages_changed"] == 3
+        assert metadata["total_messages"] == 20
+        assert metadata["thread_count"] == 9
+
+        result = await db.execute(select(GmailDailyCount).filter(GmailDailyCount.user_id == user.id))
+        days = {row.day: row for row in result.scalars()}
+        three_days_ago = datetime.fromtimestamp((now_ms - 3 * DAY_MS) / 1000, timezone.utc).date()
+        assert days[three_days_ago].messages == 1
+        assert sum(row.messages for row in days.values()) == 20
+
+        # An expired history checkpoint falls back to a full sync
+        fake.oldest_history_id = fake.history_id + 1
+        metadata = await oauth.sync_gmail_metadata(db, user.id, CREDENTIALS)
+        assert metadata["sync"] == "full"
+        assert metadata["total_messages"] == 20
+    finally:
+        fake.stop()
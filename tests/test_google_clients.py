@@ -0,0 +1,49 @@
+from app.core.oauth.google_clients import GoogleServiceFactory
+
+def _credentials(refresh_token: str, access_token: str = "access"):
+    return {
+        "token": access_token,
+        "refresh_token": refresh_token,
+        "token_uri": "https://oauth2.googleapis.com/token",
+        "client_id": "client",
+        "client_secret": "secret"
+    }
+
+def test_services_are_reused_per_credential_set():
+    factory = GoogleServiceFactory(maxsize=2)
+
+    gmail = factory.service("gmail", "v1", _credentials("alice"))
+    # A refreshed access token for the same grant reuses the service
+    assert factory.service("gmail", "v1", _credentials("alice", "refreshed")) is gmail
+    assert factory.service("gmail", "v1", _credentials("bob")) is not gmail
+    factory.service("calendar", "v3", _credentials("alice"))
+
+    stats = factory.stats()
+    assert stats["builds"] == 3
+    assert stats["builds_saved"] == 1
+    assert stats["discovery_loads"] == 2
+    assert stats["evictions"] == 1
+    assert stats["services"] == 2
+
+def test_batch_get_follows_pages_and_retries():
+    from app.core.oauth.google import GMAIL_MESSAGE_FIELDS, _batch_get_messages, _list_messages
+    from benchmarks.fake_gmail import FakeGmail
+
+    fake = FakeGmail(messages=620, latency=0, fail_every=10)
+    base_url = fake.start()
+    try:
+        credentials = dict(_credentials("fake"), expiry="2999-01-01T00:00:00Z")
+        service = GoogleServiceFactory(base_url=base_url).service("gmail", "v1", credentials)
+
+        listed = _list_messages(service, "after:0")
+        assert len(listed) == 620
+
+        ids = [message["id"] for message in listed[:120]]
+        messages, failed = _batch_get_messages(service, ids, format="minimal", fields=GMAIL_MESSAGE_FIELDS)
+        # Every 10th message 503s once and succeeds on the retry batch
+        assert [message["id"] for message in messages] == ids
+        assert failed == 0
+        # 2 list pages, 3 batches, 1 retry batch
+        assert fake.requests == 6
+    finally:
+        fake.stop()
@@ -0,0 +1,38 @@
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app.core.http_pool import HTTPPool
+
+async def _ping(request: web.Request) -> web.Response:
+    return web.json_response({"ok": True})
+
+@pytest.mark.asyncio
+async def test_pooled_clients_reuse_connections():
+    app = web.Application()
+    app.router.add_get("/ping", _ping)
+    server = TestServer(app)
+    await server.start_server()
+    pool = HTTPPool()
+    url = str(server.make_url("/ping"))
+    try:
+        # Before the lifespan opens the pool, callers get one-off clients
+        async with pool.client("test") as client:
+            assert (await client.get(url)).json() == {"ok": True}
+        assert pool.session("test") is None
+        assert pool.stats()["fallbacks"] == {"test": 2}
+
+        await pool.start()
+        for _ in range(3):
+            async with pool.client("test") as client:
+                assert (await client.get(url)).status_code == 200
+            async with pool.session("test").get(url) as response:
+                assert response.status == 200
+
+        stats = pool.stats()
+        assert stats["requests"] == {"test": 6}
+        assert stats["httpx"]["connections"] == 1
+        assert stats["aiohttp"]["idle"] == 1 and stats["aiohttp"]["in_use"] == 0
+    finally:
+        await pool.close()
+        await server.close()
+    assert pool.stats()["open"] is False
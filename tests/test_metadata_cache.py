@@ -0,0 +1,64 @@
+import asyncio
+import pytest
+from app.core.metadata_cache import MetadataCache, MemoryBackend, RedisBackend
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_fetch():
+    cache = MetadataCache(MemoryBackend(maxsize=10), ttls={"slack": 60})
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.1)
+        return {"channel_count": 3}
+
+    results = await asyncio.gather(*(cache.get_or_fetch("slack", 1, fetch) for _ in range(5)))
+    assert calls == 1
+    assert [value for value, _ in results] == [{"channel_count": 3}] * 5
+    assert sorted(outcome for _, outcome in results) == ["coalesced"] * 4 + ["miss"]
+
+    value, outcome = await cache.get_or_fetch("slack", 1, fetch)
+    assert (value, outcome, calls) == ({"channel_count": 3}, "hit", 1)
+    assert cache.stats()["hit_ratio"] == 5 / 6
+
+    await cache.invalidate(1, "slack")
+    assert (await cache.get_or_fetch("slack", 1, fetch))[1] == "miss"
+    assert calls == 2
+
+@pytest.mark.asyncio
+async def test_failures_are_not_cached_and_entries_expire():
+    cache = MetadataCache(MemoryBackend(maxsize=10), ttls={"gmail": 0.1})
+    results = iter([None, {"total_messages": 1}, {"total_messages": 2}])
+
+    async def fetch():
+        return next(results)
+
+    assert await cache.get_or_fetch("gmail", 1, fetch) == (None, "miss")
+    assert await cache.get_or_fetch("gmail", 1, fetch) == ({"total_messages": 1}, "miss")
+    assert await cache.get_or_fetch("gmail", 1, fetch) == ({"total_messages": 1}, "hit")
+    await asyncio.sleep(0.15)
+    assert await cache.get_or_fetch("gmail", 1, fetch) == ({"total_messages": 2}, "miss")
+
+@pytest.mark.asyncio
+async def test_updates_change_cached_values_without_extending_them():
+    cache = MetadataCache(MemoryBackend(maxsize=10), ttls={"slack": 0.1})
+    bump = lambda value: {**value, "reaction_count": value["reaction_count"] + 1}
+    assert not await cache.update("slack", 1, bump)
+
+    await cache.put("slack", 1, {"reaction_count": 1})
+    assert await cache.update("slack", 1, bump)
+    assert await cache.get_or_fetch("slack", 1, None) == ({"reaction_count": 2}, "hit")
+    await asyncio.sleep(0.15)
+    assert not await cache.update("slack", 1, bump)
+
+def test_redis_backend_keeps_a_client_per_event_loop():
+    backend = RedisBackend("localhost", 6379)
+
+    async def clients():
+        return backend._redis, backend._redis
+
+    first, again = asyncio.run(clients())
+    second, _ = asyncio.run(clients())
+    assert first is again
+    assert second is not first
@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.crud.user import create_user
+from app.crud.signal import create_signals_bulk
+from app.db.partitions import ensure_partitions, drop_expired_partitions, list_partitions, maintain_partitions
+from app.schemas.user import UserCreate
+from app.models.user import UserRole
+from app.models.signal import SignalType
+
+async def _signal_at(db: AsyncSession, user_id, created_at: datetime) -> str:
+    signals = await create_signals_bulk(db, [{
+        "user_id": user_id,
+        "type": SignalType.MEETING_OVERLOAD,
+        "source": "calendar",
+        "severity": 0.8,
+        "confidence": 1.0,
+        "extra_data": {},
+        "created_at": created_at,
+        "updated_at": created_at
+    }])
+    await db.commit()
+    result = await db.execute(
+        text("SELECT tableoid::regclass::text FROM signals WHERE id = :id"), {"id": signals[0].id}
+    )
+    partition = result.scalar_one()
+    await db.commit()  # Release the lock before DDL runs on another connection
+    return partition
+
+@pytest.mark.asyncio
+async def test_partition_lifecycle(db: AsyncSession, db_engine):
+    user = await create_user(db, obj_in=UserCreate(
+        email="partitions@example.com",
+        password="testpass123",
+        full_name="Partition User",
+        role=UserRole.EMPLOYEE
+    ))
+
+    # Without a monthly partition rows land in the default partition
+    assert await _signal_at(db, user.id, datetime(2020, 4, 5)) == "signals_default"
+
+    async with db_engine.begin() as conn:
+        created = await conn.run_sync(
+            lambda sync_conn: ensure_partitions(sync_conn, now=datetime(2020, 4, 15), months_ahead=0)
+        )
+    assert created == ["signals_p2020_04", "nudges_p2020_04"]
+
+    # The stray row was moved out of the default partition
+    result = await db.execute(text("SELECT count(*) FROM signals_default WHERE created_at < '2020-05-01'"))
+    assert result.scalar_one() == 0
+    await db.commit()
+    assert await _signal_at(db, user.id, datetime(2020, 4, 20)) == "signals_p2020_04"
+
+    async with db_engine.begin() as conn:
+        dropped = await conn.run_sync(
+            lambda sync_conn: drop_expired_partitions(sync_conn, retention_days=90, now=datetime(2020, 8, 15))
+        )
+        partitions = await conn.run_sync(lambda sync_conn: list_partitions(sync_conn, "signals"))
+    assert dropped == ["signals_p2020_04", "nudges_p2020_04"]
+    assert "signals_p2020_04" not in partitions
+    assert "signals_default" in partitions
+
+@pytest.mark.asyncio
+async def test_concurrent_boots_take_turns_creating_partitions(db_engine, monkeypatch):
+    # Each worker's lifespan runs this at once; the advisory lock keeps them off each other's DDL
+    monkeypatch.setattr(settings, "PARTITION_MONTHS_AHEAD", 6)
+    results = await asyncio.gather(*(maintain_partitions(db_engine, drop_expired=False) for _ in range(4)))
+    assert all(dropped == [] for _, dropped in results)
+    assert any(created for created, _ in results)
+    assert sum(len(created) for created, _ in results) == len({name for created, _ in results for name in created})
@@ -0,0 +1,137 @@
+import asyncio
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app.core.config import settings
+from app.core.metadata_cache import MetadataCache, MemoryBackend
+from app.core.oauth import slack
+from app.core.oauth.rate_limit import RateLimiter
+from app.core.oauth.resilience import BulkheadFullError, CircuitOpenError, ProviderGuard
+from app.core.oauth.slack import SlackOAuth
+from app.core.signals import fetch
+
+def _guard(**overrides) -> ProviderGuard:
+    options = dict(
+        max_concurrency=2, latency_slo_ms=100, failure_threshold=3, reset_seconds=0.1, max_wait=0.05
+    )
+    return ProviderGuard("test", **{**options, **overrides})
+
+@pytest.mark.asyncio
+async def test_circuit_opens_fails_fast_and_closes_after_probe():
+    guard = _guard()
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        raise RuntimeError("provider down")
+
+    async def slow():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.15)
+        return {"ok": True}
+
+    async def healthy():
+        nonlocal calls
+        calls += 1
+        return {"ok": True}
+
+    for fetch_once in (failing, failing):
+        with pytest.raises(RuntimeError):
+            await guard.call(fetch_once)
+    # Successful but slower than the SLO counts as the third failure
+    assert await guard.call(slow) == {"ok": True}
+    assert guard.stats()["state"] == "open"
+
+    with pytest.raises(CircuitOpenError):
+        await guard.call(healthy)
+    assert calls == 3 and guard.stats()["rejected_open"] == 1
+
+    await asyncio.sleep(0.1)
+    # One half-open probe at a time; its success closes the circuit
+    probe = asyncio.create_task(guard.call(slow))
+    await asyncio.sleep(0)
+    with pytest.raises(CircuitOpenError):
+        await guard.call(healthy)
+    await probe
+    assert guard.stats()["state"] == "open"  # The probe breached the SLO
+
+    await asyncio.sleep(0.1)
+    assert await guard.call(healthy) == {"ok": True}
+    stats = guard.stats()
+    assert stats["state"] == "closed" and stats["times_opened"] == 2 and stats["slow_calls"] == 2
+
+@pytest.mark.asyncio
+async def test_bulkhead_limits_calls_in_flight():
+    guard = _guard(latency_slo_ms=1000)
+    release = asyncio.Event()
+
+    async def held():
+        await release.wait()
+        return {"ok": True}
+
+    running = [asyncio.create_task(guard.call(held)) for _ in range(2)]
+    await asyncio.sleep(0)
+    with pytest.raises(BulkheadFullError):
+        await guard.call(held)
+    release.set()
+    assert await asyncio.gather(*running) == [{"ok": True}] * 2
+    assert guard.stats()["rejected_full"] == 1 and guard.stats()["in_flight"] == 0
+    # Rejections are not the provider's fault and leave the circuit alone
+    assert guard.stats()["state"] == "closed" and guard.stats()["failures"] == 0
+
+@pytest.mark.asyncio
+async def test_open_circuit_serves_last_good_value(monkeypatch):
+    cache = MetadataCache(MemoryBackend(maxsize=10), ttls={"slack": 0.05}, stale_ttl=60)
+    guard = _guard(failure_threshold=1, reset_seconds=60)
+    monkeypatch.setattr(fetch, "metadata_cache", cache)
+    monkeypatch.setitem(fetch.provider_guards, "slack", guard)
+
+    async def healthy():
+        return {"channel_count": 3}
+
+    async def failing():
+        raise RuntimeError("provider down")
+
+    assert (await fetch._timed("slack", 1, healthy, 1.0))[1].status == "ok"
+    await asyncio.sleep(0.06)  # Fresh entry expires
+    assert (await fetch._timed("slack", 1, failing, 1.0))[1].status == "error"
+
+    metadata, outcome = await fetch._timed("slack", 1, healthy, 1.0)
+    assert metadata == {"channel_count": 3}
+    assert outcome.status == "stale" and outcome.cache == "stale"
+    assert (await fetch._timed("slack", 2, healthy, 1.0))[1].status == "unavailable"
+
+@pytest.mark.asyncio
+async def test_invalid_user_tokens_do_not_open_the_circuit(monkeypatch):
+    async def handle(request: web.Request) -> web.Response:
+        if request.headers.get("Authorization") == "Bearer xoxp-down":
+            return web.json_response({"ok": False, "error": "internal_error"}, status=503)
+        return web.json_response({"ok": False, "error": "invalid_auth"})
+
+    app = web.Application()
+    app.router.add_route("*", "/api/{method}", handle)
+    server = TestServer(app)
+    await server.start_server()
+    monkeypatch.setattr(settings, "SLACK_API_BASE_URL", str(server.make_url("/api/")))
+    monkeypatch.setattr(slack, "slack_rate_limiter", RateLimiter({}, default_rate=60000))
+    monkeypatch.setattr(fetch, "metadata_cache", MetadataCache(MemoryBackend(maxsize=100), ttls={}, stale_ttl=60))
+    guard = _guard(latency_slo_ms=5000, reset_seconds=60)
+    monkeypatch.setitem(fetch.provider_guards, "slack", guard)
+    client = SlackOAuth()
+    try:
+        # Many users in a row with revoked tokens: their own fetches fail, the provider stays available
+        for user_id in range(10):
+            _, outcome = await fetch._timed(
+                "slack", user_id, lambda: client.get_user_metadata("xoxp-revoked", "U1"), 5.0
+            )
+            assert outcome.status == "error" and "invalid_auth" in outcome.error
+        assert guard.stats()["state"] == "closed" and guard.stats()["failures"] == 0
+
+        # Slack itself failing still opens the circuit
+        for user_id in range(10, 13):
+            await fetch._timed("slack", user_id, lambda: client.get_user_metadata("xoxp-down", "U1"), 5.0)
+        assert guard.stats()["state"] == "open"
+    finally:
+        await server.close()
@@ -0,0 +1,116 @@
+import time
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app.core.config import settings
+from app.core.oauth import slack
+from app.core.oauth.rate_limit import RateLimiter
+from app.core.oauth.slack import SlackOAuth
+
+def _fake_slack(calls):
+    async def handle(request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = {**request.query, **(await request.post())}
+        calls.append((method, params.get("cursor")))
+        if method == "users.getPresence":
+            return web.json_response({"ok": True, "presence": "active", "last_activity": 1700000000})
+        if method == "users.conversations":
+            page = int(params.get("cursor") or 0)
+            body = {"ok": True, "channels": [{"id": f"C{page}{i}"} for i in range(3)]}
+            if page < 2:
+                body["response_metadata"] = {"next_cursor": str(page + 1)}
+            return web.json_response(body)
+        if method == "reactions.list":
+            if not params.get("cursor") and calls.count(("reactions.list", None)) == 1:
+                return web.json_response({"ok": False, "error": "ratelimited"}, status=429, headers={"Retry-After": "0"})
+            if not params.get("cursor"):
+                items = [{"type": "message", "message": {"ts": "9999999999.0001"}} for _ in range(4)]
+                return web.json_response({"ok": True, "items": items, "response_metadata": {"next_cursor": "old"}})
+            if params.get("cursor") == "old":
+                items = [
+                    {"type": "message", "message": {"ts": "9999999999.0002"}},
+                    # A recent reaction on a message older than the window
+                    {"type": "message", "message": {"ts": "1000000000.0001"}},
+                    {"type": "message", "message": {"ts": "9999999999.0003"}}
+                ]
+                return web.json_response({"ok": True, "items": items, "response_metadata": {"next_cursor": "last"}})
+            items = [{"type": "message", "message": {"ts": "9999999999.0004"}}]
+            return web.json_response({"ok": True, "items": items})
+        return web.json_response({"ok": False, "error": "unknown_method"})
+
+    app = web.Application()
+    app.router.add_route("*", "/api/{method}", handle)
+    return app
+
+@pytest.mark.asyncio
+async def test_slack_metadata_paginates_and_retries(monkeypatch):
+    calls = []
+    server = TestServer(_fake_slack(calls))
+    await server.start_server()
+    limiter = RateLimiter({}, default_rate=6000)
+    monkeypatch.setattr(slack, "slack_rate_limiter", limiter)
+    monkeypatch.setattr(settings, "SLACK_API_BASE_URL", str(server.make_url("/api/")))
+    try:
+        metadata = await SlackOAuth().get_user_metadata("xoxp-test", "U1")
+    finally:
+        await server.close()
+
+    assert metadata == {
+        "presence": "active",
+        "channel_count": 9,
+        "reaction_count": 7,
+        "last_active": "2023-11-14T22:13:20+00:00"
+    }
+    # Every page was read; the old message was skipped without ending the count
+    assert [cursor for method, cursor in calls if method == "users.conversations"] == [None, "1", "2"]
+    assert [cursor for method, cursor in calls if method == "reactions.list"] == [None, None, "old", "last"]
+    assert limiter.stats()["throttled"] == 1
+
+@pytest.mark.asyncio
+async def test_slack_reactions_stop_at_the_page_cap(monkeypatch):
+    calls = []
+    server = TestServer(_fake_slack(calls))
+    await server.start_server()
+    monkeypatch.setattr(slack, "slack_rate_limiter", RateLimiter({}, default_rate=6000))
+    monkeypatch.setattr(slack, "SLACK_REACTIONS_MAX_PAGES", 2)
+    monkeypatch.setattr(settings, "SLACK_API_BASE_URL", str(server.make_url("/api/")))
+    try:
+        metadata = await SlackOAuth().get_user_metadata("xoxp-test", "U1")
+    finally:
+        await server.close()
+
+    assert metadata["reaction_count"] == 6
+    assert [cursor for method, cursor in calls if method == "reactions.list"] == [None, None, "old"]
+
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_calls_per_method():
+    limiter = RateLimiter({"reactions.list": 600}, default_rate=6000, burst_seconds=0)
+    start = time.monotonic()
+    for _ in range(4):
+        await limiter.acquire("token", "reactions.list")
+    # One call every 100 ms after the first
+    assert time.monotonic() - start >= 0.29
+    # Other methods and tokens have their own buckets
+    await limiter.acquire("token", "users.getPresence")
+    await limiter.acquire("other", "reactions.list")
+    assert limiter.stats()["buckets"] == 3
+    assert limiter.stats()["waits"] == 3
+
+@pytest.mark.asyncio
+async def test_rate_limits_are_shared_per_workspace(monkeypatch):
+    calls = []
+    server = TestServer(_fake_slack(calls))
+    await server.start_server()
+    limiter = RateLimiter({}, default_rate=6000)
+    monkeypatch.setattr(slack, "slack_rate_limiter", limiter)
+    monkeypatch.setattr(settings, "SLACK_API_BASE_URL", str(server.make_url("/api/")))
+    try:
+        client = SlackOAuth()
+        for token, user_id in (("xoxp-a", "U1"), ("xoxp-b", "U2")):
+            await client.get_user_metadata(token, user_id, "T1")
+        # Two users' tokens, one workspace: one bucket per method
+        assert limiter.stats()["buckets"] == 3
+        await client.get_user_metadata("xoxp-c", "U3", "T2")
+        assert limiter.stats()["buckets"] == 6
+    finally:
+        await server.close()
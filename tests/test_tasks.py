@@ -0,0 +1,113 @@
+import asyncio
+import pytest
+from uuid import uuid4
+from sqlalchemy import func, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from app.db import base  # noqa: F401
+from app.crud.team import get_team_metrics
+from app.crud.user import create_user
+from app.models.signal import Signal
+from app.models.team import Team
+from app.models.user import UserRole
+from app.schemas.user import UserCreate
+from app.tasks import signals as signal_tasks
+from app.tasks.celery_app import celery_app
+from tests.conftest import TEST_DATABASE_URL
+
+async def overloaded(user):
+    """Fetcher for a week of back-to-back meetings"""
+    calendar = {
+        "total_meetings": 40,
+        "total_duration_hours": 38.0,
+        "after_hours_meetings": 8,
+        "average_duration_hours": 0.95
+    }
+    return None, calendar, None
+
+@pytest.mark.asyncio
+async def test_scheduled_run_fans_out_by_team_and_is_idempotent(db: AsyncSession, monkeypatch):
+    team = Team(name="Platform")
+    db.add(team)
+    await db.commit()
+    members = []
+    for i in range(4):
+        user = await create_user(db, obj_in=UserCreate(
+            email=f"member{i}@example.com", password="testpass123", full_name=f"Member {i}", role=UserRole.EMPLOYEE
+        ))
+        user.team_id = team.id
+        user.data_consent_given = True
+        members.append(user)
+    loner = await create_user(db, obj_in=UserCreate(
+        email="loner@example.com", password="testpass123", full_name="Loner", role=UserRole.EMPLOYEE
+    ))
+    loner.data_consent_given = True
+    await db.commit()
+
+    # Tasks run each job on a fresh event loop, so they need unpooled sessions of their own
+    sessions = sessionmaker(
+        create_async_engine(TEST_DATABASE_URL, poolclass=NullPool), class_=AsyncSession, expire_on_commit=False
+    )
+    monkeypatch.setattr(signal_tasks, "get_session_factory", lambda: sessions)
+    monkeypatch.setattr(signal_tasks, "metadata_fetcher", overloaded)
+    monkeypatch.setattr(signal_tasks.settings, "SIGNAL_CHUNK_SIZE", 3)
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+
+    first = await asyncio.to_thread(lambda: signal_tasks.schedule_signal_processing.apply().get())
+    assert first["users"] == 5 and first["teams"] == 1
+    assert first["tasks"] == 3  # Two chunks for the team, one for the user without a team
+
+    async def signal_count():
+        return await db.scalar(
+            select(func.count()).select_from(Signal).where(Signal.user_id.in_([m.id for m in members] + [loner.id]))
+        )
+
+    written = await signal_count()
+    assert written >= 5
+    metrics = {metric.metric_type: metric.value for metric in await get_team_metrics(db, team_id=team.id)}
+    assert metrics["processing_coverage"] == {
+        "members": 4, "processed": 4, "skipped": 0, "errors": 0, "timed_out_chunks": 0
+    }
+    assert metrics["meeting_overload"]["share_of_members"] == 1.0
+
+    # A second run in the same interval, e.g. a duplicate beat, writes nothing new
+    await asyncio.to_thread(lambda: signal_tasks.schedule_signal_processing.apply().get())
+    assert await signal_count() == written
+    again = await get_team_metrics(db, team_id=team.id)
+    assert len(again) == len(metrics)
+    assert {metric.metric_type: metric.value for metric in again}["processing_coverage"]["skipped"] == 4
+
+    redelivered = await asyncio.to_thread(lambda: signal_tasks.process_user_chunk.apply(
+        args=(first["run_key"], [str(loner.id)])
+    ).get())
+    assert redelivered["processed"] == 0 and redelivered["skipped"] == 1
+
+def test_failed_chunk_returns_a_result_for_the_chord(monkeypatch):
+    async def broken(*args):
+        raise RuntimeError("provider exploded")
+
+    async def db_down(*args):
+        raise DBAPIError("SELECT 1", {}, Exception("connection reset"))
+
+    monkeypatch.setattr(signal_tasks, "process_chunk", broken)
+    failed = signal_tasks.process_user_chunk.apply(args=("run", [str(uuid4()), str(uuid4())])).get()
+    assert failed["errors"] == 2 and failed["processed"] == 0 and not failed["timed_out"]
+
+    # Database errors are retried, and only the last attempt gives up
+    monkeypatch.setattr(signal_tasks, "process_chunk", db_down)
+    exhausted = signal_tasks.process_user_chunk.apply(
+        args=("run", [str(uuid4())]), retries=signal_tasks.process_user_chunk.max_retries
+    ).get()
+    assert exhausted["errors"] == 1
+
+def test_retention_purge_is_scheduled_in_beat(monkeypatch):
+    from app.tasks import retention
+
+    assert celery_app.conf.beat_schedule["purge-retention"]["task"] == retention.purge_retention.name
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    monkeypatch.setattr(retention, "get_engine", lambda: engine)
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+    result = retention.purge_retention.apply().get()
+    assert set(result) == {"partitions_created", "partitions_dropped"}
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import base  # noqa: F401
+from app.core.oauth.errors import TokenRefreshError
+from app.core.oauth.token_refresh import TokenRefresher
+from app.crud.integration import get_user_token, store_oauth_tokens
+from app.crud.user import create_user
+from app.schemas.user import UserCreate
+from app.models.user import UserRole
+from tests.conftest import TestingSessionLocal
+
+class FakeProvider:
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+        self.calls = []
+
+    async def refresh_access_token(self, refresh_token):
+        self.calls.append(refresh_token)
+        outcome = self.outcomes[refresh_token]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+async def _user(db: AsyncSession, email: str):
+    return await create_user(db, obj_in=UserCreate(
+        email=email, password="testpass123", full_name="Refresh User", role=UserRole.EMPLOYEE
+    ))
+
+@pytest.mark.asyncio
+async def test_tokens_are_encrypted_and_renewed_before_expiry(db: AsyncSession):
+    due, revoked, flaky, fresh = [await _user(db, f"refresh-{name}@example.com") for name in
+                                  ("due", "revoked", "flaky", "fresh")]
+    # Google tokens live an hour; these three are inside the refresh margin
+    for user, refresh_token in ((due, "r-due"), (revoked, "r-revoked"), (flaky, "r-flaky")):
+        await store_oauth_tokens(db, user.id, "google", {
+            "access_token": "old", "refresh_token": refresh_token, "expires_in": 120
+        })
+    await store_oauth_tokens(db, fresh.id, "google", {
+        "access_token": "old", "refresh_token": "r-fresh", "expires_in": 3600
+    })
+
+    raw = (await db.execute(
+        text("SELECT access_token, refresh_token FROM integration_tokens WHERE user_id = :id"), {"id": due.id}
+    )).one()
+    assert "old" not in raw and "r-due" not in raw
+
+    google = FakeProvider({
+        "r-due": {"access_token": "new", "expires_in": 3600},
+        "r-revoked": TokenRefreshError("invalid_grant", permanent=True),
+        "r-flaky": TokenRefreshError("503")
+    })
+    refresher = TokenRefresher({"google": google}, session_factory=TestingSessionLocal)
+    await refresher.run_once()
+    # Claimed tokens are leased, so a second pass straight away does not repeat them
+    await refresher.run_once()
+
+    assert sorted(google.calls) == ["r-due", "r-flaky", "r-revoked"]
+    assert refresher.outcomes == {"refreshed": 1, "revoked": 1, "retry": 1}
+
+    now = datetime.now(timezone.utc)
+    async with TestingSessionLocal() as session:
+        renewed = await get_user_token(session, due.id, "google")
+        assert renewed.access_token == "new" and renewed.refresh_token == "r-due"
+        assert renewed.refresh_after > now + timedelta(minutes=40)
+
+        gone = await get_user_token(session, revoked.id, "google")
+        assert gone.refresh_after is None and gone.refresh_error == "invalid_grant"
+
+        retry = await get_user_token(session, flaky.id, "google")
+        assert retry.refresh_failures == 1 and retry.refresh_error is None
+        assert now < retry.refresh_after < now + timedelta(minutes=2)
+
+        untouched = await get_user_token(session, fresh.id, "google")
+        assert untouched.access_token == "old"
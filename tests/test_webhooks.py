@@ -0,0 +1,137 @@
+import time
+from datetime import datetime, timezone
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import base  # noqa: F401
+from app.main import app
+from app.api.v1.endpoints import webhooks
+from app.core.config import settings
+from app.core.signals import fetch
+from app.core.signals.engine import SignalEngine
+from app.core.metadata_cache import metadata_cache
+from app.core.webhooks import WebhookIngestor, verify_slack_signature
+from app.crud.integration import get_user_tokens, store_oauth_tokens
+from app.crud.user import create_user
+from app.schemas.user import UserCreate
+from app.models.user import UserRole
+from app.models.signal import SignalType
+from benchmarks.replay_webhooks import load, replay
+from tests.conftest import TestingSessionLocal
+
+def test_slack_signature_rejects_tampering_and_replays(monkeypatch):
+    monkeypatch.setattr(settings, "SLACK_SIGNING_SECRET", "8f742231b10e8888abcd99yyyzzz85a5")
+    # Slack's documented example request
+    body = (b"token=xyzz0WbapA4vBCDEFasx0q6G&team_id=T1DC2JH3J&team_domain=testteamnow&channel_id=G8PSS9T3V"
+            b"&channel_name=foobar&user_id=U2CERLKJA&user_name=roadrunner&command=%2Fwebhook-collect&text="
+            b"&response_url=https%3A%2F%2Fhooks.slack.com%2Fcommands%2FT1DC2JH3J%2F397700885554%2F96rGlfmibIGlgcZRskXaIFfN"
+            b"&trigger_id=398738663015.47445629121.803a0bc887a14d10d2c447fce8b6703c")
+    signature = "v0=a2114d57b48eac39b9ad189dd8316235a7b4a8d21a10bd27519666489c69b503"
+    assert verify_slack_signature(body, "1531420618", signature, now=1531420618)
+    assert not verify_slack_signature(body + b"x", "1531420618", signature, now=1531420618)
+    assert not verify_slack_signature(body, "1531420618", signature, now=1531420618 + 301)
+
+@pytest.mark.asyncio
+async def test_replayed_events_are_acknowledged_and_folded_in(db: AsyncSession, monkeypatch):
+    user = await create_user(db, obj_in=UserCreate(
+        email="webhooks@example.com", password="testpass123", full_name="Webhook User", role=UserRole.EMPLOYEE
+    ))
+    user.slack_user_id = "U-WEBHOOKS"
+    await db.commit()
+    await store_oauth_tokens(db, user.id, "google", {"access_token": "ya29", "refresh_token": "r"})
+
+    monkeypatch.setattr(settings, "SLACK_SIGNING_SECRET", "test-signing-secret")
+    monkeypatch.setattr(settings, "GOOGLE_PUSH_TOKEN", "test-push-token")
+    ingestor = WebhookIngestor(maxsize=100, batch_size=50, session_factory=TestingSessionLocal)
+    monkeypatch.setattr(webhooks, "webhook_ingestor", ingestor)
+    await metadata_cache.put("slack", user.id, {"channel_count": 5, "reaction_count": 0, "last_active": None})
+    syncs = []
+
+    async def sync_calendar(db, user_id, credentials):
+        syncs.append(("calendar", user_id))
+        return {"total_meetings": 4}
+
+    async def sync_gmail(db, user_id, credentials):
+        syncs.append(("gmail", user_id))
+        return {"total_messages": 12, "thread_count": 5}
+
+    monkeypatch.setattr(ingestor.google_oauth, "sync_calendar_metadata", sync_calendar)
+    monkeypatch.setattr(ingestor.google_oauth, "sync_gmail_metadata", sync_gmail)
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        challenge = await client.post(
+            "/api/v1/webhooks/slack/events",
+            content=b'{"type": "url_verification", "challenge": "abc"}',
+            headers={"X-Slack-Request-Timestamp": str(int(time.time())), "X-Slack-Signature": "v0=forged"}
+        )
+        assert challenge.status_code == 401
+
+        result = await replay(
+            client, load(), user_id=user.id, slack_user_id=user.slack_user_id, email=user.email
+        )
+    assert result["statuses"] == {200: result["deliveries"]}
+
+    # Nothing is processed on the request path
+    assert ingestor.stats()["queued"] == result["deliveries"] - 1 - 1  # Calendar "sync" handshake, Slack retry
+    await ingestor.drain()
+
+    stats = ingestor.stats()
+    assert stats["duplicate"] == 1
+    slack = await metadata_cache.get_stale("slack", user.id)
+    assert slack["reaction_count"] == 2  # The retried reaction counts once
+    assert slack["channel_count"] == 6
+    assert slack["last_active"] is not None
+    # Three calendar changes and two Gmail notifications for one user cost one sync each
+    assert sorted(provider for provider, _ in syncs) == ["calendar", "gmail"]
+    assert stats["coalesced"] == 3
+
+@pytest.mark.asyncio
+async def test_webhook_activity_reaches_the_next_signal_run(db: AsyncSession, monkeypatch):
+    user = await create_user(db, obj_in=UserCreate(
+        email="live@example.com", password="testpass123", full_name="Live User", role=UserRole.EMPLOYEE
+    ))
+    user.slack_user_id = "U-LIVE"
+    await db.commit()
+    await store_oauth_tokens(db, user.id, "slack", {"access_token": "xoxp", "team_id": "T1", "user_id": "U-LIVE"})
+    tokens = await get_user_tokens(db, user.id)
+
+    ingestor = WebhookIngestor(maxsize=100, batch_size=50, session_factory=TestingSessionLocal)
+
+    async def slack_metadata(access_token, slack_user_id, team_id=None):
+        return {"presence": "away", "channel_count": 4, "reaction_count": 10, "last_active": "2024-01-01T10:00:00+00:00"}
+
+    monkeypatch.setattr(fetch.slack_oauth, "get_user_metadata", slack_metadata)
+    engine = SignalEngine()
+
+    async def slack_signal():
+        fetched = await fetch.fetch_user_metadata(user, tokens, session_factory=TestingSessionLocal)
+        signals = await engine.process_metadata(user, *fetched.as_metadata())
+        return fetched, next(signal for signal in signals if signal.type == SignalType.SLACK_ACTIVITY)
+
+    late = datetime.now(timezone.utc).replace(hour=23, minute=0, second=0, microsecond=0)
+    events = (
+        {"type": "member_joined_channel", "user": "U-LIVE"},
+        {"type": "member_joined_channel", "user": "U-LIVE"},
+        {"type": "reaction_added", "user": "U-LIVE", "event_ts": str(late.timestamp() - 60)},
+        {"type": "message", "user": "U-LIVE", "ts": str(late.timestamp())}
+    )
+
+    # Nothing cached yet: the events are left to the next fetch from Slack
+    assert ingestor.submit("slack", events[0])
+    await ingestor.drain()
+    assert ingestor.stats()["uncached"] == 1
+    _, before = await slack_signal()
+    assert before.extra_data["channel_count"] == 4
+
+    # Once a fetch is cached, every worker's next run sees the events in it
+    for event in events:
+        assert ingestor.submit("slack", event)
+    await ingestor.drain()
+    assert ingestor.stats()["applied"] == 4
+
+    fetched, after = await slack_signal()
+    assert fetched.providers["slack"].cache == "hit"
+    assert after.extra_data["channel_count"] == 6
+    assert after.extra_data["reaction_count"] == 11
+    assert after.severity > before.severity
+    assert datetime.fromisoformat(fetched.slack["last_active"]) == late
@@ -0,0 +1,186 @@
+import asyncio
+from datetime import datetime, timezone
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.signals.scheduled import current_period, process_chunk, run_key_for
+from app.crud.job import claim_jobs, enqueue_job, get_job
+from app.crud.signal import get_claimed_user_ids
+from app.crud.team import get_team_metrics
+from app.crud.user import create_user
+from app.models.job import Job, JobStatus
+from app.models.signal import Signal, SignalRun
+from app.models.team import Team
+from app.models.user import UserRole
+from app.schemas.user import UserCreate
+from app import worker as job_worker
+from app.worker import JOB_KINDS, JobKind, JobWorker
+from tests.conftest import engine_test
+
+async def overloaded(user):
+    """Fetcher for a week of back-to-back meetings"""
+    calendar = {
+        "total_meetings": 40,
+        "total_duration_hours": 38.0,
+        "after_hours_meetings": 8,
+        "average_duration_hours": 0.95
+    }
+    return None, calendar, None
+
+async def run_until_idle(*workers: JobWorker) -> None:
+    """Let the workers claim side by side until none finds a due job"""
+    for _ in range(20):
+        claimed = await asyncio.gather(*(worker.run_once() for worker in workers))
+        await asyncio.gather(*(worker.drain() for worker in workers))
+        if not any(claimed):
+            return
+
+@pytest.mark.asyncio
+async def test_workers_share_a_signal_run_without_double_processing(db: AsyncSession, monkeypatch):
+    team = Team(name="Design")
+    db.add(team)
+    await db.commit()
+    users = []
+    for i in range(5):
+        user = await create_user(db, obj_in=UserCreate(
+            email=f"designer{i}@example.com", password="testpass123", full_name=f"Designer {i}", role=UserRole.EMPLOYEE
+        ))
+        user.team_id = team.id
+        user.data_consent_given = True
+        users.append(user)
+    await db.commit()
+
+    monkeypatch.setattr(job_worker.settings, "SIGNAL_CHUNK_SIZE", 2)
+    monkeypatch.setattr(job_worker, "TEAM_METRICS_RECHECK_SECONDS", 0)
+    kinds = {name: JOB_KINDS[name] for name in ("schedule_signals", "process_signals", "aggregate_team_metrics")}
+    workers = [
+        JobWorker(kinds, engine=engine_test, worker_id=name, concurrency=2, fetcher=overloaded)
+        for name in ("node-a", "node-b")
+    ]
+
+    # However many workers enqueue it, a periodic job is queued once per interval
+    queued = await asyncio.gather(*(worker.enqueue_periodic() for worker in workers))
+    assert sorted(queued) == [0, 1]
+    await run_until_idle(*workers)
+
+    run_key = run_key_for(current_period()[0])
+    user_ids = [user.id for user in users]
+    claims = await db.scalar(
+        select(func.count()).select_from(SignalRun).where(SignalRun.run_key == run_key, SignalRun.user_id.in_(user_ids))
+    )
+    assert claims == 5
+    metrics = {metric.metric_type: metric.value for metric in await get_team_metrics(db, team_id=team.id)}
+    assert metrics["processing_coverage"] == {
+        "members": 5, "processed": 5, "skipped": 0, "errors": 0, "timed_out_chunks": 0
+    }
+
+    async def signal_count():
+        return await db.scalar(select(func.count()).select_from(Signal).where(Signal.user_id.in_(user_ids)))
+
+    written = await signal_count()
+    assert written >= 5
+
+    # A chunk run again, e.g. after its worker lost the lease mid-write, writes nothing twice
+    await enqueue_job(
+        db, "process_signals", {"run_key": run_key, "user_ids": [str(user_id) for user_id in user_ids[:2]]},
+        max_attempts=1
+    )
+    await run_until_idle(*workers)
+    assert await signal_count() == written
+    assert all(worker.outcomes["dead"] == 0 for worker in workers)
+
+@pytest.mark.asyncio
+async def test_chunks_leave_users_that_failed_unclaimed(db: AsyncSession):
+    users = []
+    for i in range(3):
+        user = await create_user(db, obj_in=UserCreate(
+            email=f"flaky{i}@example.com", password="testpass123", full_name=f"Flaky {i}", role=UserRole.EMPLOYEE
+        ))
+        user.data_consent_given = True
+        users.append(user)
+    await db.commit()
+    user_ids = [user.id for user in users]
+    broken = user_ids[0]
+
+    async def partly_down(user):
+        if user.id == broken:
+            raise RuntimeError("provider down")
+        return await overloaded(user)
+
+    sessions = JobWorker({}, engine=engine_test).session_factory
+    first = await process_chunk(sessions, "signals:failures", user_ids, partly_down)
+    assert (first["processed"], first["skipped"], first["errors"]) == (2, 0, 1)
+    assert await get_claimed_user_ids(db, "signals:failures", user_ids) == set(user_ids[1:])
+
+    # A retry scores only the user that failed
+    retry = await process_chunk(sessions, "signals:failures", user_ids, overloaded)
+    assert (retry["processed"], retry["skipped"], retry["errors"]) == (1, 2, 0)
+
+@pytest.mark.asyncio
+async def test_failures_retry_with_backoff_then_die(db: AsyncSession, monkeypatch):
+    attempts = []
+
+    async def flaky(worker, job):
+        attempts.append(job.attempts)
+        raise RuntimeError("provider down")
+
+    monkeypatch.setattr(job_worker.settings, "JOB_RETRY_BASE_SECONDS", 0)
+    worker = JobWorker({"flaky": JobKind(flaky)}, engine=engine_test, worker_id="flaky-worker")
+    await enqueue_job(db, "flaky", max_attempts=2)
+
+    await worker.run_once()
+    await worker.drain()
+    job = (await db.execute(select(Job).where(Job.kind == "flaky"))).scalar_one()
+    assert (job.status, job.attempts, job.last_error) == (JobStatus.QUEUED, 1, "provider down")
+
+    await worker.run_once()
+    await worker.drain()
+    job_id = job.id
+    db.expire_all()
+    job = await get_job(db, job_id)
+    assert job.status == JobStatus.DEAD and job.finished_at is not None
+    assert attempts == [1, 2]
+
+    # Dead jobs are not claimed again
+    assert await worker.run_once() == 0
+
+@pytest.mark.asyncio
+async def test_lapsed_leases_are_taken_over_and_poison_jobs_die(db: AsyncSession):
+    async def hang(worker, job):
+        await asyncio.sleep(3600)
+
+    async def quick(worker, job):
+        return {"ok": True}
+
+    # A worker whose lease lapses loses the job to another worker and stops running it
+    await enqueue_job(db, "lapse", max_attempts=3, dedupe_key="lapse-test")
+    slow = JobWorker({"lapse": JobKind(hang)}, engine=engine_test, worker_id="slow")
+    assert await slow.run_once() == 1
+    [job_id] = list(slow._running)
+    job = await get_job(db, job_id)
+    job.lease_expires_at = datetime(2000, 1, 1, tzinfo=timezone.utc)
+    await db.commit()
+
+    fast = JobWorker({"lapse": JobKind(quick)}, engine=engine_test, worker_id="fast")
+    assert await fast.run_once() == 1
+    await fast.drain()
+    await slow.renew_leases()
+    await slow.drain()
+    assert slow.outcomes["lost"] == 1
+    db.expire_all()
+    job = await get_job(db, job_id)
+    assert (job.status, job.attempts, job.result) == (JobStatus.DONE, 2, {"ok": True})
+
+    # A job whose lease lapsed on every attempt keeps killing its workers: it is dead, not run again
+    await enqueue_job(db, "poison", max_attempts=1)
+    ran = []
+    survivor = JobWorker({"poison": JobKind(lambda worker, job: ran.append(job))}, engine=engine_test)
+    async with survivor.session_factory() as session:
+        [poison] = await claim_jobs(session, worker_id="crashed", limit=1, lease_seconds=0, kinds=["poison"])
+    await asyncio.sleep(0.01)
+    assert await survivor.run_once() == 1
+    await survivor.drain()
+    assert ran == []
+    db.expire_all()
+    poison = await get_job(db, poison.id)
+    assert poison.status == JobStatus.DEAD and "Lease lapsed" in poison.last_error